@@ -1,29 +1,48 @@
 # app.py — AfiYor FastAPI (Full Sankofa Hybrid, honors Afiyor Tetteh)
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dotenv import load_dotenv
 import os
+import asyncio
+import functools
+import hmac
+import json
 import random
+import sys
 import time
-import traceback
 
 # Load env
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 PORT = int(os.getenv("PORT", 8000))
-
-# Try to import groq SDK (optional)
-try:
-    from groq import Groq
-    groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-except Exception:
-    groq_client = None
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", "30"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+ASK_CACHE_MAX_AGE = int(os.getenv("ASK_CACHE_MAX_AGE", "3600"))
+
+# Async Groq client (optional) — shared with the v2 package
+from app.ai_client import CIRCUIT_OPEN, circuit_open, groq_client, groq_breaker, generate_ai_message, stream_ai_message, prewarm as ai_client_prewarm, shutdown as ai_client_shutdown
+from app.cache import refinement_cache, refinement_key
+from app.semantic_cache import semantic_bucket, semantic_cache
+from app.store import STORE_URL, create_store
+from app.http_cache import GZIP_MIN_SIZE, cached_json, etag_for, not_modified
+from app.metrics import MetricsMiddleware, context_tokens, registry, refinement_fallbacks, simple_metric, timed
+from app.context import CONTEXT_FETCH_TURNS, Turn, plan_context, wants_context
+from app.lifecycle import Readiness, run_step
+from app.share import SHARE_ID_RE, SHARE_MAX_AGE, SHARE_TITLE_MAX, new_share_id, render_share, share_cache
+from app.admission import Client, RateLimited, ShedMiddleware, admission, client_ip, client_key
 
 # FastAPI app
 app = FastAPI(title="AfiYor API (Honouring Afiyor Tetteh)")
 
+# Shed chat traffic past CHAT_MAX_IN_FLIGHT (added first so CORS headers still wrap the 503)
+app.add_middleware(ShedMiddleware, paths=("/chat", "/chat/batch", "/chat/stream", "/ai/ask"))
 # Allow CORS (adjust allow_origins in production)
 app.add_middleware(
     CORSMiddleware,
@@ -32,8 +51,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+# 3G clients: compress anything worth compressing (SSE streams are left alone)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
 # ---------------- Sankofa Wisdom ----------------
+from app.sankofa import SANKOFA_MODE, sankofa_day, seconds_until_next_day, seeded_indices
+from app.language import DEFAULT_LANGUAGE, detect_language, detection_stats, localized_sankofa, sankofa_checklist
 class SankofaWisdom:
     UBUNTU_QUOTES = [
         "I am because we are - Ubuntu",
@@ -66,227 +90,126 @@ class SankofaWisdom:
     def get_success_wisdom(self) -> str:
         return random.choice(self.SUCCESS_WISDOM)
 
+    # A "wisdom" value packs the chosen (success, proverb, ubuntu) indices into one small int
+    # so stored conversations can reference the lines instead of copying them.
+    def pick(self, message: Optional[str] = None) -> int:
+        sizes = (len(self.SUCCESS_WISDOM), len(self.AFRICAN_PROVERBS), len(self.UBUNTU_QUOTES))
+        success, proverb, ubuntu = seeded_indices(message, sizes) or tuple(random.randrange(n) for n in sizes)
+        return success | proverb << 8 | ubuntu << 16
+
+    def unpack(self, wisdom: int, language: str = DEFAULT_LANGUAGE) -> Tuple[str, str, str]:
+        lines = localized_sankofa(language)
+        success, proverbs, quotes = ((lines["success"], lines["proverbs"], lines["ubuntu"]) if lines else
+                                     (self.SUCCESS_WISDOM, self.AFRICAN_PROVERBS, self.UBUNTU_QUOTES))
+        # the translated lists line up with the English ones, so a stored wisdom value works in any language
+        return (success[(wisdom & 0xFF) % len(success)],
+                proverbs[((wisdom >> 8) & 0xFF) % len(proverbs)],
+                quotes[((wisdom >> 16) & 0xFF) % len(quotes)])
+
 sankofa = SankofaWisdom()
 
-def apply_sankofa_full_hybrid(ai_text: str, user_message: str) -> str:
-    opening = sankofa.get_success_wisdom()
-    proverb = sankofa.get_african_proverb()
-    ubuntu = sankofa.get_ubuntu_quote()
-    if not ai_text:
-        ai_text = "I'm unable to reach the AI service right now. Here's the best guidance I can offer from AfiYor's knowledge base."
-    checklist = (
-        "\n\nAction checklist:\n"
-        "1. Validate local requirements and contacts.\n"
-        "2. Prepare a 1-page pitch + 3 key metrics.\n"
-        "3. Reach out to at least 3 local partners / VCs."
-    )
-    final = (
-        f"{opening}\n\n"
-        f"{ai_text}\n\n"
-        f"Proverb: {proverb}\n"
-        f"Ubuntu: {ubuntu}{checklist}"
+SANKOFA_FALLBACK_TEXT = "I'm unable to reach the AI service right now. Here's the best guidance I can offer from AfiYor's knowledge base."
+SANKOFA_CHECKLIST = (
+    "\n\nAction checklist:\n"
+    "1. Validate local requirements and contacts.\n"
+    "2. Prepare a 1-page pitch + 3 key metrics.\n"
+    "3. Reach out to at least 3 local partners / VCs."
+)
+
+def sankofa_frame(wisdom: Optional[int] = None, user_message: Optional[str] = None,
+                  language: str = DEFAULT_LANGUAGE) -> Tuple[str, str]:
+    # (opening, closing) that wrap the AI text; split so /chat/stream can send the opening first
+    opening, proverb, ubuntu = sankofa.unpack(sankofa.pick(user_message) if wisdom is None else wisdom, language)
+    lines = localized_sankofa(language)
+    proverb_label, ubuntu_label = (lines["proverb_label"], lines["ubuntu_label"]) if lines else ("Proverb", "Ubuntu")
+    checklist = sankofa_checklist(lines) if lines else SANKOFA_CHECKLIST
+    return (
+        f"{opening}\n\n",
+        f"\n\n{proverb_label}: {proverb}\n"
+        f"{ubuntu_label}: {ubuntu}{checklist}"
     )
-    return final
-
-# ---------------- Knowledge Base (kept small & safe) ----------------
-AFRICAN_BUSINESS_KNOWLEDGE_BASE = {
-    "funding_data": {
-        "pre_seed": {
-            "amount": "$10K - $250K",
-            "sources": ["Personal savings", "Friends & family", "Angel investors"],
-            "african_vcs": ["TLcom Capital", "Partech Africa", "Knife Capital"]
-        },
-        "seed": {
-            "amount": "$250K - $2M",
-            "sources": ["Angel investors", "Seed VCs", "Corporate ventures"],
-            "african_vcs": ["TLcom Capital", "Partech Africa", "4DX Ventures"]
-        }
-    },
-    "mobile_money_data": {
-        "ghana": {
-            "mtn_momo": {"market_share": "65%", "users": "18M active"},
-            "airteltigo": {"market_share": "20%", "focus": "Rural populations"},
-            "vodafone_cash": {"market_share": "15%", "strength": "International transfers"}
-        },
-        "kenya": {
-            "mpesa": {"market_share": "96%", "daily_volume": "$500M"}
-        }
-    }
-}
-
-# ---------------- AfiYor logic (lightweight) ----------------
-class ProfessionalAfiYor:
-    def __init__(self):
-        self.knowledge_base = AFRICAN_BUSINESS_KNOWLEDGE_BASE
-
-    def analyze_query(self, message: str) -> str:
-        text = (message or "").lower()
-        if any(w in text for w in ["funding", "investment", "investor", "capital"]):
-            return "funding"
-        if any(w in text for w in ["mobile money", "m-pesa", "momo", "payment"]):
-            return "mobile_money"
-        if any(w in text for w in ["register", "legal", "license", "incorporation"]):
-            return "legal_registration"
-        if any(w in text for w in ["ubuntu", "culture", "philosophy", "community"]):
-            return "ubuntu"
-        return "general_business"
-
-    def generate_professional_response(self, message: str, country: str = "ghana", industry: str = "general") -> str:
-        intent = self.analyze_query(message)
-        if intent == "funding":
-            return self._funding(message, country)
-        if intent == "mobile_money":
-            return self._mobile_money(message, country)
-        if intent == "legal_registration":
-            return self._legal(message, country)
-        if intent == "ubuntu":
-            return self._ubuntu(message, country)
-        return self._general(message, country, industry)
-
-    def _funding(self, message: str, country: str) -> str:
-        stage = "seed" if "seed" in (message or "").lower() else "pre_seed"
-        data = self.knowledge_base["funding_data"][stage]
-        lines = [
-            f"**Professional Funding Intelligence for {country.title()}**",
-            "",
-            f"**{stage.replace('_',' ').title()} Funding Overview:**",
-            f"• Typical Amount: {data['amount']}",
-            f"• Key Sources: {', '.join(data['sources'])}",
-            "",
-            "**Top African VCs:**"
-        ]
-        for vc in data["african_vcs"]:
-            lines.append(f"• {vc}")
-        lines.extend([
-            "",
-            "**Success Factors:**",
-            "• Strong team with complementary skills",
-            "• Clear market opportunity",
-            "• Proven traction and growth",
-            "• Scalable business model",
-            "",
-            "Ubuntu wisdom: Build partnerships that create mutual prosperity for your community."
-        ])
-        return "\n".join(lines)
-
-    def _mobile_money(self, message: str, country: str) -> str:
-        mm = self.knowledge_base["mobile_money_data"].get(country.lower(), {})
-        lines = [f"**Mobile Money Intelligence for {country.title()}**", ""]
-        if mm:
-            if country.lower() == "ghana":
-                g = mm["ghana"]
-                lines += [
-                    "**Ghana Mobile Money Market:**",
-                    f"• MTN MoMo: {g['mtn_momo']['market_share']} market share, {g['mtn_momo']['users']}",
-                    f"• AirtelTigo Money: {g['airteltigo']['market_share']}, focus on {g['airteltigo']['focus']}",
-                    f"• Vodafone Cash: {g['vodafone_cash']['market_share']}, strength in {g['vodafone_cash']['strength']}"
-                ]
-            elif country.lower() == "kenya":
-                k = mm["kenya"]
-                lines += [
-                    "**Kenya Mobile Money Leadership:**",
-                    f"• M-Pesa: {k['mpesa']['market_share']} market share",
-                    f"• Daily Volume: {k['mpesa']['daily_volume']}"
-                ]
-        else:
-            lines += [
-                "**African Mobile Money Overview:**",
-                "• Africa processes 70% of global mobile money transactions",
-                "• $490 billion transaction value in 2024",
-                "• 469 million registered users continent-wide"
-            ]
-        lines += ["", "Ubuntu insight: Mobile money succeeds because it serves the entire community's financial needs."]
-        return "\n".join(lines)
-
-    def _legal(self, message: str, country: str) -> str:
-        reg = self.knowledge_base.get("business_registration", {})
-        country_data = reg.get(country.lower())
-        if country_data:
-            lines = [
-                f"**Business Registration Guide for {country.title()}**",
-                "",
-                "**Registration Details:**",
-                f"• Authority: {country_data['authority']}",
-                f"• Cost: {country_data['cost']}",
-                f"• Timeline: {country_data['timeline']}",
-                f"• Process: {country_data['process']}",
-                "",
-                "**Next Steps:**",
-                "• Complete name search and reservation",
-                "• Prepare incorporation documents",
-                "• Submit application with required fees",
-                "• Obtain business certificate",
-                "",
-                "Ubuntu principle: Proper legal foundation protects your community's investment in your success."
-            ]
-            return "\n".join(lines)
-        return ("**Business Registration**\n\n"
-                "• Business name registration\n"
-                "• Incorporation documents\n"
-                "• Registered office address\n"
-                "• Fee payment and certificate issuance\n\n"
-                "Ubuntu principle: Proper legal foundation protects your community's investment in your success.")
-
-    def _ubuntu(self, message: str, country: str) -> str:
-        content = (
-            "**Ubuntu Philosophy in Business**\n\n"
-            "**Core Meaning:** \"I am because we are\" - Individual success comes from community prosperity.\n\n"
-            "**Business Applications:**\n"
-            "• Consultative decision-making processes\n"
-            "• Employee development and mentorship\n"
-            "• Community-first product design\n"
-            "• Shared value creation with stakeholders\n"
-            "• Long-term relationship building\n\n"
-            "**Success Examples:**\n"
-            "• M-Pesa: Financial inclusion for entire communities\n"
-            "• Grameen Bank: Microfinance based on community trust\n"
-            "• African Leadership Academy: Developing leaders for continent\n\n"
-            "**Leadership Principles:**\n"
-            "• Servant leadership approach\n"
-            "• Emphasis on consensus building\n"
-            "• Focus on collective outcomes\n"
-            "• Investment in people development\n\n"
-            f"Ubuntu wisdom: Your business success should strengthen the entire {country} community."
-        )
-        return content
-
-    def _general(self, message: str, country: str, industry: str) -> str:
-        content = (
-            f"**Professional Business Guidance for {country.title()}**\n\n"
-            "**Market Context:**\n"
-            "• Africa's 1.4 billion population, 60% under 25\n"
-            "• 84% mobile penetration across continent\n"
-            "• Growing middle class of 350 million people\n"
-            "• $490 billion mobile money transaction volume\n\n"
-            f"**Success Principles for {industry.title()}:**\n"
-            "• Focus on solving real community problems\n"
-            "• Build for mobile-first users\n"
-            "• Understand local payment preferences\n"
-            "• Create sustainable business models\n"
-            "• Integrate cultural values like Ubuntu\n"
-        )
-        if industry == "fintech":
-            content += (
-                "\n**Fintech Opportunities:**\n"
-                "• 570 million unbanked adults\n"
-                "• Cross-border payment needs\n"
-                "• SME financing gap of $331 billion\n"
-            )
-        elif industry == "agriculture":
-            content += (
-                "\n**Agriculture Focus:**\n"
-                "• Employs 60% of workforce\n"
-                "• Climate-smart solutions needed\n"
-                "• Value chain integration opportunities\n"
-            )
-        content += f"\n\nUbuntu wisdom: Individual success comes from community prosperity - build businesses that lift everyone in {country}."
-        return content
-
-professional_afiyor = ProfessionalAfiYor()
+
+def apply_sankofa_full_hybrid(ai_text: str, user_message: str, wisdom: Optional[int] = None,
+                              language: str = DEFAULT_LANGUAGE) -> str:
+    opening, closing = sankofa_frame(wisdom, user_message, language)
+    if not ai_text:
+        lines = localized_sankofa(language)
+        ai_text = lines["fallback"] if lines else SANKOFA_FALLBACK_TEXT
+    return f"{opening}{ai_text}{closing}"
+
+@functools.lru_cache(maxsize=4096)
+def stored_frame(wisdom: int, language: str) -> Tuple[str, str]:
+    # saved records share one copy of each (opening, closing) pair
+    return sankofa_frame(wisdom, language=language)
+
+# ---------------- Knowledge Base + AfiYor logic (shared with the v2 package) ----------------
+from app.afiyor import draft_language, professional_afiyor, reload_knowledge_base
+from app.intents import classify_many
+from app.knowledge_base import snapshot_changed
 
 # ---------------- In-memory storage (for demo) ----------------
-users_db: Dict[str, Dict[str, Any]] = {}
-conversations: List[Dict[str, Any]] = []
+class ConversationRecord:
+    # Keeps the answer exactly as it was shown: the refined text or the rendered draft, plus the
+    # Sankofa opening/closing. Drafts and frames are shared objects, so repeats cost a pointer each.
+    # Rows saved before draft_text/opening/closing existed are rebuilt from wisdom and draft_key.
+    __slots__ = ("id", "user_id", "query", "country", "industry", "confidence", "created_at",
+                 "wisdom", "draft_key", "ai_text", "draft_text", "opening", "closing")
+
+    def __init__(self, id: int, user_id: str, query: str, country: str, industry: str, confidence: float,
+                 created_at: int, wisdom: int, draft_key: Tuple, ai_text: Optional[str] = None,
+                 draft_text: Optional[str] = None, opening: Optional[str] = None, closing: Optional[str] = None):
+        self.id = id
+        self.user_id = sys.intern(user_id)
+        self.query = query
+        self.country = sys.intern(country)
+        self.industry = sys.intern(industry)
+        self.confidence = confidence
+        self.created_at = created_at
+        self.wisdom = wisdom
+        self.draft_key = draft_key
+        self.ai_text = ai_text or None
+        self.draft_text = draft_text or None
+        self.opening = opening
+        self.closing = closing
+
+    @property
+    def body(self) -> str:
+        return self.ai_text or self.draft_text or professional_afiyor.render_draft(self.draft_key)
+
+    @property
+    def response(self) -> str:
+        if self.opening is None or self.closing is None:
+            return apply_sankofa_full_hybrid(self.body, self.query, self.wisdom, draft_language(self.draft_key))
+        return f"{self.opening}{self.body}{self.closing}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "query": self.query,
+            "response": self.response,
+            "country": self.country,
+            "industry": self.industry,
+            "confidence": self.confidence,
+            "language": draft_language(self.draft_key),
+            "created_at": self.created_at
+        }
+
+# memory:// by default; point STORE_URL at SQLite or Postgres to share users and history between workers
+store = create_store(ConversationRecord)
+
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_MAX_PAGE_SIZE = 200
+
+def history_page(records: List[ConversationRecord], has_more: bool, after: Optional[int] = None) -> Dict[str, Any]:
+    page = [record.to_dict() for record in records]
+    return {
+        "conversations": page,
+        "before": page[0]["id"] if page and has_more and after is None else None,
+        # no ?since= cursor when ids can commit out of order: clients reload the latest page instead
+        "after": (page[-1]["id"] if page else after) if store.ordered_ids else None,
+        "has_more": has_more,
+    }
 
 # ---------------- Pydantic models ----------------
 class RegisterRequest(BaseModel):
@@ -310,40 +233,167 @@ class ChatResponse(BaseModel):
     confidence: float
     conversation_id: Optional[int] = None
     ai_error: Optional[str] = None
+    language: Optional[str] = None
 
-# ---------------- Groq helper (optional) ----------------
-def generate_ai_message(afiyor_text: str, user_message: str, country: str='Ghana', industry: str='general', tone: str='business_coach'):
-    if not groq_client:
-        return None, "Groq client not configured"
-    tone_description = {
-        'professional': 'Formal, concise, investor-ready tone.',
-        'friendly': 'Warm, simple language, occasionally uses local phrases.',
-        'business_coach': 'Professional coach: encouraging, actionable, with next-step recommendations.'
-    }.get(tone, 'Professional and helpful tone.')
-    system_prompt = (
-        "You are an African business coach and editor.\n"
-        "Refine the provided AfiYor response into a single clear message.\n"
-        f"Tone guideline: {tone_description}\n"
-        "Be actionable and concise. Do NOT invent facts not present in the AfiYor text."
-    )
-    user_prompt = f"User question: {user_message}\n\nAfiYor draft: {afiyor_text}\n\nReturn the refined message as plain text. Include a short 2-3 item action checklist."
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest]
+
+class BatchChatItem(BaseModel):
+    index: int
+    response: Optional[str] = None
+    confidence: Optional[float] = None
+    conversation_id: Optional[int] = None
+    ai_error: Optional[str] = None
+    error: Optional[str] = None
+    language: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItem]
+
+class ShareRequest(BaseModel):
+    conversation_id: int
+    user_id: str
+    title: Optional[str] = None
+
+# ---------------- Refinement (cached) ----------------
+def cached_refinement(key: tuple, user_message: str, bucket: tuple, context: Optional[str]) -> Optional[str]:
+    cached = refinement_cache.get(key)
+    # follow-ups depend on the earlier turns, so only standalone questions match paraphrases
+    if cached is None and not context:
+        cached = semantic_cache.get(user_message, bucket)
+        if cached is not None:
+            refinement_cache.set(key, cached)
+    return cached
+
+def remember_refinement(key: tuple, user_message: str, bucket: tuple, context: Optional[str], refined: str):
+    refinement_cache.set(key, refined)
+    if not context:
+        semantic_cache.set(user_message, bucket, refined)
+
+async def refine_draft(draft: str, user_message: str, country: str = "ghana", industry: str = "general", tone: str = "business_coach",
+                       intent: Optional[str] = None, context: Optional[str] = None, client: Optional[Client] = None,
+                       language: str = DEFAULT_LANGUAGE, draft_key: Optional[Tuple] = None):
+    intent = intent or professional_afiyor.analyze_query(user_message)
+    key = refinement_key(user_message, intent, country, industry, tone, context)
+    draft_key = draft_key or professional_afiyor.draft_key(user_message, country, industry, intent=intent, language=language)
+    bucket = semantic_bucket(draft_key, country, industry, tone)
+    cached = cached_refinement(key, user_message, bucket, context)
+    if cached is not None:
+        return cached, None
+    # only calls that would reach Groq are charged to the client's refinement budget
+    if circuit_open():
+        return None, CIRCUIT_OPEN
+    shed = admission.acquire_refinement(client)
+    if shed:
+        return None, shed
     try:
-        completion = groq_client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=512,
-            temperature=0.2
-        )
-        content = completion.choices[0].message.content if hasattr(completion, 'choices') else str(completion)
-        return content, None
-    except Exception as e:
-        traceback.print_exc()
-        return None, str(e)
+        refined, ai_error = await generate_ai_message(draft, user_message, country, industry, tone, context=context,
+                                                      language=language)
+    finally:
+        admission.release_refinement()
+    if refined:
+        remember_refinement(key, user_message, bucket, context, refined)
+    return refined, ai_error
+
+async def save_conversation(req: ChatRequest, wisdom: int, draft_key: Tuple, draft: str, ai_text: Optional[str],
+                            confidence: float) -> ConversationRecord:
+    return (await save_conversations([(req, wisdom, draft_key, draft, ai_text, confidence)]))[0]
+
+async def save_conversations(items: List[Tuple[ChatRequest, int, Tuple, str, Optional[str], float]]) -> List[ConversationRecord]:
+    # one bulk insert; the store allocates the ids
+    created_at = int(time.time())
+    rows = []
+    for req, wisdom, draft_key, draft, ai_text, confidence in items:
+        opening, closing = stored_frame(wisdom, draft_language(draft_key))
+        rows.append({
+            "user_id": req.user_id or "anonymous",
+            "query": req.message,
+            "country": req.country or "ghana",
+            "industry": req.industry or "general",
+            "confidence": confidence,
+            "created_at": created_at,
+            "wisdom": wisdom,
+            "draft_key": draft_key,
+            "ai_text": ai_text,
+            # the draft is only shown (and kept) when there is no refined text
+            "draft_text": None if ai_text else draft,
+            "opening": opening,
+            "closing": closing
+        })
+    return await store.add_conversations(rows)
+
+async def conversation_context(user_id: Optional[str], message: str) -> Optional[str]:
+    # earlier turns for follow-up questions only
+    if not wants_context(user_id, message):
+        return None
+    # no drain: a turn still in the write-behind queue is left out rather than waited for
+    records, _ = await store.conversation_page(user_id, CONTEXT_FETCH_TURNS, drain=False)
+    if not records:
+        return None
+    summary, through = await store.get_summary(user_id)
+    turns = [Turn(r.id, r.query, r.body) for r in records]
+    plan = plan_context(turns, summary, through)
+    if plan.summarized_through != through:
+        await store.set_summary(user_id, plan.summary, plan.summarized_through)
+    context_tokens.observe(plan.tokens)
+    return plan.text
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def swap_knowledge_base(rebuild: bool = True):
+    kb = reload_knowledge_base(rebuild)
+    # refined answers were written from the old drafts
+    refinement_cache.clear()
+    semantic_cache.clear()
+    return kb
+
+async def watch_knowledge_base():
+    # picks up snapshots rebuilt by another worker (or dropped in by a deploy) without a restart
+    while True:
+        await asyncio.sleep(KB_RELOAD_INTERVAL)
+        try:
+            if snapshot_changed(professional_afiyor.knowledge_base):
+                swap_knowledge_base(rebuild=False)
+        except Exception as e:
+            print(f"Knowledge base reload failed: {e}")
+
+def admit(request: Request, user_ids: List[Optional[str]]) -> List[Client]:
+    ip = client_ip(request)
+    keys = [client_key(user_id, ip) for user_id in user_ids]
+    try:
+        admission.admit(ip, keys)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e), headers=e.headers())
+    return [Client(key, ip) for key in keys]
+
+def require_admin(request: Request):
+    # fail closed: without ADMIN_TOKEN the admin routes don't exist
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
 # ---------------- Routes ----------------
+readiness = Readiness()
+
+async def warm_drafts():
+    professional_afiyor.warm()
+
+@app.on_event("startup")
+async def startup():
+    # nothing here blocks serving: /health/live answers at once, /health/ready once storage is up
+    run_step(readiness, "storage", store.connect)
+    run_step(readiness, "drafts", warm_drafts, required=False)
+    run_step(readiness, "groq_client", ai_client_prewarm, required=False)
+    if KB_RELOAD_INTERVAL > 0:
+        asyncio.create_task(watch_knowledge_base())
+
+@app.on_event("shutdown")
+async def shutdown():
+    await ai_client_shutdown()
+    await store.disconnect()
+
 @app.get("/")
 async def root():
     intro = (
@@ -357,81 +407,411 @@ async def root():
 async def register(req: RegisterRequest):
     if not req.email or not req.name:
         raise HTTPException(status_code=400, detail="Name and email required")
-    if req.email in users_db:
+    user = await store.create_user(req.name, req.email, req.country, req.industry)
+    if user is None:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user_id = f"user_{len(users_db)+1}"
-    users_db[req.email] = {
-        "id": user_id, "name": req.name, "email": req.email,
-        "country": req.country, "industry": req.industry, "created_at": int(time.time())
-    }
-    return {"status": "success", "user_id": user_id, "message": f"Akwaaba {req.name}!"}
+    return {"status": "success", "user_id": user["id"], "message": f"Akwaaba {req.name}!"}
 
 @app.post("/auth/login")
 async def login(req: LoginRequest):
-    user = users_db.get(req.email)
+    user = await store.get_user(req.email)
     if not user:
         raise HTTPException(status_code=404, detail="Account not found")
     return {"status": "success", "user_id": user["id"], "name": user["name"], "message": f"Welcome back, {user['name']}!"}
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(req: ChatRequest):
+async def chat_endpoint(req: ChatRequest, request: Request):
     if not req.message or not req.message.strip():
         raise HTTPException(status_code=400, detail="Message is required")
-    # Local draft from AfiYor KB
-    draft = professional_afiyor.generate_professional_response(req.message, req.country or "ghana", req.industry or "general")
+    client, = admit(request, [req.user_id])
+    country, industry = req.country or "ghana", req.industry or "general"
+    with timed("analyze"):
+        intent = professional_afiyor.analyze_query(req.message)
+        language = detect_language(req.message)
+    # Local draft from AfiYor KB, already in the user's language
+    with timed("draft"):
+        draft_key = professional_afiyor.draft_key(req.message, country, industry, intent=intent, language=language)
+        draft = professional_afiyor.render_draft(draft_key)
     refined = None
     ai_error = None
     # Try Groq (optional)
     if groq_client:
-        try:
-            refined, ai_error = generate_ai_message(draft, req.message, req.country or "ghana", req.industry or "general", req.tone or "business_coach")
-        except Exception as e:
-            ai_error = str(e)
-    final = apply_sankofa_full_hybrid(refined if refined else draft, req.message)
-    conversation = {
-        "id": len(conversations) + 1,
-        "user_id": req.user_id or "anonymous",
-        "query": req.message,
-        "response": final,
-        "country": req.country or "ghana",
-        "industry": req.industry or "general",
-        "confidence": 0.9 if refined else 0.85,
-        "created_at": int(time.time())
-    }
-    conversations.append(conversation)
-    return ChatResponse(response=final, confidence=conversation["confidence"], conversation_id=conversation["id"], ai_error=ai_error)
+        with timed("context"):
+            context = await conversation_context(req.user_id, req.message)
+        with timed("refine"):
+            try:
+                refined, ai_error = await refine_draft(draft, req.message, country, industry, req.tone or "business_coach",
+                                                       intent=intent, context=context, client=client, language=language,
+                                                       draft_key=draft_key)
+            except Exception as e:
+                ai_error = str(e)
+        if not refined:
+            refinement_fallbacks.inc(route="/chat")
+    with timed("sankofa"):
+        wisdom = sankofa.pick(req.message)
+        final = apply_sankofa_full_hybrid(refined if refined else draft, req.message, wisdom, language)
+    with timed("persist"):
+        conversation = await save_conversation(req, wisdom, draft_key, draft, refined, 0.9 if refined else 0.85)
+    return ChatResponse(response=final, confidence=conversation.confidence, conversation_id=conversation.id, ai_error=ai_error,
+                        language=language)
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(batch: BatchChatRequest, request: Request):
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    clients = admit(request, [item.user_id for item in batch.items])
+    results: List[BatchChatItem] = [BatchChatItem(index=i) for i in range(len(batch.items))]
+    valid: List[int] = []
+    for i, req in enumerate(batch.items):
+        if req.message and req.message.strip():
+            valid.append(i)
+        else:
+            results[i].error = "Message is required"
+
+    # classify + draft in one pass; identical questions share a single draft/refinement
+    matches = classify_many([batch.items[i].message for i in valid])
+    unique: Dict[tuple, Dict[str, Any]] = {}
+    item_keys: Dict[int, tuple] = {}
+    for i, match in zip(valid, matches):
+        req = batch.items[i]
+        country, industry, tone = req.country or "ghana", req.industry or "general", req.tone or "business_coach"
+        key = refinement_key(req.message, match.intent, country, industry, tone)
+        item_keys[i] = key
+        if key not in unique:
+            language = detect_language(req.message)
+            draft_key = professional_afiyor.draft_key(req.message, country, industry, intent=match.intent, language=language)
+            unique[key] = {"req": req, "client": clients[i], "intent": match.intent, "language": language,
+                           "draft_key": draft_key, "draft": professional_afiyor.render_draft(draft_key),
+                           "refined": None, "ai_error": None}
+
+    if groq_client:
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def refine(entry: Dict[str, Any]):
+            req = entry["req"]
+            async with semaphore:
+                try:
+                    entry["refined"], entry["ai_error"] = await refine_draft(
+                        entry["draft"], req.message, req.country or "ghana", req.industry or "general",
+                        req.tone or "business_coach", intent=entry["intent"], client=entry["client"],
+                        language=entry["language"], draft_key=entry["draft_key"])
+                except Exception as e:
+                    entry["ai_error"] = str(e)
+
+        await asyncio.gather(*(refine(entry) for entry in unique.values()))
+
+    to_save = []
+    for i in valid:
+        entry = unique[item_keys[i]]
+        refined = entry["refined"]
+        wisdom = sankofa.pick(batch.items[i].message)
+        results[i].response = apply_sankofa_full_hybrid(refined if refined else entry["draft"], batch.items[i].message,
+                                                        wisdom, entry["language"])
+        results[i].confidence = 0.9 if refined else 0.85
+        results[i].ai_error = entry["ai_error"]
+        results[i].language = entry["language"]
+        to_save.append((batch.items[i], wisdom, entry["draft_key"], entry["draft"], refined, results[i].confidence))
+    for i, record in zip(valid, await save_conversations(to_save)):
+        results[i].conversation_id = record.id
+    return BatchChatResponse(results=results)
+
+# events: opening, token..., closing, done; a "reset" means drop the tokens so far (Groq failed
+# mid-answer) and use the draft tokens that follow instead
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest, request: Request):
+    if not req.message or not req.message.strip():
+        raise HTTPException(status_code=400, detail="Message is required")
+    client, = admit(request, [req.user_id])
+    country = req.country or "ghana"
+    industry = req.industry or "general"
+    tone = req.tone or "business_coach"
+
+    async def events():
+        language = detect_language(req.message)
+        wisdom = sankofa.pick(req.message)
+        opening, closing = sankofa_frame(wisdom, language=language)
+        yield sse_event("opening", opening)
+        draft_key = professional_afiyor.draft_key(req.message, country, industry, language=language)
+        draft = professional_afiyor.render_draft(draft_key)
+        refined = None
+        ai_error = None
+        if groq_client:
+            context = await conversation_context(req.user_id, req.message)
+            intent = professional_afiyor.analyze_query(req.message)
+            key = refinement_key(req.message, intent, country, industry, tone, context)
+            bucket = semantic_bucket(draft_key, country, industry, tone)
+            refined = cached_refinement(key, req.message, bucket, context)
+            if refined is not None:
+                yield sse_event("token", refined)
+            elif circuit_open():
+                ai_error = CIRCUIT_OPEN
+            else:
+                ai_error = admission.acquire_refinement(client)
+            if refined is None and not ai_error:
+                parts: List[str] = []
+                try:
+                    async for delta in stream_ai_message(draft, req.message, tone, context=context, language=language):
+                        parts.append(delta)
+                        yield sse_event("token", delta)
+                except Exception as e:
+                    ai_error = str(e)
+                finally:
+                    admission.release_refinement()
+                if ai_error:
+                    # a cut-off answer is never kept: tell the client to drop it and fall back to the draft
+                    if parts:
+                        yield sse_event("reset", {"ai_error": ai_error})
+                else:
+                    refined = "".join(parts) or None
+                    if refined:
+                        remember_refinement(key, req.message, bucket, context, refined)
+        body = refined if refined else draft
+        if not refined:
+            yield sse_event("token", body)
+        yield sse_event("closing", closing)
+        conversation = await save_conversation(req, wisdom, draft_key, draft, refined, 0.9 if refined else 0.85)
+        yield sse_event("done", {"conversation_id": conversation.id, "confidence": conversation.confidence, "ai_error": ai_error,
+                                 "language": language})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def owned_conversation(conversation_id: int, user_id: str) -> ConversationRecord:
+    # anonymous chats have no owner, so nobody may share (or unshare) them
+    record = await store.get_conversation(conversation_id) if user_id != "anonymous" else None
+    if record is None or record.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return record
+
+@app.post("/share")
+async def create_share(req: ShareRequest, request: Request):
+    admit(request, [req.user_id])
+    record = await owned_conversation(req.conversation_id, req.user_id)
+    share = await store.create_share({
+        "share_id": new_share_id(),
+        "conversation_id": record.id,
+        "title": (req.title or "AfiYor Business Advice")[:SHARE_TITLE_MAX],
+        "query": record.query,
+        "response": record.response,
+        "country": record.country,
+        "industry": record.industry,
+        "created_at": record.created_at,
+    })
+    share_cache.set(share["share_id"], render_share(share))
+    return {"status": "success", "share_id": share["share_id"]}
+
+@app.delete("/share/{share_id}")
+async def delete_share(share_id: str, request: Request, user_id: str):
+    admit(request, [user_id])
+    share = await store.get_share(share_id) if SHARE_ID_RE.match(share_id) else None
+    if share is None:
+        raise HTTPException(status_code=404, detail="Share not found")
+    await owned_conversation(share["conversation_id"], user_id)
+    await store.delete_share(share_id)
+    share_cache.delete(share_id)
+    return {"status": "success", "share_id": share_id}
+
+@app.get("/share/{share_id}")
+async def get_share(share_id: str, request: Request):
+    rendered = share_cache.get(share_id)
+    if rendered is None:
+        share = await store.get_share(share_id) if SHARE_ID_RE.match(share_id) else None
+        if share is None:
+            raise HTTPException(status_code=404, detail="Share not found")
+        rendered = render_share(share)
+        share_cache.set(share_id, rendered)
+    # not immutable: a deleted share must stop being served, so caches revalidate after SHARE_MAX_AGE
+    headers = {"ETag": rendered.etag, "Cache-Control": f"public, max-age={SHARE_MAX_AGE}", "Vary": "Accept-Encoding"}
+    if not_modified(request, rendered.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(rendered.gzipped, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(rendered.body, media_type="application/json", headers=headers)
 
 @app.get("/history/{user_id}")
-async def get_history(user_id: str):
-    user_convs = [c for c in conversations if c["user_id"] == user_id]
-    return {"conversations": user_convs}
+async def get_history(user_id: str, request: Request,
+                      limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+                      before: Optional[int] = None,
+                      after: Optional[int] = None,
+                      since: Optional[int] = None):
+    # Pages are returned oldest-first; without a cursor the most recent page is returned.
+    # Use ?before=<page.before> to walk back in time and ?since=<page.after> (or ?after=) to fetch only new ones.
+    # With write-behind, after/since are ignored and the latest page is returned (see write_behind.py).
+    if since is not None:
+        after = since if after is None else max(after, since)
+    if not store.ordered_ids:
+        after = None
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either before or after/since, not both")
+    records, has_more = await store.conversation_page(user_id, limit, before, after)
+    # records never change once stored, so their ids identify the page; rows saved before answers were
+    # stored are rebuilt from the knowledge base, so its content hash (an edit may keep "version") goes in too
+    etag = etag_for("history", user_id, professional_afiyor.knowledge_base.source_sha256, has_more, after,
+                    *(record.id for record in records))
+    return cached_json(request, etag, lambda: history_page(records, has_more, after))
+
+def ask_cache_control() -> str:
+    # the Sankofa lines rotate at UTC midnight, so no cache may keep an answer past it
+    return f"public, max-age={min(ASK_CACHE_MAX_AGE, seconds_until_next_day())}"
 
 @app.get("/ai/ask")
-async def ai_ask(q: Optional[str] = "Hello from AfiYor"):
+async def ai_ask(request: Request, q: Optional[str] = "Hello from AfiYor"):
     # Quick convenience GET that runs through the same pipeline (country=ghana)
-    draft = professional_afiyor.generate_professional_response(q, "ghana", "general")
+    cacheable = SANKOFA_MODE != "random"
+    etag = None
+    if cacheable and not groq_client:
+        # draft-only answers are a function of the question, the day and the knowledge base content,
+        # so a revalidation is settled before doing (or rate limiting) any work
+        etag = etag_for("ask", q, sankofa_day(), professional_afiyor.knowledge_base.source_sha256)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ask_cache_control()})
+    client, = admit(request, [None])
+    with timed("analyze"):
+        intent = professional_afiyor.analyze_query(q)
+        language = detect_language(q)
+    with timed("draft"):
+        draft_key = professional_afiyor.draft_key(q, "ghana", "general", intent=intent, language=language)
+        draft = professional_afiyor.render_draft(draft_key)
     refined = None
     ai_error = None
     if groq_client:
-        try:
-            refined, ai_error = generate_ai_message(draft, q, "ghana", "general", "business_coach")
-        except Exception as e:
-            ai_error = str(e)
-    final = apply_sankofa_full_hybrid(refined if refined else draft, q)
-    return {"question": q, "answer": final, "ai_error": ai_error}
+        with timed("refine"):
+            try:
+                refined, ai_error = await refine_draft(draft, q, "ghana", "general", "business_coach", intent=intent, client=client,
+                                                       language=language, draft_key=draft_key)
+            except Exception as e:
+                ai_error = str(e)
+        if not refined:
+            refinement_fallbacks.inc(route="/ai/ask")
+    with timed("sankofa"):
+        final = apply_sankofa_full_hybrid(refined if refined else draft, q, language=language)
+    body = {"question": q, "answer": final, "ai_error": ai_error, "language": language}
+    if not cacheable or (groq_client and not refined):
+        # a fallback answer must not be pinned in a shared cache while Groq is unavailable
+        return JSONResponse(body, headers={"Cache-Control": "no-store"})
+    return cached_json(request, etag or etag_for("ask", final), lambda: body, cache_control=ask_cache_control())
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    if not readiness.ready:
+        return JSONResponse({"status": "starting", **readiness.stats()}, status_code=503)
+    return {"status": "ready", **readiness.stats()}
 
 @app.get("/health")
 async def health():
     return {
         "status": "healthy",
+        "readiness": readiness.stats(),
         "version": "1.0",
         "ai_status": "groq_configured" if groq_client else "groq_not_configured",
-        "knowledge_base_loaded": True
+        "ai_client": groq_client.stats() if groq_client else None,
+        "ai_breaker": groq_breaker.stats() if groq_client else None,
+        "knowledge_base_loaded": True,
+        "knowledge_base_version": professional_afiyor.knowledge_base.version,
+        "refinement_cache": refinement_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "admission": admission.stats(),
+        "share_cache": share_cache.stats(),
+        "language_detection": detection_stats(),
+        "storage": store.stats()
     }
 
+# ---------------- Metrics ----------------
+@registry.collector
+def _cache_metrics():
+    stats = refinement_cache.stats()
+    return simple_metric("afiyor_refinement_cache_events_total", "counter", "Refinement cache lookups and removals",
+                         {k: stats[k] for k in ("hits", "misses", "evictions", "expirations")}, label="event") + \
+        simple_metric("afiyor_refinement_cache_entries", "gauge", "Entries in the refinement cache", {"": stats["size"]})
+
+@registry.collector
+def _admission_metrics():
+    return simple_metric("afiyor_refinements_in_flight", "gauge", "Groq refinements currently admitted",
+                         {"": admission.refinements_in_flight})
+
+@registry.collector
+def _semantic_cache_metrics():
+    stats = semantic_cache.stats()
+    return simple_metric("afiyor_semantic_cache_events_total", "counter", "Near-duplicate cache lookups and removals",
+                         {k: stats[k] for k in ("hits", "misses", "skipped", "evictions", "expirations")}, label="event") + \
+        simple_metric("afiyor_semantic_cache_entries", "gauge", "Entries in the near-duplicate cache", {"": stats["size"]})
+
+@registry.collector
+def _groq_metrics():
+    if not groq_client:
+        return []
+    client, breaker = groq_client.stats(), groq_breaker.stats()
+    return simple_metric("afiyor_groq_in_flight", "gauge", "Groq requests currently in flight", {"": client["in_flight"]}) + \
+        simple_metric("afiyor_groq_coalesced_total", "counter", "Refinements served by joining an identical in-flight call", {"": client["coalesced"]}) + \
+        simple_metric("afiyor_groq_breaker_open", "gauge", "1 while the Groq circuit breaker is open", {"": int(breaker["state"] == "open")}) + \
+        simple_metric("afiyor_groq_breaker_trips_total", "counter", "Times the Groq circuit breaker opened", {"": breaker["trips"]})
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/cache")
+async def cache_stats(request: Request):
+    require_admin(request)
+    return {**refinement_cache.stats(), "semantic": semantic_cache.stats()}
+
+@app.get("/admin/stats")
+async def usage_stats(request: Request):
+    require_admin(request)
+    # running counters maintained on insert; never scans history
+    return await store.usage_stats()
+
+@app.get("/admin/conversations/export")
+async def export_conversations(request: Request, after: int = Query(0, ge=0)):
+    # NDJSON, one conversation per line, oldest first; ?after=<last id> resumes an interrupted export
+    require_admin(request)
+
+    async def lines():
+        chunk: List[str] = []
+        async for record in store.iter_conversations(after):
+            chunk.append(json.dumps({**record.to_dict(), "intent": record.draft_key[0]}, ensure_ascii=False) + "\n")
+            if len(chunk) >= 100:
+                yield "".join(chunk)
+                chunk.clear()
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="afiyor-conversations.ndjson"'})
+
+@app.get("/admin/knowledge-base")
+async def knowledge_base_stats(request: Request):
+    require_admin(request)
+    return professional_afiyor.knowledge_base.stats()
+
+@app.post("/admin/knowledge-base/reload")
+async def knowledge_base_reload(request: Request):
+    require_admin(request)
+    try:
+        kb = swap_knowledge_base()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Knowledge base reload failed: {e}")
+    return {"status": "success", "knowledge_base": kb.stats()}
+
+@app.post("/admin/cache/flush")
+async def cache_flush(request: Request):
+    require_admin(request)
+    flushed = refinement_cache.clear() + semantic_cache.clear()
+    return {"status": "success", "flushed": flushed, "stats": {**refinement_cache.stats(), "semantic": semantic_cache.stats()}}
+
 # ---------------- Run (only when running app.py directly) ----------------
 if __name__ == "__main__":
-    # When running locally you can use: uvicorn app:app --reload --port 8000
+    # When running locally you can use: uvicorn asgi:app --reload --port 8000
     print("Starting AfiYor FastAPI (Full Sankofa Hybrid) — honoring Afiyor Tetteh")
     import uvicorn
-    uvicorn.run("app:app", host="0.0.0.0", port=PORT, log_level="info")
+    if WEB_CONCURRENCY > 1 and STORE_URL.startswith("memory"):
+        print("WARNING: memory:// storage is per process; set STORE_URL to share users and history between workers")
+    # extra workers re-import the app through asgi.py ("app" alone resolves to the app/ package)
+    uvicorn.run(app if WEB_CONCURRENCY == 1 else "asgi:app", host="0.0.0.0", port=PORT,
+                workers=WEB_CONCURRENCY, log_level="info")
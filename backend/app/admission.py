@@ -0,0 +1,180 @@
+# admission.py — per-client rate limits and load shedding in front of Groq refinements
+#
+# Three layers, cheapest first:
+#   * requests per IP and per user (token buckets): over the limit -> 429 + Retry-After
+#   * chat requests in flight (ShedMiddleware): over the ceiling -> 503 + Retry-After
+#   * refinements per user, per IP and in flight: over any -> the local draft is served instead
+# Anonymous callers are keyed by IP, so they don't all share (and drain) one bucket. user_id is
+# whatever the caller sends, so refinements are charged to the IP as well: a new user_id on
+# every request gets a fresh user bucket but not a fresh IP bucket.
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from .metrics import admission_decisions
+
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "120"))
+RATE_LIMIT_IP_BURST = float(os.getenv("RATE_LIMIT_IP_BURST", "30"))
+RATE_LIMIT_USER_PER_MINUTE = float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "60"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "15"))
+REFINE_LIMIT_USER_PER_MINUTE = float(os.getenv("REFINE_LIMIT_USER_PER_MINUTE", "20"))
+REFINE_LIMIT_USER_BURST = float(os.getenv("REFINE_LIMIT_USER_BURST", "5"))
+# several people can share an address (NAT, campus, mobile carrier), so this is looser than per user
+REFINE_LIMIT_IP_PER_MINUTE = float(os.getenv("REFINE_LIMIT_IP_PER_MINUTE", "60"))
+REFINE_LIMIT_IP_BURST = float(os.getenv("REFINE_LIMIT_IP_BURST", "15"))
+REFINE_MAX_IN_FLIGHT = int(os.getenv("REFINE_MAX_IN_FLIGHT", "64"))
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "256"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+# Railway's proxy appends the caller's address to X-Forwarded-For; set to 0 when exposed directly
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "1") != "0"
+
+
+class TokenBuckets:
+    """One token bucket per key, refilled at ``per_minute`` up to ``burst``; the least recently
+    seen keys are dropped past ``max_keys`` (a dropped key simply starts again with a full bucket)."""
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated_at)
+
+    def take(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; returns 0 when allowed, else the seconds until they would be available."""
+        if self.rate <= 0:
+            return 0.0
+        cost = min(cost, self.burst)  # a large batch drains the bucket rather than never fitting
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def client_ip(request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def client_key(user_id: Optional[str], ip: str) -> str:
+    if not user_id or user_id == "anonymous":
+        return f"ip:{ip}"
+    return f"user:{user_id}"
+
+
+class Client(NamedTuple):
+    key: str  # client_key(): "user:<id>", or "ip:<address>" for anonymous callers
+    ip: str
+
+
+class RateLimited(Exception):
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Too many requests for this {scope}")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class AdmissionController:
+    def __init__(self):
+        self.ip_requests = TokenBuckets(RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_IP_BURST)
+        self.user_requests = TokenBuckets(RATE_LIMIT_USER_PER_MINUTE, RATE_LIMIT_USER_BURST)
+        self.user_refinements = TokenBuckets(REFINE_LIMIT_USER_PER_MINUTE, REFINE_LIMIT_USER_BURST)
+        self.ip_refinements = TokenBuckets(REFINE_LIMIT_IP_PER_MINUTE, REFINE_LIMIT_IP_BURST)
+        self.max_refinements = REFINE_MAX_IN_FLIGHT
+        self.refinements_in_flight = 0
+
+    def admit(self, ip: str, keys: Iterable[str]):
+        """Charge one request to the IP and to each key (a batch passes one key per item).
+        Raises RateLimited when any bucket is empty."""
+        keys = list(keys)
+        wait = self.ip_requests.take(ip, len(keys) or 1)
+        if wait:
+            admission_decisions.inc(layer="ip", outcome="rejected")
+            raise RateLimited("address", wait)
+        for key in set(keys):
+            wait = self.user_requests.take(key, keys.count(key))
+            if wait:
+                admission_decisions.inc(layer="user", outcome="rejected")
+                raise RateLimited("user", wait)
+        admission_decisions.inc(layer="request", outcome="admitted")
+
+    def acquire_refinement(self, client: Optional[Client]) -> Optional[str]:
+        """Returns None and holds an in-flight slot (give it back with release_refinement),
+        or the reason the refinement was shed."""
+        if self.refinements_in_flight >= self.max_refinements:
+            admission_decisions.inc(layer="refine_in_flight", outcome="shed")
+            return "AI refinement skipped: server busy"
+        if client is not None:
+            if self.ip_refinements.take(client.ip):
+                admission_decisions.inc(layer="refine_ip", outcome="shed")
+                return "AI refinement skipped: rate limit reached, try again shortly"
+            if not client.key.startswith("ip:") and self.user_refinements.take(client.key):
+                admission_decisions.inc(layer="refine_user", outcome="shed")
+                return "AI refinement skipped: rate limit reached, try again shortly"
+        self.refinements_in_flight += 1
+        admission_decisions.inc(layer="refine", outcome="admitted")
+        return None
+
+    def release_refinement(self):
+        self.refinements_in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "refinements_in_flight": self.refinements_in_flight,
+            "max_refinements_in_flight": self.max_refinements,
+            "tracked_ips": len(self.ip_requests),
+            "tracked_users": len(self.user_requests),
+            "limits_per_minute": {"ip": RATE_LIMIT_IP_PER_MINUTE, "user": RATE_LIMIT_USER_PER_MINUTE,
+                                  "refine_user": REFINE_LIMIT_USER_PER_MINUTE, "refine_ip": REFINE_LIMIT_IP_PER_MINUTE},
+        }
+
+
+admission = AdmissionController()
+
+
+class ShedMiddleware:
+    """Answers 503 + Retry-After on ``paths`` once ``max_in_flight`` of them are already running,
+    so a spike queues at the client instead of inside the event loop."""
+
+    def __init__(self, app, paths: Iterable[str], max_in_flight: int = CHAT_MAX_IN_FLIGHT, retry_after: int = 1):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or self.max_in_flight <= 0:
+            await self.app(scope, receive, send)
+            return
+        if self.in_flight >= self.max_in_flight:
+            admission_decisions.inc(layer="chat_in_flight", outcome="rejected")
+            response = JSONResponse({"detail": "Server busy, please retry"}, status_code=503,
+                                    headers={"Retry-After": str(self.retry_after)})
+            await response(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,202 @@
+# afiyor.py — AfiYor knowledge base and draft builder (used by app.py and the v2 routers)
+import os
+import sys
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from .intents import classify
+from .knowledge_base import KnowledgeBase, load_knowledge_base
+from .language import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES, country_name, detect_language, language_pack
+
+# ---------------- Knowledge Base (app/data/knowledge_base.json, see knowledge_base.py) ----------------
+# Countries/industries offered by the frontend; their drafts are rendered at startup
+KNOWN_COUNTRIES = ["ghana", "nigeria", "kenya", "south_africa", "egypt", "ethiopia"]
+KNOWN_INDUSTRIES = ["general", "fintech", "agriculture", "technology", "retail", "manufacturing",
+                    "services", "healthcare", "education", "logistics"]
+DRAFT_INTENTS = [("funding", "pre_seed"), ("funding", "seed"), ("mobile_money", None),
+                 ("legal_registration", None), ("ubuntu", None), ("general_business", None)]
+DRAFT_MEMO_SIZE = int(os.getenv("DRAFT_MEMO_SIZE", "4096"))
+
+def with_language(key: Tuple, language: str) -> Tuple:
+    # English keys keep their original four slots, so stored conversations render unchanged
+    if language == DEFAULT_LANGUAGE or language not in SUPPORTED_LANGUAGES:
+        return key
+    return key + (sys.intern(language),)
+
+def draft_language(key: Tuple) -> str:
+    return key[4] if len(key) > 4 else DEFAULT_LANGUAGE
+
+def bullet(text: str) -> str:
+    return f"• {text}"
+
+class ProfessionalAfiYor:
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None):
+        self.knowledge_base = knowledge_base if knowledge_base is not None else load_knowledge_base()
+        # draft key -> rendered draft, least recently used first; drafts depend only on the key and the knowledge base
+        self._drafts: "OrderedDict[Tuple, str]" = OrderedDict()
+
+    def set_knowledge_base(self, knowledge_base: KnowledgeBase):
+        self._drafts = OrderedDict()
+        self.knowledge_base = knowledge_base
+
+    def analyze_query(self, message: str) -> str:
+        return classify(message).intent
+
+    def generate_professional_response(self, message: str, country: str = "ghana", industry: str = "general") -> str:
+        return self.render_draft(self.draft_key(message, country, industry, language=detect_language(message)))
+
+    # A draft key captures every input a draft depends on: (intent, stage, country, industry),
+    # plus the language when it is not English. Unused slots are None so equivalent requests share a key.
+    def draft_key(self, message: str, country: str = "ghana", industry: str = "general", intent: Optional[str] = None,
+                  language: str = DEFAULT_LANGUAGE) -> Tuple:
+        intent = intent or self.analyze_query(message)
+        if intent == "funding":
+            stage = "seed" if "seed" in (message or "").lower() else "pre_seed"
+            key = (intent, stage, sys.intern(country), None)
+        elif intent in ("mobile_money", "legal_registration", "ubuntu"):
+            key = (intent, None, sys.intern(country), None)
+        else:
+            key = (intent, None, sys.intern(country), sys.intern(industry))
+        return with_language(key, language)
+
+    def render_draft(self, key: Tuple) -> str:
+        draft = self._drafts.get(key)
+        if draft is not None:
+            self._drafts.move_to_end(key)
+            return draft
+        draft = self._build_draft(key)
+        self._drafts[key] = draft
+        if len(self._drafts) > DRAFT_MEMO_SIZE:
+            self._drafts.popitem(last=False)
+        return draft
+
+    def warm(self, countries: Optional[Iterable[str]] = None, industries: Iterable[str] = KNOWN_INDUSTRIES,
+             languages: Iterable[str] = SUPPORTED_LANGUAGES) -> int:
+        if countries is None:
+            countries = dict.fromkeys(KNOWN_COUNTRIES + self.knowledge_base.countries())
+        industries = list(industries)
+        for language in languages:
+            for country in countries:
+                for intent, stage in DRAFT_INTENTS:
+                    for industry in (industries if intent == "general_business" else [None]):
+                        key = (intent, stage, sys.intern(country), industry and sys.intern(industry))
+                        self.render_draft(with_language(key, language))
+        return len(self._drafts)
+
+    def _build_draft(self, key: Tuple) -> str:
+        intent, stage, country, industry = key[:4]
+        pack = language_pack(draft_language(key))
+        if intent == "funding":
+            return self._funding(pack, stage, country)
+        if intent == "mobile_money":
+            return self._mobile_money(pack, country)
+        if intent == "legal_registration":
+            return self._legal(pack, country)
+        if intent == "ubuntu":
+            return self._ubuntu(pack, country)
+        return self._general(pack, country, industry)
+
+    def _funding(self, pack: dict, stage: str, country: str) -> str:
+        t = pack["drafts"]["funding"]
+        data = self.knowledge_base.lookup("funding_data", stage)
+        lines = [
+            t["title"].format(country=country_name(pack, country)),
+            "",
+            t["overview"].format(stage=pack["stages"].get(stage) or stage.replace('_', ' ').title()),
+            bullet(t["amount"].format(amount=data['amount'])),
+            bullet(t["sources"].format(sources=', '.join(data['sources']))),
+            "",
+            t["vcs_title"],
+            *map(bullet, data["african_vcs"]),
+            "",
+            t["factors_title"],
+            *map(bullet, t["factors"]),
+            "",
+            t["closing"],
+        ]
+        return "\n".join(lines)
+
+    def _mobile_money(self, pack: dict, country: str) -> str:
+        t = pack["drafts"]["mobile_money"]
+        name = country_name(pack, country)
+        mm = self.knowledge_base.lookup("mobile_money_data", country.lower(), {})
+        lines = [t["title"].format(country=name), ""]
+        if mm:
+            if country.lower() == "ghana":
+                g = mm
+                lines += [
+                    t["ghana_title"].format(country=name),
+                    bullet(t["ghana_mtn"].format(**g['mtn_momo'])),
+                    bullet(t["ghana_airteltigo"].format(**g['airteltigo'])),
+                    bullet(t["ghana_vodafone"].format(**g['vodafone_cash']))
+                ]
+            elif country.lower() == "kenya":
+                k = mm
+                lines += [
+                    t["kenya_title"].format(country=name),
+                    bullet(t["kenya_mpesa"].format(**k['mpesa'])),
+                    bullet(t["kenya_volume"].format(**k['mpesa']))
+                ]
+            else:
+                lines.append(t["market_title"].format(country=name))
+                for provider, info in mm.items():
+                    share = info.get("market_share")
+                    provider = provider.replace('_', ' ').title()
+                    lines.append(bullet(t["provider_share"].format(provider=provider, market_share=share) if share else provider))
+        else:
+            lines += [t["overview_title"], *map(bullet, t["overview"])]
+        lines += ["", t["closing"]]
+        return "\n".join(lines)
+
+    def _legal(self, pack: dict, country: str) -> str:
+        t = pack["drafts"]["legal"]
+        country_data = self.knowledge_base.lookup("business_registration", country.lower())
+        if country_data:
+            lines = [
+                t["title"].format(country=country_name(pack, country)),
+                "",
+                t["details_title"],
+                bullet(t["authority"].format(authority=country_data['authority'])),
+                bullet(t["cost"].format(cost=country_data['cost'])),
+                bullet(t["timeline"].format(timeline=country_data['timeline'])),
+                bullet(t["process"].format(process=country_data['process'])),
+                "",
+                t["next_title"],
+                *map(bullet, t["next"]),
+                "",
+                t["closing"]
+            ]
+            return "\n".join(lines)
+        return "\n".join([t["fallback_title"], "", *map(bullet, t["fallback"]), "", t["closing"]])
+
+    def _ubuntu(self, pack: dict, country: str) -> str:
+        t = pack["drafts"]["ubuntu"]
+        sections = ["\n".join([title, *map(bullet, items)]) for title, items in t["sections"]]
+        closing = t["closing"].format(country=country_name(pack, country), country_id=country)
+        return "\n\n".join([t["title"], t["meaning"], *sections, closing])
+
+    def _general(self, pack: dict, country: str, industry: str) -> str:
+        t = pack["drafts"]["general"]
+        name = country_name(pack, country)
+        industry_name = pack["industries"].get(industry.lower()) or industry.title()
+        content = "\n\n".join([
+            t["title"].format(country=name),
+            "\n".join([t["market_title"], *map(bullet, t["market"])]),
+            "\n".join([t["principles_title"].format(industry=industry_name), *map(bullet, t["principles"])]),
+        ]) + "\n"
+        note = t["industry_notes"].get(industry)
+        if note:
+            title, items = note
+            content += "\n" + "\n".join([title, *map(bullet, items)]) + "\n"
+        content += "\n\n" + t["closing"].format(country=name, country_id=country)
+        return content
+
+professional_afiyor = ProfessionalAfiYor()
+
+def reload_knowledge_base(rebuild: bool = True) -> KnowledgeBase:
+    # rebuild=True recompiles the snapshot from the JSON source if it changed;
+    # rebuild=False just maps the snapshot another worker already wrote.
+    kb = load_knowledge_base() if rebuild else KnowledgeBase(professional_afiyor.knowledge_base.path)
+    professional_afiyor.set_knowledge_base(kb)
+    professional_afiyor.warm()
+    return kb
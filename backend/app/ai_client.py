@@ -1 +1,290 @@
+# ai_client.py — async Groq client shared by app.py and the v2 routers
+import asyncio
+import importlib
+import os
+import time
+import traceback
+from typing import AsyncIterator, Dict, Optional, Tuple
 
+from dotenv import load_dotenv
+
+from .breaker import CircuitBreaker
+from .language import DEFAULT_LANGUAGE, language_pack
+from .metrics import groq_calls
+
+load_dotenv()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-70b-8192")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "20"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "32"))
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", "64"))
+GROQ_KEEPALIVE_SECONDS = float(os.getenv("GROQ_KEEPALIVE_SECONDS", "30"))
+# Refinement is optional, so callers get the draft back if Groq has not answered by then
+REFINE_DEADLINE_SECONDS = float(os.getenv("REFINE_DEADLINE_SECONDS", "6"))
+
+TONE_DESCRIPTIONS = {
+    'professional': 'Formal, concise, investor-ready tone.',
+    'friendly': 'Warm, simple language, occasionally uses local phrases.',
+    'business_coach': 'Professional coach: encouraging, actionable, with next-step recommendations.'
+}
+
+
+class _Flight:
+    # one shared upstream request and the number of callers still awaiting it
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncGroqClient:
+    """Wraps ``groq.AsyncGroq`` with a shared keep-alive pool and a concurrency cap.
+
+    The underlying HTTP client is created on first use so it binds to the
+    running event loop rather than the one (if any) active at import time.
+    The SDK and httpx are imported there too, keeping them off the cold-start path.
+    """
+
+    def __init__(self, api_key: str, model: str = GROQ_MODEL, base_url: Optional[str] = GROQ_BASE_URL,
+                 timeout: float = GROQ_TIMEOUT, max_retries: int = GROQ_MAX_RETRIES,
+                 max_concurrency: int = GROQ_MAX_CONCURRENCY, pool_size: int = GROQ_POOL_SIZE,
+                 keepalive_seconds: float = GROQ_KEEPALIVE_SECONDS):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = None
+        self._inflight: Dict[tuple, _Flight] = {}
+        self.in_flight = 0
+        self.coalesced = 0
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            from groq import AsyncGroq
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+            )
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=self.max_retries,
+                http_client=http_client,
+            )
+        return self._client
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 512,
+                       temperature: float = 0.2, timeout: Optional[float] = None) -> str:
+        # Single-flight: concurrent calls with an identical prompt share one upstream request.
+        # The request runs in its own task so a disconnecting caller cannot cancel it for the others;
+        # once the last caller has gone (deadline, disconnect) it is cancelled to free its slot.
+        key = (self.model, temperature, max_tokens, system_prompt, user_prompt)
+        flight = self._inflight.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(self._complete(system_prompt, user_prompt, max_tokens, temperature, timeout))
+            flight = self._inflight[key] = _Flight(task)
+            task.add_done_callback(lambda t: self._finish(key, flight))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+    def _finish(self, key: tuple, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            self._inflight.pop(key)
+        task = flight.task
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    async def _complete(self, system_prompt: str, user_prompt: str, max_tokens: int,
+                        temperature: float, timeout: Optional[float]) -> str:
+        client = self._get_client()
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                completion = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout or self.timeout,
+                )
+            finally:
+                self.in_flight -= 1
+        return completion.choices[0].message.content if hasattr(completion, 'choices') else str(completion)
+
+    async def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 512,
+                     temperature: float = 0.2, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        client = self._get_client()
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                chunks = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout or self.timeout,
+                    stream=True,
+                )
+                async for chunk in chunks:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "in_flight": self.in_flight,
+            "coalesced": self.coalesced,
+            "max_concurrency": self.max_concurrency,
+            "pool_size": self.pool_size,
+        }
+
+
+groq_client: Optional[AsyncGroqClient] = AsyncGroqClient(GROQ_API_KEY) if GROQ_API_KEY else None
+groq_breaker = CircuitBreaker()
+CIRCUIT_OPEN = "AI refinement skipped: Groq circuit open"
+
+
+def circuit_open() -> bool:
+    """True (and counted as a refused call) when the breaker would refuse a Groq call right now,
+    so callers can skip charging the client's refinement budget for a call that never happens."""
+    if groq_breaker.would_allow():
+        return False
+    groq_breaker.rejected += 1
+    groq_calls.inc(outcome="circuit_open")
+    return True
+
+
+# ---------------- Prompt + refinement helper ----------------
+def build_prompts(afiyor_text: str, user_message: str, tone: str = 'business_coach',
+                  context: Optional[str] = None, language: str = DEFAULT_LANGUAGE) -> Tuple[str, str]:
+    tone_description = TONE_DESCRIPTIONS.get(tone, 'Professional and helpful tone.')
+    system_prompt = (
+        "You are an African business coach and editor.\n"
+        "Refine the provided AfiYor response into a single clear message.\n"
+        f"Tone guideline: {tone_description}\n"
+        "Be actionable and concise. Do NOT invent facts not present in the AfiYor text."
+    )
+    if language != DEFAULT_LANGUAGE:
+        # the draft is already translated; keep the answer in that language instead of re-translating
+        system_prompt += f"\nWrite the whole message in {language_pack(language)['name']}, the language of the draft."
+    user_prompt = f"User question: {user_message}\n\nAfiYor draft: {afiyor_text}\n\nReturn the refined message as plain text. Include a short 2-3 item action checklist."
+    if context:
+        system_prompt += "\nUse the earlier conversation only to understand follow-up questions."
+        user_prompt = f"Earlier conversation with this user:\n{context}\n\n{user_prompt}"
+    return system_prompt, user_prompt
+
+
+async def generate_ai_message(afiyor_text: str, user_message: str, country: str = 'Ghana',
+                              industry: str = 'general', tone: str = 'business_coach',
+                              deadline: float = REFINE_DEADLINE_SECONDS, context: Optional[str] = None,
+                              language: str = DEFAULT_LANGUAGE):
+    if not groq_client:
+        return None, "Groq client not configured"
+    if not groq_breaker.allow():
+        groq_calls.inc(outcome="circuit_open")
+        return None, CIRCUIT_OPEN
+    system_prompt, user_prompt = build_prompts(afiyor_text, user_message, tone, context, language)
+    started = time.monotonic()
+    try:
+        # the upstream timeout is bounded too, so a call nobody waits for can't hold its slot until GROQ_TIMEOUT
+        content = await asyncio.wait_for(groq_client.complete(system_prompt, user_prompt, timeout=deadline), deadline)
+    except asyncio.TimeoutError:
+        groq_breaker.record_failure()
+        groq_calls.inc(outcome="deadline")
+        return None, f"AI refinement exceeded {deadline:g}s deadline"
+    except asyncio.CancelledError:
+        # the request was cancelled (client gone, shutdown); no verdict on Groq's health
+        groq_breaker.release()
+        raise
+    except Exception as e:
+        groq_breaker.record_failure()
+        groq_calls.inc(outcome="error")
+        traceback.print_exc()
+        return None, str(e)
+    groq_breaker.record_success(time.monotonic() - started)
+    groq_calls.inc(outcome="success")
+    return content, None
+
+
+async def stream_ai_message(afiyor_text: str, user_message: str, tone: str = 'business_coach',
+                            deadline: float = REFINE_DEADLINE_SECONDS, context: Optional[str] = None,
+                            language: str = DEFAULT_LANGUAGE) -> AsyncIterator[str]:
+    # the deadline applies to the first token; once tokens flow the stream runs to completion
+    if not groq_client:
+        raise RuntimeError("Groq client not configured")
+    if not groq_breaker.allow():
+        groq_calls.inc(outcome="circuit_open")
+        raise RuntimeError(CIRCUIT_OPEN)
+    system_prompt, user_prompt = build_prompts(afiyor_text, user_message, tone, context, language)
+    started = time.monotonic()
+    deltas = groq_client.stream(system_prompt, user_prompt)
+    try:
+        try:
+            async with asyncio.timeout(deadline):
+                first = await deltas.__anext__()
+        except StopAsyncIteration:
+            groq_breaker.record_success(time.monotonic() - started)
+            return
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"AI refinement exceeded {deadline:g}s deadline")
+        yield first
+        async for delta in deltas:
+            yield delta
+    except (GeneratorExit, asyncio.CancelledError):
+        # the consumer went away (client disconnected) or was cancelled; no verdict on Groq's health
+        groq_breaker.release()
+        raise
+    except Exception:
+        groq_breaker.record_failure()
+        groq_calls.inc(outcome="error")
+        raise
+    finally:
+        await deltas.aclose()
+    groq_breaker.record_success(time.monotonic() - started)
+    groq_calls.inc(outcome="success")
+
+
+async def prewarm():
+    # import the SDK on a worker thread, then build the client on the loop, before the first request needs it
+    if groq_client:
+        await asyncio.to_thread(importlib.import_module, "groq")
+        groq_client._get_client()
+
+
+async def shutdown():
+    if groq_client:
+        await groq_client.aclose()
@@ -0,0 +1,104 @@
+# breaker.py — circuit breaker guarding the Groq refinement call
+import os
+import time
+from collections import deque
+
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.getenv("BREAKER_SLOW_SECONDS", "3"))
+BREAKER_SLOW_RATE = float(os.getenv("BREAKER_SLOW_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed -> open when the recent error or slow-call rate crosses its threshold;
+    open -> half-open after ``open_seconds``, where a single probe call decides
+    whether to close again or re-open."""
+
+    def __init__(self, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 error_rate: float = BREAKER_ERROR_RATE, slow_seconds: float = BREAKER_SLOW_SECONDS,
+                 slow_rate: float = BREAKER_SLOW_RATE, open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self._outcomes: deque = deque(maxlen=window)  # (ok, slow) per call
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def would_allow(self) -> bool:
+        # allow() without claiming anything: lets callers skip work a refused call would waste
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.open_seconds
+        if self.state == HALF_OPEN:
+            return not self._probe_in_flight
+        return True
+
+    def release(self):
+        # a call that ended without an outcome frees the half-open probe slot
+        self._probe_in_flight = False
+
+    def record_success(self, latency: float):
+        self._record(True, latency >= self.slow_seconds)
+
+    def record_failure(self):
+        self._record(False, False)
+
+    def _record(self, ok: bool, slow: bool):
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            if ok and not slow:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._trip()
+            return
+        if self.state == OPEN:
+            return
+        self._outcomes.append((ok, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        errors = sum(1 for ok, _ in self._outcomes if not ok)
+        slow_calls = sum(1 for _, slow in self._outcomes if slow)
+        if errors / calls >= self.error_rate or slow_calls / calls >= self.slow_rate:
+            self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+
+    def stats(self) -> dict:
+        retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)) if self.state == OPEN else 0.0
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_errors": sum(1 for ok, _ in self._outcomes if not ok),
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1),
+        }
@@ -0,0 +1,96 @@
+# cache.py — bounded LRU + TTL cache for refined LLM answers
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+REFINE_CACHE_SIZE = int(os.getenv("REFINE_CACHE_SIZE", "2048"))
+REFINE_CACHE_TTL = float(os.getenv("REFINE_CACHE_TTL", "21600"))
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    text = _WS_RE.sub(" ", (message or "").lower()).strip()
+    return text.rstrip("?!. ")
+
+
+class LRUTTLCache:
+    """Least-recently-used cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = REFINE_CACHE_SIZE, ttl: float = REFINE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> int:
+        with self._lock:
+            flushed = len(self._data)
+            self._data.clear()
+            return flushed
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl if self.ttl != float("inf") else None,  # None: entries never expire
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def refinement_key(message: str, intent: str, country: str, industry: str, tone: str,
+                   context: Optional[str] = None) -> tuple:
+    key = (normalize_message(message), intent, (country or "").lower(), (industry or "").lower(), tone or "")
+    if context:
+        # a follow-up is only the same request under the same earlier conversation
+        key += (hashlib.blake2b(context.encode("utf-8"), digest_size=16).hexdigest(),)
+    return key
+
+
+refinement_cache = LRUTTLCache()
@@ -0,0 +1,124 @@
+# context.py — multi-turn context for refinement under a fixed token budget
+#
+# The prompt carries the most recent turns verbatim (clipped) plus a rolling summary
+# of everything older. A turn that no longer fits is folded into the summary once,
+# and the summary is stored with the history together with the id it covers, so later
+# requests only ever look at turns newer than that id. Tokens are estimated at ~4
+# characters each, which is close enough for budgeting and needs no tokenizer.
+#
+# Context is only attached to messages that lean on earlier turns (is_follow_up): it
+# changes the refinement key, so attaching it everywhere would cost standalone
+# questions their exact and semantic cache hits and their single-flight sharing.
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+from .intents import classify
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+CONTEXT_MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", "6"))
+CONTEXT_TURN_TOKENS = int(os.getenv("CONTEXT_TURN_TOKENS", "150"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "150"))
+# turns fetched per request; the slack lets a few turns from a burst still reach the summary
+CONTEXT_FETCH_TURNS = CONTEXT_MAX_TURNS + 4
+
+# pronouns and back-references that point at an earlier turn (en, fr, sw)
+_ANAPHORA = frozenset((
+    "it", "its", "this", "these", "those", "they", "them", "their", "same", "above", "previous",
+    "earlier", "mentioned", "said", "instead", "else",
+    "ça", "cela", "celui", "celle", "ceux", "celles", "précédent", "mentionné",
+    "hiyo", "hilo", "hizo", "huyo", "hayo",
+))
+# openers that continue the previous question; a short message alone ("seed investors Ghana?")
+# is usually a standalone question, so length is not a signal
+_OPENERS = ("and", "but", "so", "also", "then", "what about", "how about", "tell me more",
+            "et", "mais", "aussi", "na", "lakini")
+ANONYMOUS = "anonymous"
+_FOLLOW_UP_WORD_RE = re.compile(r"[^\W\d_]+")
+
+CHARS_PER_TOKEN = 4
+
+
+class Turn(NamedTuple):
+    id: int
+    query: str
+    answer: str
+
+
+class ContextPlan(NamedTuple):
+    text: Optional[str]
+    tokens: int
+    summary: str
+    summarized_through: int
+
+
+def is_follow_up(message: Optional[str]) -> bool:
+    words = _FOLLOW_UP_WORD_RE.findall((message or "").lower())
+    if not words:
+        return False
+    if not _ANAPHORA.isdisjoint(words):
+        return True
+    start = " ".join(words[:3])
+    return any(start == opener or start.startswith(opener + " ") for opener in _OPENERS)
+
+
+def wants_context(user_id: Optional[str], message: Optional[str]) -> bool:
+    # anonymous chats all share one user id, so their "history" is other people's turns
+    return bool(user_id) and user_id != ANONYMOUS and CONTEXT_TOKEN_BUDGET > 0 and is_follow_up(message)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clip(text: str, max_tokens: int) -> str:
+    text = " ".join((text or "").split())
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit - 1)
+    return text[:cut if cut > 0 else limit - 1] + "…"
+
+
+def render_turn(turn: Turn) -> str:
+    return f"User: {clip(turn.query, CONTEXT_TURN_TOKENS // 3)}\nAfiYor: {clip(turn.answer, CONTEXT_TURN_TOKENS)}"
+
+
+def summarize_turn(turn: Turn) -> str:
+    topic = classify(turn.query).intent.replace("_", " ")
+    return f"- ({topic}) {clip(turn.query, 24)}"
+
+
+def compact_summary(summary: str, turns: List[Turn]) -> str:
+    # extractive and incremental: one line per folded turn, oldest lines dropped past the cap
+    lines = [line for line in summary.splitlines() if line] + [summarize_turn(t) for t in turns]
+    while lines and estimate_tokens("\n".join(lines)) > CONTEXT_SUMMARY_TOKENS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def plan_context(turns: List[Turn], summary: str = "", summarized_through: int = 0) -> ContextPlan:
+    """``turns`` are oldest-first. Recent turns get the budget left after reserving room for
+    the summary, so the rendered context never exceeds CONTEXT_TOKEN_BUDGET."""
+    fresh = [t for t in turns if t.id > summarized_through]
+    turn_budget = CONTEXT_TOKEN_BUDGET - CONTEXT_SUMMARY_TOKENS
+    kept: List[str] = []
+    used = 0
+    for turn in reversed(fresh):
+        block = render_turn(turn)
+        cost = estimate_tokens(block)
+        if len(kept) >= CONTEXT_MAX_TURNS or used + cost > turn_budget:
+            break
+        kept.append(block)
+        used += cost
+    evicted = fresh[:len(fresh) - len(kept)]
+    if evicted:
+        summary = compact_summary(summary, evicted)
+        summarized_through = evicted[-1].id
+    parts = []
+    if summary:
+        parts.append("Earlier topics:\n" + summary)
+    if kept:
+        parts.append("Recent turns:\n" + "\n\n".join(reversed(kept)))
+    text = "\n\n".join(parts) or None
+    return ContextPlan(text, estimate_tokens(text) if text else 0, summary, summarized_through)
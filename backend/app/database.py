@@ -1,13 +1,26 @@
 from databases import Database
 from sqlalchemy import MetaData, create_engine
-from sqlalchemy.orm import sessionmaker
 from .core.config import settings
 
 # databases supports async db access
 DATABASE_URL = str(settings.DATABASE_URL)
-database = Database(DATABASE_URL)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    # a single aiosqlite connection; pool sizing does not apply
+    database = Database(DATABASE_URL)
+else:
+    database = Database(DATABASE_URL, min_size=settings.DB_POOL_MIN_SIZE, max_size=settings.DB_POOL_MAX_SIZE)
 metadata = MetaData()
 
 # For synchronous operations (alembic, migrations) engine:
-engine = create_engine(DATABASE_URL.replace("+asyncpg", ""), future=True)
-SessionLocal = sessionmaker(bind=engine)
+engine = create_engine(DATABASE_URL.replace("+asyncpg", "").replace("+aiosqlite", ""), future=True)
+
+
+def __getattr__(name):
+    # SessionLocal is only needed by migration tooling; building it imports sqlalchemy.orm (~0.1s)
+    if name == "SessionLocal":
+        from sqlalchemy.orm import sessionmaker
+        globals()["SessionLocal"] = sessionmaker(bind=engine)
+        return globals()["SessionLocal"]
+    raise AttributeError(name)
@@ -0,0 +1,189 @@
+# db.py — async repository for users and conversations (v2 package)
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select
+
+from .database import database
+from .models import users, conversations, conversation_summaries, usage_counters
+from .store import EXPORT_BATCH_SIZE
+from .usage import DayRollover, KeyFolder, prune_query, tally, upsert_query, usage_snapshot
+from .write_behind import WRITE_BEHIND, IdAllocator, WriteBehindQueue
+
+# Statements are built once at import; asyncpg additionally caches the prepared
+# form per pooled connection, so the hot paths only bind parameters.
+_USER_BY_EMAIL = select(users).where(users.c.email == bindparam("email"))
+_USER_BY_ID = select(users).where(users.c.id == bindparam("user_id"))
+_INSERT_USER = users.insert()
+_INSERT_CONVERSATION = conversations.insert()
+_CONV_COLUMNS = [
+    conversations.c.id, conversations.c.user_id, conversations.c.query, conversations.c.response,
+    conversations.c.country, conversations.c.industry, conversations.c.confidence, conversations.c.created_at,
+]
+_CONVS_LATEST = (
+    select(*_CONV_COLUMNS)
+    .where(conversations.c.user_id == bindparam("user_id"))
+    .order_by(conversations.c.id.desc())
+    .limit(bindparam("limit"))
+)
+_CONVS_BEFORE = (
+    select(*_CONV_COLUMNS)
+    .where(conversations.c.user_id == bindparam("user_id"), conversations.c.id < bindparam("before"))
+    .order_by(conversations.c.id.desc())
+    .limit(bindparam("limit"))
+)
+_CONVS_AFTER = (
+    select(*_CONV_COLUMNS)
+    .where(conversations.c.user_id == bindparam("user_id"), conversations.c.id > bindparam("after"))
+    .order_by(conversations.c.id.asc())
+    .limit(bindparam("limit"))
+)
+_CONVS_EXPORT = (
+    select(*_CONV_COLUMNS)
+    .where(conversations.c.id > bindparam("after"))
+    .order_by(conversations.c.id.asc())
+    .limit(bindparam("limit"))
+)
+_USAGE = select(usage_counters.c.dimension, usage_counters.c.value, usage_counters.c.conversations)
+_SUMMARY = select(conversation_summaries.c.summary, conversation_summaries.c.through_id).where(
+    conversation_summaries.c.user_id == bindparam("user_id"))
+# the WHERE keeps a slower request from rolling the summary back
+_UPSERT_SUMMARY = ("INSERT INTO conversation_summaries (user_id, summary, through_id) VALUES (:user_id, :summary, :through_id) "
+                   "ON CONFLICT (user_id) DO UPDATE SET summary = excluded.summary, through_id = excluded.through_id "
+                   "WHERE conversation_summaries.through_id < excluded.through_id")
+
+
+def _epoch(value: Any) -> Optional[int]:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return value
+
+
+def _conversation_dict(row) -> Dict[str, Any]:
+    conv = dict(row._mapping)
+    conv["confidence"] = float(conv["confidence"]) if conv["confidence"] is not None else None
+    conv["created_at"] = _epoch(conv["created_at"])
+    return conv
+
+
+# ---------------- Users ----------------
+async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    row = await database.fetch_one(_USER_BY_EMAIL.params(email=email))
+    return dict(row._mapping) if row else None
+
+
+async def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+    row = await database.fetch_one(_USER_BY_ID.params(user_id=user_id))
+    return dict(row._mapping) if row else None
+
+
+async def create_user(name: str, email: str, country: Optional[str] = "ghana", industry: Optional[str] = "general") -> Dict[str, Any]:
+    values = {"name": name, "email": email, "country": country or "ghana", "industry": industry or "general"}
+    user_id = await database.execute(_INSERT_USER, values)
+    return {"id": user_id, **values}
+
+
+# ---------------- Conversations ----------------
+conversation_ids = IdAllocator(database, "conversations") if WRITE_BEHIND else None
+usage_keys = KeyFolder()
+usage_rollover = DayRollover()
+
+
+async def load_usage_keys():
+    # values already counted in earlier runs keep their rows instead of folding into "other"
+    rows = await database.fetch_all(_USAGE)
+    usage_keys.seed((r._mapping["dimension"], r._mapping["value"]) for r in rows)
+
+
+async def _count_usage(usage: Dict[Tuple[str, str], int]):
+    await database.execute(*upsert_query("usage_counters", usage))
+    if usage_rollover.due():
+        await database.execute(*prune_query("usage_counters"))
+
+
+async def _insert_conversations(rows: List[Dict[str, Any]]):
+    # each queued row carries its usage keys; the counters commit with the rows they count
+    usage = tally(row["usage"] for row in rows)
+    async with database.transaction():
+        await database.execute(conversations.insert().values([{k: v for k, v in row.items() if k != "usage"} for row in rows]))
+        await _count_usage(usage)
+
+
+conversation_writer = WriteBehindQueue(_insert_conversations) if WRITE_BEHIND else None
+
+
+async def start_writers():
+    if conversation_writer:
+        await conversation_ids.start()
+        conversation_writer.start()
+
+
+async def stop_writers():
+    if conversation_writer:
+        await conversation_writer.stop()
+
+
+async def save_conversation(user_id: str, query: str, response: str, country: str, industry: str,
+                            confidence: float = 0.9, intent: Optional[str] = None) -> int:
+    values = {
+        "user_id": user_id, "query": query, "response": response,
+        "country": country, "industry": industry, "confidence": str(confidence),
+    }
+    usage = usage_keys.keys(country, industry, intent)
+    if conversation_writer:
+        (conversation_id,) = await conversation_ids.reserve(1)
+        await conversation_writer.submit([{"id": conversation_id, **values, "usage": usage}])
+        return conversation_id
+    async with database.transaction():
+        conversation_id = await database.execute(_INSERT_CONVERSATION, values)
+        await _count_usage(tally([usage]))
+    return conversation_id
+
+
+async def get_conversations_by_user(user_id: str, limit: int = 50, before: Optional[int] = None,
+                                    after: Optional[int] = None, drain: bool = True) -> Tuple[List[Dict[str, Any]], bool]:
+    # Keyset pagination over (user_id, id); one extra row tells us whether more exist.
+    if conversation_writer and drain:
+        await conversation_writer.drain()
+    if after is not None:
+        rows = await database.fetch_all(_CONVS_AFTER.params(user_id=user_id, after=after, limit=limit + 1))
+    elif before is not None:
+        rows = await database.fetch_all(_CONVS_BEFORE.params(user_id=user_id, before=before, limit=limit + 1))
+    else:
+        rows = await database.fetch_all(_CONVS_LATEST.params(user_id=user_id, limit=limit + 1))
+    has_more = len(rows) > limit
+    convs = [_conversation_dict(r) for r in rows[:limit]]
+    if after is None:
+        convs.reverse()
+    return convs, has_more
+
+
+async def usage_stats() -> dict:
+    if conversation_writer:
+        await conversation_writer.drain()
+    rows = await database.fetch_all(_USAGE)
+    return usage_snapshot((r._mapping["dimension"], r._mapping["value"], r._mapping["conversations"]) for r in rows)
+
+
+async def iter_conversations(after: int = 0, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    # keyset pages over the primary key, so memory stays at one page however large the table is
+    if conversation_writer:
+        await conversation_writer.drain()
+    while True:
+        rows = await database.fetch_all(_CONVS_EXPORT.params(after=after, limit=batch_size))
+        for row in rows:
+            yield _conversation_dict(row)
+        if len(rows) < batch_size:
+            return
+        after = rows[-1]._mapping["id"]
+
+
+async def get_summary(user_id: str) -> Tuple[str, int]:
+    row = await database.fetch_one(_SUMMARY.params(user_id=user_id))
+    return (row._mapping["summary"], row._mapping["through_id"]) if row else ("", 0)
+
+
+async def set_summary(user_id: str, summary: str, through_id: int):
+    await database.execute(_UPSERT_SUMMARY, {"user_id": user_id, "summary": summary, "through_id": through_id})
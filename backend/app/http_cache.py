@@ -0,0 +1,35 @@
+# http_cache.py — ETag / If-None-Match helpers for cacheable JSON responses
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "500"))
+
+
+def etag_for(*parts: Any) -> str:
+    # weak: gzip changes the bytes on the wire but not the meaning
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == opaque for tag in header.split(","))
+
+
+def cached_json(request: Request, etag: str, build, cache_control: str = "private, no-cache",
+                headers: Optional[Dict[str, str]] = None) -> Response:
+    """304 when the client already holds ``etag``; otherwise ``build()`` is called for the body.
+    Deciding before building means a revalidation never renders the payload."""
+    headers = {"ETag": etag, "Cache-Control": cache_control, **(headers or {})}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
@@ -0,0 +1,139 @@
+# intents.py — precompiled multilingual intent classifier
+import json
+import os
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+INTENTS_DIR = os.path.join(os.path.dirname(__file__), "data", "intents")
+
+# Ties between intents are broken in this order (the order analyze_query used to check them in)
+INTENT_PRIORITY = ("funding", "mobile_money", "legal_registration", "ubuntu")
+DEFAULT_INTENT = "general_business"
+
+
+def _priority(intent: str) -> int:
+    return INTENT_PRIORITY.index(intent) if intent in INTENT_PRIORITY else len(INTENT_PRIORITY)
+
+
+class IntentMatch(NamedTuple):
+    intent: str
+    score: int
+
+
+def normalize_text(text: str) -> str:
+    # lowercase and drop combining marks, so "levée"/"levee" and Yoruba tone marks compare equal
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: finds every keyword occurrence in one pass over the text.
+
+    Latin-script keywords must start at a word boundary (so "grant" does not fire
+    inside "immigrant"); other scripts match anywhere, since Arabic attaches
+    prefixes such as ال and و directly to the word.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, bool]]] = [[]]
+        self.size = 0
+        for keyword, intent in keywords:
+            self._add(keyword, intent)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, intent: str):
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(keyword), intent, keyword[0].isascii()))
+        self.size += 1
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> Dict[str, int]:
+        hits: Dict[str, int] = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, intent, word_start in out[state]:
+                start = i - length + 1
+                if word_start and start > 0 and text[start - 1].isalnum():
+                    continue
+                hits[intent] = hits.get(intent, 0) + 1
+        return hits
+
+
+def load_keyword_tables(directory: str = INTENTS_DIR) -> Dict[str, Dict[str, List[str]]]:
+    tables = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                tables[name[:-5]] = json.load(f)
+    return tables
+
+
+class IntentClassifier:
+    def __init__(self, tables: Dict[str, Dict[str, List[str]]]):
+        self.languages = sorted(tables)
+        keywords = {}
+        for table in tables.values():
+            for intent, words in table.items():
+                for word in words:
+                    keywords[normalize_text(word)] = intent
+        self.automaton = KeywordAutomaton(keywords.items())
+
+    @classmethod
+    def from_directory(cls, directory: str = INTENTS_DIR) -> "IntentClassifier":
+        return cls(load_keyword_tables(directory))
+
+    def classify(self, message: str) -> IntentMatch:
+        hits = self.automaton.scan(normalize_text(message))
+        if not hits:
+            return IntentMatch(DEFAULT_INTENT, 0)
+        best = max(hits, key=lambda intent: (hits[intent], -_priority(intent)))
+        return IntentMatch(best, hits[best])
+
+    def classify_many(self, messages: Iterable[str]) -> List[IntentMatch]:
+        seen: Dict[str, IntentMatch] = {}
+        results = []
+        for message in messages:
+            match = seen.get(message)
+            if match is None:
+                match = seen[message] = self.classify(message)
+            results.append(match)
+        return results
+
+
+intent_classifier = IntentClassifier.from_directory()
+
+
+def classify(message: str) -> IntentMatch:
+    return intent_classifier.classify(message)
+
+
+def classify_many(messages: Iterable[str]) -> List[IntentMatch]:
+    return intent_classifier.classify_many(messages)
@@ -0,0 +1,152 @@
+# knowledge_base.py — versioned knowledge base served from a memory-mapped snapshot
+#
+# The editable source is app/data/knowledge_base.json:
+#   {"version": "...", "sections": {section: {key: entry}}}
+# It is compiled into a snapshot laid out as
+#   MAGIC | u32 header length | header JSON | entry blobs
+# where the header holds the version, the source hash and the per-section /
+# per-country offset indexes. Workers mmap the snapshot (so the OS shares the
+# pages between processes) and only decode the entries they actually read.
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+KB_SOURCE_PATH = os.getenv("KB_SOURCE_PATH", os.path.join(DATA_DIR, "knowledge_base.json"))
+KB_SNAPSHOT_PATH = os.getenv("KB_SNAPSHOT_PATH", os.path.join(DATA_DIR, "knowledge_base.kbsnap"))
+
+MAGIC = b"AFKB\x01"
+_HEADER_LEN = struct.Struct("<I")
+# sections whose keys are countries; they feed the per-country index
+COUNTRY_SECTIONS = ("mobile_money_data", "business_registration")
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_snapshot(source_path: str = KB_SOURCE_PATH, snapshot_path: str = KB_SNAPSHOT_PATH) -> str:
+    with open(source_path, encoding="utf-8") as f:
+        source = json.load(f)
+    blobs: List[bytes] = []
+    index: Dict[str, Dict[str, List[int]]] = {}
+    countries: Dict[str, List[str]] = {}
+    offset = 0
+    for section, entries in source["sections"].items():
+        index[section] = {}
+        for key, entry in entries.items():
+            blob = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index[section][key] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+            if section in COUNTRY_SECTIONS:
+                countries.setdefault(key, []).append(section)
+    header = json.dumps({
+        "version": source.get("version", "0"),
+        "source_sha256": _sha256(source_path),
+        "index": index,
+        "countries": countries,
+    }, separators=(",", ":")).encode("utf-8")
+    # write next to the target and rename, so readers never observe a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+class KnowledgeBase:
+    def __init__(self, snapshot_path: str = KB_SNAPSHOT_PATH):
+        self.path = snapshot_path
+        with open(snapshot_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mtime = os.stat(snapshot_path).st_mtime_ns
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{snapshot_path} is not a knowledge base snapshot")
+        (header_len,) = _HEADER_LEN.unpack_from(self._mm, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(self._mm[header_start:header_start + header_len])
+        self._base = header_start + header_len
+        self.version: str = header["version"]
+        self.source_sha256: str = header["source_sha256"]
+        self._index: Dict[str, Dict[str, List[int]]] = header["index"]
+        self._countries: Dict[str, List[str]] = header["countries"]
+        self._decoded: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, section: str, key: str, default: Any = None) -> Any:
+        cached = self._decoded.get((section, key))
+        if cached is not None:
+            return cached
+        location = self._index.get(section, {}).get(key)
+        if location is None:
+            return default
+        offset, length = location
+        start = self._base + offset
+        value = json.loads(self._mm[start:start + length])
+        with self._lock:
+            self._decoded[(section, key)] = value
+        return value
+
+    def sections(self) -> List[str]:
+        return list(self._index)
+
+    def keys(self, section: str) -> List[str]:
+        return list(self._index.get(section, {}))
+
+    def countries(self) -> List[str]:
+        return list(self._countries)
+
+    def sections_for(self, country: str) -> List[str]:
+        return self._countries.get(country.lower(), [])
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "source_sha256": self.source_sha256[:12],
+            "sections": {name: len(entries) for name, entries in self._index.items()},
+            "countries": len(self._countries),
+            "decoded_entries": len(self._decoded),
+            "snapshot_bytes": len(self._mm),
+        }
+
+
+def _snapshot_is_current(source_path: str, snapshot_path: str) -> bool:
+    if not os.path.exists(snapshot_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    try:
+        return KnowledgeBase(snapshot_path).source_sha256 == _sha256(source_path)
+    except ValueError:
+        return False
+
+
+def load_knowledge_base(source_path: str = KB_SOURCE_PATH, snapshot_path: str = KB_SNAPSHOT_PATH,
+                        rebuild: bool = False) -> KnowledgeBase:
+    if rebuild or not _snapshot_is_current(source_path, snapshot_path):
+        build_snapshot(source_path, snapshot_path)
+    return KnowledgeBase(snapshot_path)
+
+
+def snapshot_changed(kb: Optional[KnowledgeBase]) -> bool:
+    try:
+        return kb is None or os.stat(kb.path).st_mtime_ns != kb.mtime
+    except FileNotFoundError:
+        return False
+
+
+if __name__ == "__main__":
+    # python -m app.knowledge_base  — compile the snapshot ahead of time (e.g. at image build)
+    path = build_snapshot()
+    print(f"Wrote {path} ({KnowledgeBase(path).stats()})")
@@ -0,0 +1,133 @@
+# language.py — in-process language detection and the pre-translated template sets
+#
+# Drafts and Sankofa lines are translated ahead of time (app/data/languages/<code>.json),
+# so a question asked in Swahili, Yoruba, French or Arabic is answered in that language
+# without asking Groq to translate. Arabic is recognised by its script; the Latin-script
+# languages by a character trigram model trained on each file's sample sentences and its
+# intent keywords. Short or ambiguous messages are answered in English.
+import functools
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from .intents import load_keyword_tables, normalize_text
+
+LANGUAGES_DIR = os.path.join(os.path.dirname(__file__), "data", "languages")
+DEFAULT_LANGUAGE = "en"
+LANGUAGE_DETECTION = os.getenv("LANGUAGE_DETECTION", "1") != "0"
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "4096"))
+# messages with fewer letters than this ("ok", "hello", a name) stay in English
+LANGUAGE_MIN_LETTERS = int(os.getenv("LANGUAGE_MIN_LETTERS", "12"))
+# how much better (mean log-probability per trigram) another language must score than English
+LANGUAGE_MIN_MARGIN = float(os.getenv("LANGUAGE_MIN_MARGIN", "0.2"))
+
+_ARABIC_RE = re.compile(r"[\u0600-\u06ff\u0750-\u077f\u08a0-\u08ff\ufb50-\ufdff\ufe70-\ufeff]")
+# a word keeps its combining marks, so Yoruba "ẹ́" stays one letter sequence
+_WORD_RE = re.compile(r"(?:[^\W\d_]|[\u0300-\u036f])+")
+
+
+def load_language_packs(directory: str = LANGUAGES_DIR) -> Dict[str, dict]:
+    packs = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                packs[name[:-5]] = json.load(f)
+    return packs
+
+
+def trigrams(text: str) -> List[str]:
+    grams = []
+    for word in _WORD_RE.findall(unicodedata.normalize("NFC", text.lower())):
+        padded = f" {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramModel:
+    """Add-one smoothed trigram likelihoods per language, kept as one gram -> scores table."""
+
+    def __init__(self, samples: Dict[str, Iterable[str]]):
+        self.languages = sorted(samples)
+        counts = {language: Counter(g for text in texts for g in trigrams(text)) for language, texts in samples.items()}
+        vocabulary = set().union(*counts.values())
+        totals = {language: sum(c.values()) + len(vocabulary) for language, c in counts.items()}
+        self.table = {gram: tuple(math.log((counts[language][gram] + 1) / totals[language]) for language in self.languages)
+                      for gram in vocabulary}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        sums = [0.0] * len(self.languages)
+        seen = 0
+        for gram in trigrams(text):
+            row = self.table.get(gram)
+            if row is None:
+                continue
+            seen += 1
+            for i, value in enumerate(row):
+                sums[i] += value
+        return {language: total / seen for language, total in zip(self.languages, sums)} if seen else {}
+
+
+def _training_samples(packs: Dict[str, dict]) -> Dict[str, List[str]]:
+    keywords = load_keyword_tables()
+    samples = {}
+    for language, pack in packs.items():
+        texts = list(pack.get("sample", []))
+        if texts:  # Arabic has no sample: it is recognised by script
+            texts += [word for words in keywords.get(language, {}).values() for word in words]
+            # also learn the unaccented spelling, which is how many people type on a phone
+            samples[language] = texts + [normalize_text(text) for text in texts]
+    return samples
+
+
+LANGUAGE_PACKS = load_language_packs()
+SUPPORTED_LANGUAGES = tuple(LANGUAGE_PACKS)
+language_model = TrigramModel(_training_samples(LANGUAGE_PACKS))
+
+
+@functools.lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def _detect(message: str) -> str:
+    letters = sum(ch.isalpha() for ch in message)
+    if letters and len(_ARABIC_RE.findall(message)) * 2 >= letters:
+        return "ar"
+    if letters < LANGUAGE_MIN_LETTERS:
+        return DEFAULT_LANGUAGE
+    scores = language_model.scores(message)
+    if not scores:
+        return DEFAULT_LANGUAGE
+    best = max(scores, key=scores.get)
+    if best != DEFAULT_LANGUAGE and scores[best] - scores.get(DEFAULT_LANGUAGE, -math.inf) < LANGUAGE_MIN_MARGIN:
+        return DEFAULT_LANGUAGE
+    return best
+
+
+def detect_language(message: Optional[str]) -> str:
+    if not LANGUAGE_DETECTION or not message:
+        return DEFAULT_LANGUAGE
+    return _detect(message)
+
+
+def language_pack(language: Optional[str]) -> dict:
+    return LANGUAGE_PACKS.get(language or DEFAULT_LANGUAGE) or LANGUAGE_PACKS[DEFAULT_LANGUAGE]
+
+
+def country_name(pack: dict, country: str) -> str:
+    return pack["countries"].get(country.lower()) or country.title()
+
+
+def localized_sankofa(language: Optional[str]) -> Optional[dict]:
+    """The translated Sankofa lines and labels, or None for English (kept in SankofaWisdom)."""
+    return language_pack(language).get("sankofa") if language != DEFAULT_LANGUAGE else None
+
+
+def sankofa_checklist(lines: dict) -> str:
+    return f"\n\n{lines['checklist_title']}:\n" + "\n".join(f"{n}. {item}" for n, item in enumerate(lines["checklist"], 1))
+
+
+def detection_stats() -> dict:
+    info = _detect.cache_info()
+    return {"enabled": LANGUAGE_DETECTION, "languages": list(SUPPORTED_LANGUAGES), "cache_size": info.currsize,
+            "cache_hits": info.hits, "cache_misses": info.misses}
@@ -0,0 +1,61 @@
+# lifecycle.py — background start-up work and the readiness state behind /health
+#
+# The server starts accepting connections as soon as the app is imported; anything
+# slower (schema creation, draft warm-up, importing the Groq SDK) runs as a named
+# background step. Required steps gate readiness, optional ones are only reported.
+import asyncio
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class Readiness:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.required: Dict[str, bool] = {}
+        self.done: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def expect(self, name: str, required: bool = True):
+        self.required[name] = required
+
+    def mark(self, name: str):
+        self.done[name] = round(time.monotonic() - self.started, 4)
+
+    def fail(self, name: str, error: str):
+        self.errors[name] = error
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self.done for name, required in self.required.items() if required)
+
+    def pending(self):
+        return [name for name in self.required if name not in self.done]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "completed": self.done,
+            "pending": self.pending(),
+            "errors": self.errors,
+        }
+
+
+def run_step(readiness: Readiness, name: str, step: Callable[[], Awaitable[None]], required: bool = True,
+             after: Optional[asyncio.Task] = None) -> asyncio.Task:
+    """Schedule ``step`` in the background (after ``after`` finishes, if given) and record it."""
+    readiness.expect(name, required)
+
+    async def runner():
+        if after is not None:
+            await asyncio.shield(after)
+        try:
+            await step()
+        except Exception as e:
+            traceback.print_exc()
+            readiness.fail(name, str(e))
+            return
+        readiness.mark(name)
+
+    return asyncio.create_task(runner())
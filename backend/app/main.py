@@ -1,9 +1,16 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from .core.config import settings
 from .database import database, metadata, engine
-from .routers import auth, chat, history
-from . import models
+from .routers import admin, auth, chat, history
+from . import models, ai_client, db
+from .afiyor import professional_afiyor
+from .metrics import MetricsMiddleware, registry
+from .http_cache import GZIP_MIN_SIZE
+from .lifecycle import Readiness, run_step
 
 app = FastAPI(title="AfiYor API", version="2.0")
 
@@ -14,23 +21,55 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
 # Startup / shutdown events
+readiness = Readiness()
+
+async def create_schema():
+    # create tables if they don't exist; the sync engine runs on a worker thread
+    await asyncio.to_thread(metadata.create_all, bind=engine)
+
+async def warm_drafts():
+    professional_afiyor.warm()
+
 @app.on_event("startup")
 async def startup():
-    await database.connect()
-    # create tables if they don't exist
-    metadata.create_all(bind=engine)
+    connected = run_step(readiness, "database", database.connect)
+    schema = run_step(readiness, "schema", create_schema, after=connected)
+    run_step(readiness, "usage", db.load_usage_keys, after=schema)
+    run_step(readiness, "writers", db.start_writers, after=schema)
+    run_step(readiness, "drafts", warm_drafts, required=False)
+    run_step(readiness, "groq_client", ai_client.prewarm, required=False)
 
 @app.on_event("shutdown")
 async def shutdown():
+    await ai_client.shutdown()
+    await db.stop_writers()
     await database.disconnect()
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(history.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
     return {"name": "AfiYor API", "version": "2.0", "status": "ok"}
+
+@app.get("/health/live")
+def health_live():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def health_ready():
+    if not readiness.ready:
+        return JSONResponse({"status": "starting", **readiness.stats()}, status_code=503)
+    return {"status": "ready", **readiness.stats()}
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,189 @@
+# metrics.py — in-process counters, gauges and latency histograms with Prometheus text output
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _fmt_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_fmt_labels(k)} {v:g}" for k, v in self._values.items()]
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self._values[_labels(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram. p50/p95/p99 are estimated from the buckets at scrape
+    time, so observing a value is one bisect and three additions."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._series: Dict[Labels, list] = {}  # labels -> [bucket counts..., +Inf count], sum, count
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, q: float, counts: List[int], total: int) -> float:
+        # linear interpolation inside the bucket holding the q-th observation
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, counts):
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        quantile_lines = [f"# HELP {self.name}_quantile Estimated latency quantiles from {self.name}",
+                          f"# TYPE {self.name}_quantile gauge"]
+        for key, (counts, total_sum, total) in self._series.items():
+            cumulative = 0
+            for upper, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', f'{upper:g}')])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, [('le', '+Inf')])} {total}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {total_sum:.6f}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {total}")
+            for q in QUANTILES:
+                quantile_lines.append(f"{self.name}_quantile{_fmt_labels(key, [('quantile', f'{q:g}')])} {self.quantile(q, counts, total):.6f}")
+        return lines + quantile_lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._add(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._add(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], List[str]]):
+        # fn renders values owned elsewhere (cache, breaker, ...) only when scraped
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for fn in self._collectors:
+            lines += fn()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_latency = registry.histogram("afiyor_stage_duration_seconds", "Time spent in each /chat pipeline stage")
+http_latency = registry.histogram("afiyor_http_request_duration_seconds", "HTTP request latency by route")
+http_requests = registry.counter("afiyor_http_requests_total", "HTTP requests by route, method and status")
+http_in_flight = registry.gauge("afiyor_http_requests_in_flight", "HTTP requests currently being served")
+groq_calls = registry.counter("afiyor_groq_calls_total", "Groq refinement attempts by outcome")
+context_tokens = registry.histogram("afiyor_context_tokens", "Estimated prompt tokens of multi-turn context per refinement",
+                                    buckets=(0, 50, 100, 200, 300, 400, 600, 800, 1200, 1600))
+admission_decisions = registry.counter("afiyor_admission_decisions_total", "Rate limit and load shedding decisions by layer and outcome")
+refinement_fallbacks = registry.counter("afiyor_refinement_fallbacks_total", "Responses served from the local draft because refinement failed or was skipped")
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - started, stage=stage)
+
+
+def simple_metric(name: str, kind: str, help_text: str, values: Dict[str, float], label: str = "") -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for key, value in values.items():
+        lines.append(f"{name}{_fmt_labels(((label, key),)) if label else ''} {value:g}")
+    return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every request, labelled by the matched route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_latency.observe(time.perf_counter() - started, route=path)
+            http_requests.inc(route=path, method=scope["method"], status=str(status["code"]))
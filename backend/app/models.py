@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Table, Column, BigInteger, Integer, String, Text, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from .database import metadata
 
@@ -25,3 +25,24 @@ conversations = Table(
     Column("confidence", String(10), default="0.9"),
     Column("created_at", DateTime, server_default=func.now())
 )
+
+# keyset pagination for /history walks (user_id, id)
+Index("ix_conversations_user_id_id", conversations.c.user_id, conversations.c.id)
+
+# rolling summary of turns that no longer fit the multi-turn context budget (see context.py)
+conversation_summaries = Table(
+    "conversation_summaries",
+    metadata,
+    Column("user_id", String(100), primary_key=True),
+    Column("summary", Text, nullable=False),
+    Column("through_id", Integer, nullable=False)
+)
+
+# running conversation counts per (country|industry|intent|day, value) for /admin/stats (see usage.py)
+usage_counters = Table(
+    "usage_counters",
+    metadata,
+    Column("dimension", String(20), primary_key=True),
+    Column("value", String(100), primary_key=True),
+    Column("conversations", BigInteger, nullable=False, default=0)
+)
@@ -0,0 +1,39 @@
+import hmac
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from .. import db
+from ..core.config import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def require_admin(request: Request):
+    # fail closed: without ADMIN_TOKEN the admin routes don't exist
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/stats")
+async def usage_stats(request: Request):
+    require_admin(request)
+    # running counters maintained on insert; never scans history
+    return await db.usage_stats()
+
+@router.get("/conversations/export")
+async def export_conversations(request: Request, after: int = Query(0, ge=0)):
+    # NDJSON, one conversation per line, oldest first; ?after=<last id> resumes an interrupted export
+    require_admin(request)
+
+    async def lines():
+        chunk = []
+        async for conv in db.iter_conversations(after):
+            chunk.append(json.dumps(conv, ensure_ascii=False) + "\n")
+            if len(chunk) >= 100:
+                yield "".join(chunk)
+                chunk.clear()
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="afiyor-conversations.ndjson"'})
@@ -1,23 +1,58 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException
 from ..schemas import ChatRequest, ChatResponse
 from .. import sankofa, ai_client, db
+from ..afiyor import professional_afiyor
+from ..language import detect_language
+from ..metrics import context_tokens, refinement_fallbacks, timed
+from ..context import CONTEXT_FETCH_TURNS, Turn, plan_context, wants_context
 from ..core.config import settings
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+async def conversation_context(user_id: Optional[str], message: str) -> Optional[str]:
+    if not wants_context(user_id, message):
+        return None
+    # no drain: a turn still in the write-behind queue is left out rather than waited for
+    convs, _ = await db.get_conversations_by_user(user_id, limit=CONTEXT_FETCH_TURNS, drain=False)
+    if not convs:
+        return None
+    summary, through = await db.get_summary(user_id)
+    plan = plan_context([Turn(c["id"], c["query"], c["response"]) for c in convs], summary, through)
+    if plan.summarized_through != through:
+        await db.set_summary(user_id, plan.summary, plan.summarized_through)
+    context_tokens.observe(plan.tokens)
+    return plan.text
+
 @router.post("/", response_model=ChatResponse)
 async def chat_endpoint(req: ChatRequest):
     try:
-        draft = db.generate_afiyor_draft(req.message, req.country or "ghana", req.industry or "general")
+        with timed("analyze"):
+            intent = professional_afiyor.analyze_query(req.message)
+            language = detect_language(req.message)
+        with timed("draft"):
+            draft = professional_afiyor.render_draft(professional_afiyor.draft_key(req.message, req.country or "ghana", req.industry or "general",
+                                                                                   intent=intent, language=language))
         refined = None
         ai_error = None
         if ai_client.groq_client:
-            try:
-                refined = ai_client.generate_ai_message(draft, req.message, req.country, req.industry, tone="business_coach")
-            except Exception as e:
-                ai_error = str(e)
-        final = sankofa.apply_sankofa_full_hybrid(refined if refined else draft, req.message)
-        conv = db.save_conversation(req.user_id or "anonymous", req.message, final, req.country or "ghana", req.industry or "general")
-        return ChatResponse(response=final, confidence=0.9, conversation_id=conv.id, ai_error=ai_error)
+            with timed("context"):
+                context = await conversation_context(req.user_id, req.message)
+            with timed("refine"):
+                try:
+                    refined, ai_error = await ai_client.generate_ai_message(draft, req.message, req.country, req.industry,
+                                                                            tone="business_coach", context=context,
+                                                                            language=language)
+                except Exception as e:
+                    ai_error = str(e)
+            if not refined:
+                refinement_fallbacks.inc(route="/chat/")
+        with timed("sankofa"):
+            final = sankofa.apply_sankofa_full_hybrid(refined if refined else draft, req.message, language)
+        confidence = 0.9 if refined else 0.85
+        with timed("persist"):
+            conversation_id = await db.save_conversation(req.user_id or "anonymous", req.message, final, req.country or "ghana", req.industry or "general", confidence, intent=intent)
+        return ChatResponse(response=final, confidence=confidence, conversation_id=conversation_id, ai_error=ai_error,
+                            language=language)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Chat processing failed")
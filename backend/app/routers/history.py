@@ -1,9 +1,31 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from .. import db
+from ..http_cache import cached_json, etag_for
+from ..write_behind import ORDERED_IDS
 
 router = APIRouter(prefix="/history", tags=["history"])
 
 @router.get("/{user_id}")
-async def get_history(user_id: str):
-    convs = db.get_conversations_by_user(user_id)
-    return {"conversations": convs}
+async def get_history(user_id: str, request: Request,
+                      limit: int = Query(50, ge=1, le=200),
+                      before: Optional[int] = None,
+                      after: Optional[int] = None,
+                      since: Optional[int] = None):
+    # ?since=<page.after> returns only conversations newer than the last one the client holds
+    if since is not None:
+        after = since if after is None else max(after, since)
+    if not ORDERED_IDS:
+        # write-behind ids can commit out of order, so a cursor could skip rows; send the latest page
+        after = None
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either before or after/since, not both")
+    convs, has_more = await db.get_conversations_by_user(user_id, limit=limit, before=before, after=after)
+    # stored rows are never updated, so their ids identify the page
+    etag = etag_for("history", user_id, has_more, after, *(c["id"] for c in convs))
+    return cached_json(request, etag, lambda: {
+        "conversations": convs,
+        "before": convs[0]["id"] if convs and has_more and after is None else None,
+        "after": (convs[-1]["id"] if convs else after) if ORDERED_IDS else None,
+        "has_more": has_more,
+    })
@@ -1,4 +1,34 @@
+import hashlib
+import os
 import random
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+
+from .cache import normalize_message
+from .language import DEFAULT_LANGUAGE, localized_sankofa, sankofa_checklist
+
+# "daily": the same question gets the same lines for the whole (UTC) day, so answers can be
+# cached by browsers and CDNs; "random": a fresh pick on every request
+SANKOFA_MODE = os.getenv("SANKOFA_MODE", "daily")
+
+
+def sankofa_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def seconds_until_next_day() -> int:
+    now = datetime.now(timezone.utc)
+    return 86400 - (now.hour * 3600 + now.minute * 60 + now.second)
+
+
+def seeded_indices(message: Optional[str], sizes: Sequence[int], day: Optional[str] = None) -> Optional[Tuple[int, ...]]:
+    """One index per list in ``sizes``, derived from the normalized message and the day;
+    None when selection is random (SANKOFA_MODE=random or no message)."""
+    if message is None or SANKOFA_MODE == "random":
+        return None
+    seed = f"{normalize_message(message)}\x1f{day or sankofa_day()}".encode("utf-8")
+    digest = hashlib.blake2b(seed, digest_size=2 * len(sizes)).digest()
+    return tuple(int.from_bytes(digest[2 * i:2 * i + 2], "big") % size for i, size in enumerate(sizes))
 
 class SankofaWisdom:
     UBUNTU_QUOTES = [
@@ -31,10 +61,19 @@ class SankofaWisdom:
 
 sankofa = SankofaWisdom()
 
-def apply_sankofa_full_hybrid(ai_text, user_message):
-    opening = sankofa.get_success_wisdom()
-    proverb = sankofa.get_african_proverb()
-    ubuntu = sankofa.get_ubuntu_quote()
+def apply_sankofa_full_hybrid(ai_text, user_message, language=DEFAULT_LANGUAGE):
+    lines = localized_sankofa(language)
+    success, proverbs, quotes = ((lines["success"], lines["proverbs"], lines["ubuntu"]) if lines else
+                                 (sankofa.SUCCESS_WISDOM, sankofa.AFRICAN_PROVERBS, sankofa.UBUNTU_QUOTES))
+    seeded = seeded_indices(user_message, (len(success), len(proverbs), len(quotes)))
+    if seeded:
+        opening, proverb, ubuntu = success[seeded[0]], proverbs[seeded[1]], quotes[seeded[2]]
+    else:
+        opening, proverb, ubuntu = random.choice(success), random.choice(proverbs), random.choice(quotes)
+    if lines:
+        ai_text = ai_text or lines["fallback"]
+        return (f"{opening}\n\n{ai_text}\n\n{lines['proverb_label']}: {proverb}\n"
+                f"{lines['ubuntu_label']}: {ubuntu}{sankofa_checklist(lines)}")
     if not ai_text:
         ai_text = "I'm unable to reach the AI service right now. Here's the best guidance I can offer from AfiYor's knowledge base."
     checklist = "\n\nAction checklist:\n1. Validate local requirements and contacts.\n2. Prepare 1-page pitch + 3 key metrics.\n3. Reach out to at least 3 local partners/VCs."
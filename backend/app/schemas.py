@@ -29,3 +29,4 @@ class ChatResponse(BaseModel):
     confidence: float
     conversation_id: Optional[int] = None
     ai_error: Optional[str] = None
+    language: Optional[str] = None
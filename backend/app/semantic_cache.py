@@ -0,0 +1,249 @@
+# semantic_cache.py — near-duplicate lookup for refined answers
+#
+# Paraphrases ("how to get seed funding in Accra", "seed investors Ghana?") miss the exact
+# refinement cache. Each question is reduced to a set of canonical terms (stopwords and the
+# request's own country's place names dropped, light stemming, a small synonym table) and
+# indexed with MinHash LSH inside its (draft key, country, industry, tone) bucket. LSH only proposes candidates; an
+# answer is served when the exact Jaccard similarity of the two term sets reaches
+# SEMANTIC_CACHE_THRESHOLD.
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, NamedTuple, Optional, Set, Tuple
+
+from .cache import REFINE_CACHE_SIZE, REFINE_CACHE_TTL
+from .intents import normalize_text
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1") != "0"
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", str(REFINE_CACHE_SIZE)))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.75"))
+# questions with fewer terms than this are too vague to match on anything but the exact cache
+SEMANTIC_CACHE_MIN_TERMS = int(os.getenv("SEMANTIC_CACHE_MIN_TERMS", "2"))
+
+# 10 bands of 3 rows: pairs at J=0.75 collide in some band >99% of the time, pairs at J=0.33 ~30%
+LSH_BANDS = 10
+LSH_ROWS = 3
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(LSH_BANDS * LSH_ROWS)]
+
+_WORD_RE = re.compile(r"[^\W_]+(?:[-'][^\W_]+)*")
+
+STOPWORDS = frozenset("""
+a an the and or but if of in on at to for from by with about into over under as is are was were be been
+being am do does did doing have has had can could should would will shall may might must i me my we our
+you your he she it its they them their this that these those there here what which who whom whose when
+where why how any some all each much many more most very just also so than too yes please thanks
+thank hi hello get getting got find need needs want wants know tell give show help best good way ways
+options option tips advice like some other one new
+comment pour les des une un le la de du en au aux et ou est sont je nous vous mon ma mes
+""".split())
+
+# Place names are only noise when they name the bucket's own country ("in Accra" on a Ghana
+# request); any other place is what the question is about, so it stays a term and
+# "register in Kenya" never matches "register in Nigeria".
+REGION_WORDS = frozenset(("africa", "african"))
+PLACES: Dict[str, FrozenSet[str]] = {country: frozenset(names.split()) for country, names in {
+    "ghana": "ghana ghanaian accra kumasi tamale takoradi",
+    "nigeria": "nigeria nigerian lagos abuja ibadan kano port-harcourt",
+    "kenya": "kenya kenyan nairobi mombasa kisumu",
+    "south_africa": "south africa african johannesburg joburg cape town durban pretoria",
+    "egypt": "egypt egyptian cairo alexandria",
+    "ethiopia": "ethiopia ethiopian addis ababa",
+}.items()}
+
+# words that ask the same question; each group collapses to its first word
+SYNONYMS = [
+    ("funding", "fund", "funds", "funder", "investor", "investment", "invest", "capital", "financing",
+     "finance", "fundraising", "fundraise", "raise", "raising", "financement"),
+    ("register", "registration", "registering", "incorporate", "incorporation", "incorporating", "formalize",
+     "formalise", "enregistrement"),
+    ("license", "licence", "licensing", "permit", "permits"),
+    ("business", "company", "startup", "start-up", "venture", "firm", "enterprise", "entreprise"),
+    ("cost", "price", "fee", "fees", "charge", "charges", "expensive", "cheap"),
+    ("mobile_money", "momo", "mpesa", "m-pesa"),
+    ("payment", "payments", "pay", "paying"),
+    ("customer", "customers", "client", "clients", "buyer", "buyers"),
+    ("grow", "growth", "growing", "scale", "scaling", "expand", "expansion"),
+    ("start", "starting", "launch", "launching", "begin", "open"),
+]
+CANONICAL: Dict[str, str] = {word: group[0] for group in SYNONYMS for word in group}
+
+
+def stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def terms(message: str, country: Optional[str] = None) -> FrozenSet[str]:
+    out: Set[str] = set()
+    home = PLACES.get((country or "").lower().replace(" ", "_"), frozenset())
+    text = normalize_text(message).replace("mobile money", "momo")
+    for word in _WORD_RE.findall(text):
+        if word in STOPWORDS or word in REGION_WORDS or word in home or word.isdigit():
+            continue
+        word = CANONICAL.get(word) or CANONICAL.get(stem(word)) or stem(word)
+        if word not in STOPWORDS:
+            out.add(word)
+    return frozenset(out)
+
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def signature(features: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [_term_hash(t) for t in features]
+    mins = [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+    return tuple(hash(tuple(mins[i:i + LSH_ROWS])) for i in range(0, len(mins), LSH_ROWS))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class SemanticBucket(NamedTuple):
+    draft_key: tuple
+    country: str
+    industry: str
+    tone: str
+
+
+class _Entry(NamedTuple):
+    key: Tuple[Hashable, FrozenSet[str]]
+    bucket: Hashable
+    features: FrozenSet[str]
+    bands: Tuple[int, ...]
+    value: str
+    expires_at: float
+
+
+class SemanticCache:
+    """Bounded LRU + TTL store of answers, looked up by term-set similarity within a bucket."""
+
+    def __init__(self, maxsize: int = SEMANTIC_CACHE_SIZE, ttl: float = REFINE_CACHE_TTL,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, min_terms: int = SEMANTIC_CACHE_MIN_TERMS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.min_terms = min_terms
+        # entries are numbered so the band index holds small ints rather than (bucket, terms) keys
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._ids: Dict[Tuple[Hashable, FrozenSet[str]], int] = {}
+        self._index: Dict[Tuple[Hashable, int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.candidates = 0
+        self.similarity_total = 0.0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _unlink(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        del self._ids[entry.key]
+        for band, value in enumerate(entry.bands):
+            slot = self._index.get((entry.bucket, band, value))
+            if slot is not None:
+                slot.discard(entry_id)
+                if not slot:
+                    del self._index[(entry.bucket, band, value)]
+
+    def get(self, message: str, bucket: Hashable) -> Optional[str]:
+        features = terms(message, getattr(bucket, "country", None))
+        if len(features) < self.min_terms:
+            self.skipped += 1
+            return None
+        bands = signature(features)
+        now = time.monotonic()
+        with self._lock:
+            seen = set()
+            for band, value in enumerate(bands):
+                seen.update(self._index.get((bucket, band, value), ()))
+            self.candidates += len(seen)
+            best_id, best = None, 0.0
+            size = len(features)
+            for entry_id in seen:
+                entry = self._entries[entry_id]
+                if entry.expires_at < now:
+                    self._unlink(entry_id)
+                    self.expirations += 1
+                    continue
+                # |A & B| / |A | B| <= min / max of the sizes, so lopsided pairs can be skipped unseen
+                other = len(entry.features)
+                if min(size, other) < self.threshold * max(size, other):
+                    continue
+                similarity = jaccard(features, entry.features)
+                if similarity > best:
+                    best_id, best = entry_id, similarity
+            if best_id is None or best < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            self.similarity_total += best
+            return self._entries[best_id].value
+
+    def set(self, message: str, bucket: Hashable, value: str):
+        features = terms(message, getattr(bucket, "country", None))
+        if self.maxsize <= 0 or len(features) < self.min_terms:
+            return
+        key = (bucket, features)
+        bands = signature(features)
+        with self._lock:
+            if key in self._ids:
+                self._unlink(self._ids[key])
+            entry_id = self._ids[key] = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(key, bucket, features, bands, value, time.monotonic() + self.ttl)
+            for band, band_value in enumerate(bands):
+                self._index.setdefault((bucket, band, band_value), set()).add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._unlink(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> int:
+        with self._lock:
+            flushed = len(self._entries)
+            self._entries.clear()
+            self._ids.clear()
+            self._index.clear()
+            return flushed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_candidates": round(self.candidates / lookups, 2) if lookups else 0.0,
+            "avg_hit_similarity": round(self.similarity_total / self.hits, 4) if self.hits else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def semantic_bucket(draft_key: tuple, country: str, industry: str, tone: str) -> SemanticBucket:
+    # answers are only reused for the same draft, which pins the intent, the funding stage and
+    # the language ("financement" and "funding" share a term)
+    return SemanticBucket(draft_key, (country or "").lower(), (industry or "").lower(), tone or "")
+
+
+semantic_cache = SemanticCache(maxsize=SEMANTIC_CACHE_SIZE if SEMANTIC_CACHE_ENABLED else 0)
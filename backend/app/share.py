@@ -0,0 +1,42 @@
+# share.py — share-link snapshots, pre-rendered for GET /share/{id}
+#
+# A share freezes the conversation as it was rendered when shared; it never changes
+# afterwards, so the JSON body and its gzip form are built once and kept in an LRU.
+# Its owner can delete it, so clients only keep it for a short SHARE_MAX_AGE and then
+# revalidate with its ETag: the worker handling the DELETE drops its copy at once, other
+# workers' copies expire after SHARE_CACHE_TTL, and browser or CDN copies after SHARE_MAX_AGE.
+import gzip
+import json
+import os
+import re
+import secrets
+from typing import Any, Dict, NamedTuple
+
+from .cache import LRUTTLCache
+from .http_cache import etag_for
+
+SHARE_CACHE_SIZE = int(os.getenv("SHARE_CACHE_SIZE", "1024"))
+SHARE_CACHE_TTL = float(os.getenv("SHARE_CACHE_TTL", "600"))
+SHARE_MAX_AGE = int(os.getenv("SHARE_MAX_AGE", "300"))
+SHARE_TITLE_MAX = 120
+
+SHARE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+class RenderedShare(NamedTuple):
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def new_share_id() -> str:
+    # 48 random bits: short enough for a link, not guessable from the conversation id
+    return secrets.token_urlsafe(6)
+
+
+def render_share(share: Dict[str, Any]) -> RenderedShare:
+    body = json.dumps(share, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return RenderedShare(body, gzip.compress(body, compresslevel=9), etag_for("share", share["share_id"]))
+
+
+share_cache = LRUTTLCache(maxsize=SHARE_CACHE_SIZE, ttl=SHARE_CACHE_TTL)
@@ -0,0 +1,135 @@
+# usage.py — running conversation counts per country / industry / intent / day
+#
+# Counters are bumped as conversations are stored, so /admin/stats reads a handful of
+# small maps (or one small table) instead of scanning history. Country and industry come
+# straight from request bodies, so each dimension keeps at most USAGE_MAX_KEYS distinct
+# values; anything new past that is counted under "other". SQL stores seed the fold from
+# the stored counters at startup, so the cap holds across restarts and workers (up to
+# the values each worker first sees before it learns of the others'). Day counters older
+# than USAGE_DAYS are deleted when a worker's clock rolls over to a new day.
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+USAGE_MAX_KEYS = int(os.getenv("USAGE_MAX_KEYS", "200"))
+USAGE_DAYS = int(os.getenv("USAGE_DAYS", "90"))
+USAGE_KEY_LENGTH = 40
+
+DIMENSIONS = ("country", "industry", "intent", "day")
+OTHER = "other"
+
+UsageKey = Tuple[str, str]  # (dimension, value)
+
+
+def usage_day(created_at: Optional[float] = None) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(created_at if created_at is not None else time.time()))
+
+
+def first_day(days: int = USAGE_DAYS) -> str:
+    return usage_day(time.time() - (days - 1) * 86400)
+
+
+class KeyFolder:
+    """Remembers the distinct values seen per dimension and folds new ones into OTHER past the cap."""
+
+    def __init__(self, max_keys: int = USAGE_MAX_KEYS):
+        self.max_keys = max_keys
+        self.seen: Dict[str, set] = {dimension: set() for dimension in DIMENSIONS}
+
+    def seed(self, keys: Iterable[UsageKey]):
+        # values already counted keep their own row; they are taken up to the cap like new ones
+        for dimension, value in keys:
+            seen = self.seen.get(dimension)
+            if seen is not None and dimension != "day" and value != OTHER and len(seen) < self.max_keys:
+                seen.add(value)
+
+    def fold(self, dimension: str, value: Optional[str]) -> str:
+        value = (value or "unknown").strip().lower()[:USAGE_KEY_LENGTH] or "unknown"
+        seen = self.seen[dimension]
+        if value in seen or dimension == "day":
+            return value
+        if len(seen) >= self.max_keys:
+            return OTHER
+        seen.add(value)
+        return value
+
+    def keys(self, country: Optional[str], industry: Optional[str], intent: Optional[str],
+             created_at: Optional[float] = None) -> List[UsageKey]:
+        return [("country", self.fold("country", country)), ("industry", self.fold("industry", industry)),
+                ("intent", self.fold("intent", intent)), ("day", usage_day(created_at))]
+
+
+def tally(key_lists: Iterable[List[UsageKey]]) -> Dict[UsageKey, int]:
+    """Collapse a batch of per-conversation keys into one increment per (dimension, value)."""
+    counts: Counter = Counter()
+    for keys in key_lists:
+        counts.update(keys)
+    return dict(counts)
+
+
+def upsert_query(table: str, counts: Dict[UsageKey, int]) -> Tuple[str, Dict[str, int]]:
+    """One multi-row upsert adding ``counts`` to a (dimension, value, conversations) table;
+    the ON CONFLICT form works on SQLite and Postgres alike."""
+    placeholders, values = [], {}
+    for n, ((dimension, value), count) in enumerate(counts.items()):
+        placeholders.append(f"(:dimension_{n}, :value_{n}, :count_{n})")
+        values.update({f"dimension_{n}": dimension, f"value_{n}": value, f"count_{n}": count})
+    query = (f"INSERT INTO {table} (dimension, value, conversations) VALUES {', '.join(placeholders)} "
+             f"ON CONFLICT (dimension, value) DO UPDATE SET conversations = {table}.conversations + excluded.conversations")
+    return query, values
+
+
+class DayRollover:
+    """Tells a writer when the UTC day has changed since it last pruned old day counters."""
+
+    def __init__(self):
+        self.day: Optional[str] = None
+
+    def due(self) -> bool:
+        today = usage_day()
+        if today == self.day:
+            return False
+        self.day = today
+        return True
+
+
+def prune_query(table: str, days: int = USAGE_DAYS) -> Tuple[str, Dict[str, str]]:
+    """Delete the day counters /admin/stats no longer reports."""
+    return f"DELETE FROM {table} WHERE dimension = 'day' AND value < :since", {"since": first_day(days)}
+
+
+def usage_snapshot(rows: Iterable[Tuple[str, str, int]], days: int = USAGE_DAYS) -> dict:
+    """Shape (dimension, value, count) rows for /admin/stats: biggest first, days in order."""
+    since = first_day(days)
+    grouped: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, value, count in rows:
+        if dimension in grouped and (dimension != "day" or value >= since):
+            grouped[dimension][value] = int(count)
+    snapshot = {dimension: dict(sorted(values.items(), key=lambda item: -item[1]))
+                for dimension, values in grouped.items() if dimension != "day"}
+    snapshot["day"] = dict(sorted(grouped["day"].items()))
+    return {"total": sum(snapshot["intent"].values()), **snapshot}
+
+
+class UsageCounters:
+    """In-process counters for the memory store."""
+
+    def __init__(self):
+        self.folder = KeyFolder()
+        self.counts: Dict[UsageKey, int] = {}
+
+    def add(self, country: Optional[str], industry: Optional[str], intent: Optional[str],
+            created_at: Optional[float] = None):
+        for key in self.folder.keys(country, industry, intent, created_at):
+            if key not in self.counts and key[0] == "day":
+                self.prune()
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def prune(self, days: int = USAGE_DAYS):
+        since = first_day(days)
+        for key in [key for key in self.counts if key[0] == "day" and key[1] < since]:
+            del self.counts[key]
+
+    def snapshot(self, days: int = USAGE_DAYS) -> dict:
+        return usage_snapshot(((dimension, value, count) for (dimension, value), count in self.counts.items()), days)
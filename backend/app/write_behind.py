@@ -0,0 +1,173 @@
+# write_behind.py — take conversation inserts off the response path
+#
+# Ids are handed out from blocks reserved in the database (one UPDATE per block,
+# atomic across workers), so a conversation id can be returned before its row is
+# written. Rows then go through a bounded queue that a background task drains
+# into multi-row INSERTs. Within one worker ids increase with time; between
+# workers they interleave by block, so rows do not become visible in id order:
+# a worker can commit id 10 after another worker already committed id 70. An
+# "everything after id N" cursor would skip such rows, which is why the history
+# after=/since= cursors are turned off while WRITE_BEHIND is on (ORDERED_IDS).
+import asyncio
+import os
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "1") == "1"
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", "100"))
+WRITE_BEHIND_DELAY_MS = float(os.getenv("WRITE_BEHIND_DELAY_MS", "50"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+WRITE_BEHIND_RETRIES = int(os.getenv("WRITE_BEHIND_RETRIES", "3"))
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "64"))
+# whether a row with a higher id is always visible no later than every row with a lower one
+ORDERED_IDS = not WRITE_BEHIND
+
+_ID_BLOCKS_DDL = "CREATE TABLE IF NOT EXISTS afiyor_id_blocks (name VARCHAR(100) PRIMARY KEY, next_id BIGINT NOT NULL)"
+# "WHERE 1 = 1" keeps SQLite from parsing ON CONFLICT as part of the SELECT
+_SEED_BLOCK = ("INSERT INTO afiyor_id_blocks (name, next_id) "
+               "SELECT :name, COALESCE(MAX(id), 0) + 1 FROM {table} WHERE 1 = 1 ON CONFLICT (name) DO NOTHING")
+# rows inserted while WRITE_BEHIND was off took ids from the table's own sequence; skip past them
+_CATCH_UP_BLOCK = ("UPDATE afiyor_id_blocks SET next_id = (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}) "
+                   "WHERE name = :name AND next_id <= (SELECT COALESCE(MAX(id), 0) FROM {table})")
+_TAKE_BLOCK = "UPDATE afiyor_id_blocks SET next_id = next_id + :size WHERE name = :name RETURNING next_id"
+# and the other way round: keep the BIGSERIAL sequence past every reserved id, so switching
+# WRITE_BEHIND off later doesn't hand out ids that are already taken
+_ADVANCE_SEQUENCE = "SELECT setval(pg_get_serial_sequence('{table}', 'id'), :last_id)"
+
+
+class IdAllocator:
+    def __init__(self, database, table: str, block_size: int = ID_BLOCK_SIZE):
+        self.database = database
+        self.table = table
+        self.block_size = block_size
+        self._next = 0
+        self._limit = 0
+        self._lock = asyncio.Lock()
+        self.postgres = database.url.dialect.startswith("postgres")
+
+    async def start(self):
+        await self.database.execute(_ID_BLOCKS_DDL)
+        await self.database.execute(_SEED_BLOCK.format(table=self.table), {"name": self.table})
+        await self.database.execute(_CATCH_UP_BLOCK.format(table=self.table), {"name": self.table})
+
+    async def _take_block(self, size: int) -> int:
+        if not self.postgres:
+            return await self.database.fetch_val(_TAKE_BLOCK, {"name": self.table, "size": size})
+        # the block row stays locked until commit, so sequence updates land in block order
+        async with self.database.transaction():
+            end = await self.database.fetch_val(_TAKE_BLOCK, {"name": self.table, "size": size})
+            await self.database.fetch_val(_ADVANCE_SEQUENCE.format(table=self.table), {"last_id": end - 1})
+        return end
+
+    async def reserve(self, count: int) -> List[int]:
+        ids: List[int] = []
+        while len(ids) < count:
+            if self._next >= self._limit:
+                async with self._lock:
+                    if self._next >= self._limit:
+                        size = max(self.block_size, count - len(ids))
+                        end = await self._take_block(size)
+                        self._next, self._limit = end - size, end
+            take = min(count - len(ids), self._limit - self._next)
+            ids.extend(range(self._next, self._next + take))
+            self._next += take
+        return ids
+
+
+class WriteBehindQueue:
+    """Bounded queue drained by one task into ``flush(rows)`` calls of up to ``max_batch``
+    rows, at most ``max_delay_ms`` after the first row arrived. ``submit`` waits while the
+    queue is full, which is the backpressure on callers."""
+
+    def __init__(self, flush: Callable[[List[Dict[str, Any]]], Awaitable[None]], name: str = "conversations",
+                 max_batch: int = WRITE_BEHIND_BATCH, max_delay_ms: float = WRITE_BEHIND_DELAY_MS,
+                 max_pending: int = WRITE_BEHIND_MAX_PENDING, retries: int = WRITE_BEHIND_RETRIES):
+        self.flush = flush
+        self.name = name
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.retries = retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        # rows go through in order, so "row n is done" is just done >= n
+        self._submitted = 0
+        self._done = 0
+        self._progress = asyncio.Condition()
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            await self._queue.put(row)
+            self._submitted += 1
+
+    async def drain(self):
+        # returns once every row submitted before this call has been written (or dropped);
+        # rows that arrive meanwhile don't hold it up
+        target = self._submitted
+        if self._done >= target:
+            return
+        async with self._progress:
+            await self._progress.wait_for(lambda: self._done >= target)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        await self.drain()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+            self._done += len(batch)
+            async with self._progress:
+                self._progress.notify_all()
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        for attempt in range(self.retries + 1):
+            try:
+                await self.flush(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                if attempt == self.retries:
+                    traceback.print_exc()
+                    print(f"Write-behind ({self.name}): dropped {len(batch)} rows after {attempt + 1} attempts")
+                    self.dropped += len(batch)
+                    return
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "max_pending": self._queue.maxsize,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,20 @@
+# asgi.py — import target for the monolith: uvicorn asgi:app --workers 4
+# backend/app.py shares its name with the app/ package, so it is loaded by path.
+import importlib.util
+import os
+import sys
+
+MODULE_NAME = "afiyor_monolith"
+
+
+def load_monolith():
+    if MODULE_NAME in sys.modules:
+        return sys.modules[MODULE_NAME]
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+app = load_monolith().app
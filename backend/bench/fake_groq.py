@@ -0,0 +1,101 @@
+# fake_groq.py — local stand-in for the Groq chat-completions API
+#
+#   python -m bench.fake_groq --profile flaky --port 8765
+#
+# Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8765 (the SDK adds /openai/v1).
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# latency_ms, jitter_ms, error_rate, hang_rate (a hung call sleeps well past any client deadline)
+PROFILES = {
+    "fast": (50, 10, 0.0, 0.0),
+    "typical": (400, 150, 0.0, 0.0),
+    "slow": (2500, 500, 0.0, 0.0),
+    "flaky": (400, 150, 0.2, 0.0),
+    "hanging": (400, 150, 0.0, 0.1),
+    "down": (5, 0, 1.0, 0.0),
+}
+HANG_SECONDS = 60.0
+
+
+def create_app(latency_ms: float = 400, jitter_ms: float = 150, error_rate: float = 0.0,
+               hang_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="fake-groq")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0, "hangs": 0}
+
+    def delay() -> float:
+        return max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        roll = rng.random()
+        if roll < error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(delay() / 4)
+            return JSONResponse({"error": {"message": "fake upstream error", "type": "server_error"}}, status_code=503)
+        if roll < error_rate + hang_rate:
+            stats["hangs"] += 1
+            await asyncio.sleep(HANG_SECONDS)
+        prompt = body["messages"][-1]["content"]
+        text = "Refined guidance: " + " ".join(prompt.split()[:60])
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            words = text.split(" ")
+            pause = delay() / max(1, len(words))
+
+            async def chunks():
+                for word in words:
+                    await asyncio.sleep(pause)
+                    chunk = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                             "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+        await asyncio.sleep(delay())
+        return {
+            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4, "total_tokens": (len(prompt) + len(text)) // 4},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq server for benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--jitter-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--hang-rate", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    latency, jitter, error_rate, hang_rate = PROFILES[args.profile]
+    app = create_app(
+        latency_ms=latency if args.latency_ms is None else args.latency_ms,
+        jitter_ms=jitter if args.jitter_ms is None else args.jitter_ms,
+        error_rate=error_rate if args.error_rate is None else args.error_rate,
+        hang_rate=hang_rate if args.hang_rate is None else args.hang_rate,
+        seed=args.seed,
+    )
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
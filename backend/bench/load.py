@@ -0,0 +1,209 @@
+# load.py — closed-loop HTTP load test against a local backend and fake Groq server
+#
+#   python -m bench.load --target monolith --profile typical --concurrency 1 8 32 --duration 10
+#   python -m bench.load --target v2 --out bench-v2.json --baseline bench-v2-main.json
+#
+# Both servers run as subprocesses on free ports; each scenario keeps N requests
+# in flight for the duration and reports requests/sec and latency percentiles.
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import httpx
+
+from .fake_groq import PROFILES
+from .results import compare, summarize_latencies, write_results
+from .serve import BACKEND_DIR, TARGETS
+
+MESSAGES = [
+    "How do I get funding for my startup?",
+    "Which mobile money provider should I use for payments?",
+    "How do I register my business legally?",
+    "How can community and ubuntu help my business grow?",
+    "I need investors for my seed stage company",
+    "What taxes and licenses do I need?",
+    "How do I accept M-Pesa from customers?",
+    "Give me general advice for my agriculture business",
+]
+COUNTRIES = ["ghana", "kenya", "nigeria", "south_africa"]
+SCENARIOS = ("chat", "ai_ask", "history", "register", "login")
+
+Request = Tuple[str, str, dict]  # method, path, httpx kwargs
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(args: List[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], cwd=BACKEND_DIR, env=env)
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:g}s")
+
+
+def request_factory(scenario: str, target: str, distinct: int, run_id: str) -> Callable[[int], Request]:
+    chat_path = "/chat" if target == "monolith" else "/chat/"
+
+    def message(i: int) -> str:
+        # `distinct` bounds how many different prompts are sent, i.e. the refinement-cache working set
+        slot = i % distinct
+        text = MESSAGES[slot % len(MESSAGES)]
+        return text if slot < len(MESSAGES) else f"{text} (variant {slot})"
+
+    if scenario == "chat":
+        return lambda i: ("POST", chat_path, {"json": {
+            "message": message(i), "country": COUNTRIES[i % len(COUNTRIES)], "user_id": f"bench-{i % 50}"}})
+    if scenario == "ai_ask":
+        return lambda i: ("GET", "/ai/ask", {"params": {"q": message(i)}})
+    if scenario == "history":
+        return lambda i: ("GET", f"/history/bench-{i % 50}", {})
+    if scenario == "register":
+        return lambda i: ("POST", "/auth/register", {"json": {
+            "name": "Bench", "email": f"bench-{run_id}-{i}@example.com", "country": "ghana", "industry": "general"}})
+    if scenario == "login":
+        return lambda i: ("POST", "/auth/login", {"json": {"email": f"seed-{run_id}@example.com"}})
+    raise ValueError(scenario)
+
+
+async def seed(client: httpx.AsyncClient, target: str, run_id: str):
+    await client.post("/auth/register", json={"name": "Seed", "email": f"seed-{run_id}@example.com"})
+    make = request_factory("chat", target, len(MESSAGES), run_id)
+    for i in range(100):
+        method, path, kwargs = make(i)
+        await client.request(method, path, **kwargs)
+
+
+async def run_scenario(client: httpx.AsyncClient, make: Callable[[int], Request], counter: Iterator[int],
+                       concurrency: int, duration: float, warmup: float) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    transport_errors = 0
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def worker():
+        nonlocal transport_errors
+        while True:
+            started = time.perf_counter()
+            if started >= stop_at:
+                return
+            method, path, kwargs = make(next(counter))
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = None
+            elapsed = time.perf_counter() - started
+            if started < measure_from:
+                continue
+            if status is None:
+                transport_errors += 1
+                continue
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    completed = len(latencies)
+    errors = transport_errors + sum(n for code, n in statuses.items() if not code.startswith("2"))
+    return {
+        "requests": completed,
+        "rps": round(completed / duration, 2),
+        "error_rate": round(errors / max(1, completed + transport_errors), 4),
+        "statuses": statuses,
+        **summarize_latencies(latencies),
+    }
+
+
+async def drive(base_url: str, args, run_id: str) -> List[dict]:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    results = []
+    counter = itertools.count()  # shared, so generated emails stay unique across scenarios
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.request_timeout) as client:
+        await seed(client, args.target, run_id)
+        for scenario in args.scenarios:
+            if scenario == "ai_ask" and args.target != "monolith":
+                continue
+            make = request_factory(scenario, args.target, args.distinct_messages, run_id)
+            for concurrency in args.concurrency:
+                result = await run_scenario(client, make, counter, concurrency, args.duration, args.warmup)
+                result = {"scenario": scenario, "concurrency": concurrency, **result}
+                print(f"{scenario:>9} c={concurrency:<4} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.1f}ms  "
+                      f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  errors {result['error_rate']:.1%}")
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AfiYor HTTP load benchmark")
+    parser.add_argument("--target", choices=TARGETS, default="monolith")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical", help="fake Groq latency/error profile")
+    parser.add_argument("--no-groq", action="store_true", help="run without GROQ_API_KEY (local drafts only)")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="keep the per-IP/per-user limits on (all load comes from one address, so they are off by default)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--distinct-messages", type=int, default=200)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--out", default="bench-load.json")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    run_id = str(int(time.time()))
+    env = dict(os.environ)
+    if not args.rate_limits:
+        env.update(RATE_LIMIT_IP_PER_MINUTE="0", RATE_LIMIT_USER_PER_MINUTE="0", REFINE_LIMIT_USER_PER_MINUTE="0",
+                   REFINE_LIMIT_IP_PER_MINUTE="0")
+    processes = []
+    try:
+        if args.no_groq:
+            env["GROQ_API_KEY"] = ""  # empty rather than unset, so a local .env cannot re-enable it
+        else:
+            groq_port = free_port()
+            processes.append(start(["bench.fake_groq", "--profile", args.profile, "--port", str(groq_port)], env))
+            wait_ready(f"http://127.0.0.1:{groq_port}/stats")
+            env.update(GROQ_API_KEY="bench", GROQ_BASE_URL=f"http://127.0.0.1:{groq_port}")
+        if args.target == "v2" and "DATABASE_URL" not in os.environ:
+            env["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="afiyor-bench-"), "bench.db")
+        app_port = free_port()
+        processes.append(start(["bench.serve", args.target, "--port", str(app_port)], env))
+        base_url = f"http://127.0.0.1:{app_port}"
+        wait_ready(base_url + "/")
+        results = asyncio.run(drive(base_url, args, run_id))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=10)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "tolerance")}
+    write_results(args.out, "load", config, results)
+    if args.baseline:
+        regressions = compare(args.baseline, results, ("scenario", "concurrency"),
+                              {"rps": "higher", "p95_ms": "lower", "p99_ms": "lower"}, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# micro.py — in-process micro-benchmarks for the hot pure-Python paths
+#
+#   python -m bench.micro --out bench-micro.json --baseline bench-micro-main.json
+import argparse
+import sys
+import time
+from typing import Callable, List
+
+from .load import COUNTRIES, MESSAGES
+from .results import compare, percentile, write_results
+from .serve import load_monolith
+from app.language import _detect
+from app.semantic_cache import SemanticCache
+
+# one question per supported language, for the detector
+LANGUAGE_SAMPLES = [
+    "How do I get seed funding for my startup?",
+    "Comment obtenir un financement pour mon entreprise ?",
+    "Ninawezaje kupata mtaji wa kuanzisha biashara?",
+    "Báwo ni mo ṣe lè rí owó ìdókòwò fún iṣẹ́ mi?",
+    "كيف أحصل على تمويل لشركتي الناشئة؟",
+]
+
+
+def measure(fn: Callable[[], object], min_time: float, repeats: int) -> dict:
+    # calibrate a loop size that runs for ~min_time, then time `repeats` such loops
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops)
+    samples.sort()
+    median = percentile(samples, 0.5)
+    return {
+        "loops": loops,
+        "repeats": repeats,
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(samples[0] * 1e6, 3),
+        "max_us": round(samples[-1] * 1e6, 3),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+    }
+
+
+def cases():
+    monolith = load_monolith()
+    afiyor = monolith.professional_afiyor
+    long_message = " ".join(MESSAGES) * 8
+    keys = [afiyor.draft_key(m, c) for m in MESSAGES for c in COUNTRIES]
+    draft = afiyor.generate_professional_response(MESSAGES[0])
+    index = {"i": 0}
+    # a full cache where every entry shares the lookup's bucket: the worst case for candidate fan-out
+    near_duplicates = SemanticCache(maxsize=2048)
+    bucket = ("funding", "ghana", "general", "business_coach")
+    for n in range(2048):
+        near_duplicates.set(f"{MESSAGES[n % len(MESSAGES)]} option{n} stage{n % 7}", bucket, "answer")
+
+    def rotate(items: List):
+        index["i"] = (index["i"] + 1) % len(items)
+        return items[index["i"]]
+
+    return [
+        ("analyze_query", lambda: afiyor.analyze_query(rotate(MESSAGES))),
+        ("analyze_query_long", lambda: afiyor.analyze_query(long_message)),
+        ("generate_professional_response", lambda: afiyor.generate_professional_response(rotate(MESSAGES), "kenya")),
+        ("build_draft_uncached", lambda: afiyor._build_draft(rotate(keys))),
+        ("apply_sankofa_full_hybrid", lambda: monolith.apply_sankofa_full_hybrid(draft, MESSAGES[0])),
+        ("semantic_cache_lookup", lambda: near_duplicates.get(rotate(MESSAGES), bucket)),
+        ("detect_language_uncached", lambda: _detect.__wrapped__(rotate(LANGUAGE_SAMPLES))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AfiYor micro-benchmarks")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed loop")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--out", default="bench-micro.json")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    results = []
+    for name, fn in cases():
+        if args.only and name not in args.only:
+            continue
+        result = {"name": name, **measure(fn, args.min_time, args.repeats)}
+        print(f"{name:>32} {result['median_us']:>10.2f}us  {result['ops_per_sec']:>12,.0f} ops/s")
+        results.append(result)
+
+    write_results(args.out, "micro", {"min_time": args.min_time, "repeats": args.repeats}, results)
+    if args.baseline and compare(args.baseline, results, ("name",), {"median_us": "lower"}, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# results.py — percentile helpers and JSON result files shared by the benchmarks
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = q * (len(sorted_values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p90_ms": ms(percentile(ordered, 0.90)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1]) if ordered else 0.0,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "timestamp": int(time.time()),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, kind: str, config: dict, results: List[dict]):
+    payload = {"kind": kind, "environment": environment(), "config": config, "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Wrote {path}")
+
+
+def compare(baseline_path: str, results: List[dict], key_fields: Sequence[str],
+            metrics: Dict[str, str], tolerance: float) -> List[str]:
+    """Compare results against a baseline file.
+
+    ``metrics`` maps a metric name to "higher" or "lower" (which direction is better).
+    Returns one line per metric that got worse by more than ``tolerance`` (a fraction).
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {tuple(r[k] for k in key_fields): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        key = tuple(result[k] for k in key_fields)
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for metric, better in metrics.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change < -tolerance if better == "higher" else change > tolerance
+            line = f"{'/'.join(map(str, key))} {metric}: {before:g} -> {after:g} ({change:+.1%})"
+            print(("REGRESSION " if worse else "           ") + line)
+            if worse:
+                regressions.append(line)
+    return regressions
@@ -0,0 +1,35 @@
+# serve.py — run one of the two backends under uvicorn for benchmarking
+#
+#   python -m bench.serve monolith --port 8000
+#   python -m bench.serve v2 --port 8000
+import argparse
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ("monolith", "v2")
+
+
+def load_monolith():
+    from asgi import load_monolith
+    return load_monolith()
+
+
+def load_target(target: str):
+    if target == "monolith":
+        return load_monolith().app
+    from app.main import app
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an AfiYor backend for benchmarks")
+    parser.add_argument("target", choices=TARGETS)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    import uvicorn
+    uvicorn.run(load_target(args.target), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# startup.py — cold-start benchmark: process spawn to first live / ready response
+#
+#   python -m bench.startup --target monolith --runs 10 --out bench-startup.json
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .fake_groq import PROFILES
+from .load import free_port, start, wait_ready
+from .results import compare, write_results
+from .serve import TARGETS
+
+POLL_INTERVAL = 0.005
+
+
+def wait_for(client: httpx.Client, url: str, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(url, timeout=0.5).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{url} did not return 200 within {timeout:g}s")
+
+
+def measure_once(target: str, env: dict, timeout: float) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = start(["bench.serve", target, "--port", str(port)], env)
+    try:
+        with httpx.Client() as client:
+            live = wait_for(client, base_url + "/health/live", started, timeout)
+            ready = wait_for(client, base_url + "/health/ready", started, timeout)
+            first_chat = time.perf_counter()
+            chat_path = "/chat" if target == "monolith" else "/chat/"
+            client.post(base_url + chat_path, json={"message": "How do I get funding?", "user_id": "startup"}, timeout=30)
+            first_chat = time.perf_counter() - first_chat
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {"live_s": live, "ready_s": ready, "first_chat_s": first_chat}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AfiYor cold-start benchmark")
+    parser.add_argument("--target", choices=TARGETS, default="monolith")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--groq-profile", choices=sorted(PROFILES),
+                        help="configure Groq against a local fake server with this profile (default: no Groq)")
+    parser.add_argument("--out", default="bench-startup.json")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["GROQ_API_KEY"] = ""
+    env.setdefault("KB_RELOAD_INTERVAL", "0")
+    if args.target == "v2" and "DATABASE_URL" not in os.environ:
+        env["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="afiyor-bench-"), "bench.db")
+
+    fake_groq = None
+    try:
+        if args.groq_profile:
+            groq_port = free_port()
+            fake_groq = start(["bench.fake_groq", "--profile", args.groq_profile, "--port", str(groq_port)], env)
+            wait_ready(f"http://127.0.0.1:{groq_port}/stats")
+            env.update(GROQ_API_KEY="bench", GROQ_BASE_URL=f"http://127.0.0.1:{groq_port}")
+        runs = [measure_once(args.target, env, args.timeout) for _ in range(args.runs)]
+    finally:
+        if fake_groq:
+            fake_groq.terminate()
+            fake_groq.wait(timeout=10)
+    results = []
+    for metric in ("live_s", "ready_s", "first_chat_s"):
+        values = sorted(run[metric] for run in runs)
+        result = {"metric": metric, "median_ms": round(statistics.median(values) * 1000, 1),
+                  "min_ms": round(values[0] * 1000, 1), "max_ms": round(values[-1] * 1000, 1)}
+        print(f"{metric:>13}  median {result['median_ms']:>8.1f}ms  min {result['min_ms']:>8.1f}ms  max {result['max_ms']:>8.1f}ms")
+        results.append(result)
+
+    config = {"target": args.target, "runs": args.runs, "groq_profile": args.groq_profile}
+    write_results(args.out, "startup", config, results)
+    if args.baseline and compare(args.baseline, results, ("metric",), {"median_ms": "lower"}, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
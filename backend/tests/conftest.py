@@ -0,0 +1,63 @@
+# Tests run against the in-process memory store with no Groq key; tests that need a
+# refinement patch the monolith's Groq hooks instead of calling out.
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ["STORE_URL"] = "memory://"
+os.environ["GROQ_API_KEY"] = ""
+os.environ.setdefault("ADMIN_TOKEN", "test-admin-token")
+# the v2 package reads DATABASE_URL at import; a throwaway SQLite file stands in for Postgres
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="afiyor-tests-"), "v2.db")
+# every TestClient request comes from one address; tests/test_admission.py builds its own buckets
+for limit in ("RATE_LIMIT_IP_PER_MINUTE", "RATE_LIMIT_USER_PER_MINUTE", "REFINE_LIMIT_USER_PER_MINUTE",
+              "REFINE_LIMIT_IP_PER_MINUTE"):
+    os.environ[limit] = "0"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def monolith():
+    from asgi import load_monolith
+    return load_monolith()
+
+
+@pytest.fixture
+def client(monolith):
+    from fastapi.testclient import TestClient
+    with TestClient(monolith.app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def v2_client():
+    """The v2 package (app.main) on SQLite, once its startup steps report ready; started once,
+    since its database and write-behind queue are module-level and outlive one TestClient."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as c:
+        deadline = time.monotonic() + 10
+        while c.get("/health/ready").status_code != 200:
+            assert time.monotonic() < deadline, c.get("/health/ready").json()
+            time.sleep(0.01)
+        yield c
+
+
+@pytest.fixture
+def fake_groq(monolith, monkeypatch):
+    """Turn refinement on and answer every prompt locally; ``calls`` records each Groq call."""
+    calls = []
+
+    async def generate(draft, user_message, *args, **kwargs):
+        calls.append({"message": user_message, **kwargs})
+        return f"refined: {user_message}", None
+
+    monkeypatch.setattr(monolith, "groq_client", object())
+    monkeypatch.setattr(monolith, "generate_ai_message", generate)
+    monolith.refinement_cache.clear()
+    monolith.semantic_cache.clear()
+    return calls
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from app.admission import AdmissionController, Client, TokenBuckets, client_key
+from app.breaker import OPEN
+
+
+def test_bucket_allows_burst_then_waits():
+    buckets = TokenBuckets(per_minute=60, burst=2)
+    assert buckets.take("a") == 0
+    assert buckets.take("a") == 0
+    assert buckets.take("a") > 0
+    assert buckets.take("b") == 0
+
+
+def test_zero_rate_disables_the_bucket():
+    buckets = TokenBuckets(per_minute=0, burst=1)
+    assert all(buckets.take("a") == 0 for _ in range(100))
+
+
+def test_anonymous_callers_are_keyed_by_ip():
+    assert client_key(None, "10.0.0.1") == "ip:10.0.0.1"
+    assert client_key("anonymous", "10.0.0.1") == "ip:10.0.0.1"
+    assert client_key("u1", "10.0.0.1") == "user:u1"
+
+
+def test_rotating_user_ids_still_hits_the_ip_limit():
+    controller = AdmissionController()
+    controller.ip_refinements = TokenBuckets(per_minute=1, burst=3)
+    shed = None
+    for i in range(4):
+        shed = controller.acquire_refinement(Client(client_key(f"user-{i}", "10.0.0.1"), "10.0.0.1"))
+        if shed is None:
+            controller.release_refinement()
+    assert shed and "rate limit" in shed
+    assert controller.acquire_refinement(Client("user:other", "10.0.0.2")) is None
+
+
+def test_user_limit_applies_behind_a_shared_ip():
+    controller = AdmissionController()
+    controller.user_refinements = TokenBuckets(per_minute=1, burst=1)
+    assert controller.acquire_refinement(Client("user:u1", "10.0.0.1")) is None
+    controller.release_refinement()
+    assert controller.acquire_refinement(Client("user:u1", "10.0.0.1"))
+    assert controller.acquire_refinement(Client("user:u2", "10.0.0.1")) is None
+
+
+def test_in_flight_cap_sheds():
+    controller = AdmissionController()
+    controller.max_refinements = 1
+    assert controller.acquire_refinement(None) is None
+    assert "busy" in controller.acquire_refinement(None)
+    controller.release_refinement()
+    assert controller.acquire_refinement(None) is None
+
+
+@pytest.fixture
+def open_breaker(monolith, monkeypatch):
+    breaker = monolith.groq_breaker
+    monkeypatch.setattr(breaker, "state", OPEN)
+    monkeypatch.setattr(breaker, "_opened_at", time.monotonic())
+    return breaker
+
+
+def test_open_breaker_does_not_charge_the_refinement_quota(monolith, fake_groq, open_breaker, monkeypatch):
+    controller = AdmissionController()
+    controller.ip_refinements = TokenBuckets(per_minute=1, burst=1)
+    monkeypatch.setattr(monolith, "admission", controller)
+    client = Client("user:u1", "10.0.0.1")
+    for _ in range(3):
+        refined, ai_error = asyncio.run(monolith.refine_draft("draft", "how do I register a business", client=client))
+        assert refined is None and "circuit open" in ai_error
+    assert not fake_groq
+    assert controller.refinements_in_flight == 0
+    open_breaker.state = "closed"
+    refined, ai_error = asyncio.run(monolith.refine_draft("draft", "how do I register a business", client=client))
+    assert refined == "refined: how do I register a business" and ai_error is None
@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+
+
+def test_items_are_answered_in_order(client):
+    questions = ["How do I get funding?", "How do I register a business?", "Nahitaji mkopo kwa biashara"]
+    results = client.post("/chat/batch", json={"items": [{"message": q} for q in questions]}).json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert all(r["response"] and r["conversation_id"] for r in results)
+    assert results[2]["language"] == "sw"
+    assert len({r["conversation_id"] for r in results}) == 3
+
+
+def test_blank_items_fail_alone(client):
+    results = client.post("/chat/batch", json={"items": [{"message": " "}, {"message": "How do I get funding?"}]}).json()["results"]
+    assert results[0]["error"] == "Message is required" and results[0]["response"] is None
+    assert results[1]["response"] and results[1]["error"] is None
+
+
+def test_batch_size_is_bounded(client, monolith):
+    assert client.post("/chat/batch", json={"items": []}).status_code == 400
+    too_many = [{"message": "hi"}] * (monolith.BATCH_MAX_ITEMS + 1)
+    assert client.post("/chat/batch", json={"items": too_many}).status_code == 400
+
+
+def test_identical_questions_are_refined_once(client, fake_groq):
+    items = [{"message": "How do I get funding?"}, {"message": "how do I get funding"}, {"message": "How do I register?"}]
+    results = client.post("/chat/batch", json={"items": items}).json()["results"]
+    assert len(fake_groq) == 2
+    assert results[0]["confidence"] == results[1]["confidence"] == 0.9
+
+
+def test_refinements_run_with_bounded_concurrency(client, monolith, fake_groq, monkeypatch):
+    running, peak = 0, 0
+
+    async def generate(draft, user_message, *args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"refined: {user_message}", None
+
+    monkeypatch.setattr(monolith, "generate_ai_message", generate)
+    monkeypatch.setattr(monolith, "BATCH_CONCURRENCY", 3)
+    items = [{"message": f"How do I grow shop {uuid.uuid4().hex}?"} for _ in range(10)]
+    results = client.post("/chat/batch", json={"items": items}).json()["results"]
+    assert all(r["confidence"] == 0.9 for r in results)
+    assert peak == 3
@@ -0,0 +1,48 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from bench import micro
+from bench.fake_groq import create_app
+from bench.results import compare, percentile, summarize_latencies, write_results
+
+COMPLETION = {"model": "llama3-70b-8192", "messages": [{"role": "user", "content": "How do I get funding?"}]}
+
+
+def test_percentile_interpolates():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 1.0) == 4.0
+    assert summarize_latencies([0.001, 0.002, 0.003])["p50_ms"] == 2.0
+
+
+def test_compare_flags_only_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    write_results(str(baseline), "micro", {}, [{"name": "a", "median_us": 10.0}, {"name": "b", "median_us": 10.0}])
+    assert json.loads(baseline.read_text())["kind"] == "micro"
+    results = [{"name": "a", "median_us": 10.5}, {"name": "b", "median_us": 20.0}, {"name": "new", "median_us": 1.0}]
+    regressions = compare(str(baseline), results, ("name",), {"median_us": "lower"}, tolerance=0.1)
+    assert len(regressions) == 1 and regressions[0].startswith("b median_us")
+
+
+def test_fake_groq_answers_like_the_api():
+    client = TestClient(create_app(latency_ms=0, jitter_ms=0))
+    body = client.post("/openai/v1/chat/completions", json=COMPLETION).json()
+    assert body["choices"][0]["message"]["content"] == "Refined guidance: How do I get funding?"
+    streamed = client.post("/openai/v1/chat/completions", json={**COMPLETION, "stream": True}).text
+    assert streamed.count("data: ") == len("Refined guidance: How do I get funding?".split()) + 1
+    assert streamed.rstrip().endswith("data: [DONE]")
+    assert client.get("/stats").json()["requests"] == 2
+
+
+def test_fake_groq_error_profile():
+    client = TestClient(create_app(latency_ms=0, jitter_ms=0, error_rate=1.0))
+    assert client.post("/openai/v1/chat/completions", json=COMPLETION).status_code == 503
+    assert client.get("/stats").json()["errors"] == 1
+
+
+def test_micro_cases_run():
+    for name, fn in micro.cases():
+        fn()
+    result = micro.measure(lambda: None, min_time=0.001, repeats=3)
+    assert result["repeats"] == 3 and result["min_us"] <= result["median_us"] <= result["max_us"]
@@ -0,0 +1,69 @@
+import time
+
+from app.cache import LRUTTLCache, normalize_message, refinement_key
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUTTLCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+def test_zero_size_disables_the_cache():
+    cache = LRUTTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = LRUTTLCache(maxsize=2, ttl=float("inf"))
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["ttl_seconds"] is None
+    assert cache.delete("a") and not cache.delete("a")
+    assert cache.clear() == 0
+
+
+def test_key_ignores_case_whitespace_and_trailing_punctuation():
+    assert normalize_message("  How do I   get FUNDING?! ") == "how do i get funding"
+    assert refinement_key("How do I get funding?", "funding", "Ghana", "Tech", "friendly") == \
+        refinement_key("how do i get funding", "funding", "ghana", "tech", "friendly")
+
+
+def test_key_separates_tone_country_and_context():
+    base = refinement_key("how do i get funding", "funding", "ghana", "tech", "friendly")
+    assert base != refinement_key("how do i get funding", "funding", "ghana", "tech", "professional")
+    assert base != refinement_key("how do i get funding", "funding", "kenya", "tech", "friendly")
+    assert base != refinement_key("how do i get funding", "funding", "ghana", "tech", "friendly", context="earlier turn")
+
+
+def test_repeated_question_is_refined_once(client, fake_groq):
+    for _ in range(2):
+        body = client.post("/chat", json={"message": "How do I register a business?", "tone": "friendly"}).json()
+        assert "refined: How do I register a business?" in body["response"]
+    assert len(fake_groq) == 1
+
+
+def test_cache_admin_routes_need_the_token(client, monolith, monkeypatch):
+    assert client.get("/admin/cache").status_code == 403
+    assert client.post("/admin/cache/flush", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    flushed = client.post("/admin/cache/flush", headers={"X-Admin-Token": "test-admin-token"})
+    assert flushed.status_code == 200 and flushed.json()["stats"]["size"] == 0
+    monkeypatch.setattr(monolith, "ADMIN_TOKEN", None)
+    assert client.get("/admin/cache", headers={"X-Admin-Token": ""}).status_code == 404
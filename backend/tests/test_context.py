@@ -0,0 +1,54 @@
+import pytest
+
+from app.context import Turn, is_follow_up, plan_context, wants_context
+
+
+@pytest.mark.parametrize("message", [
+    "M-Pesa integration",
+    "seed investors Ghana?",
+    "What is Ubuntu philosophy?",
+    "How do I register a business in Ghana?",
+    "Comment lever des fonds pour ma startup au Sénégal ?",
+    "",
+])
+def test_standalone_questions_are_not_follow_ups(message):
+    assert not is_follow_up(message)
+
+
+@pytest.mark.parametrize("message", [
+    "and in Kenya?",
+    "What about Nigeria?",
+    "How much does it cost?",
+    "tell me more",
+    "Et au Sénégal ?",
+    "Je, hiyo inagharimu kiasi gani?",
+])
+def test_follow_ups_need_a_signal(message):
+    assert is_follow_up(message)
+
+
+def test_anonymous_and_missing_users_never_get_context():
+    assert wants_context("user_abc", "and in Kenya?")
+    assert not wants_context("anonymous", "and in Kenya?")
+    assert not wants_context(None, "and in Kenya?")
+    assert not wants_context("user_abc", "seed investors Ghana?")
+
+
+def test_plan_keeps_recent_turns_and_folds_older_ones_into_the_summary():
+    turns = [Turn(i, f"question {i} about funding", "answer " * 120) for i in range(1, 9)]
+    plan = plan_context(turns)
+    assert plan.text is not None and "Recent turns:" in plan.text
+    assert plan.tokens <= 600
+    assert plan.summarized_through > 0
+    # a later request only folds turns newer than what the summary already covers
+    again = plan_context(turns, plan.summary, plan.summarized_through)
+    assert again.summary == plan.summary
+
+
+def test_standalone_question_from_signed_in_user_keeps_semantic_hits(monolith, client, fake_groq):
+    client.post("/chat", json={"message": "How can I find seed investors in Ghana?", "user_id": "user_ctx"})
+    before = monolith.semantic_cache.stats()["hits"]
+    r = client.post("/chat", json={"message": "Seed investors Ghana?", "user_id": "user_ctx"}).json()
+    assert r["confidence"] == 0.9
+    assert len(fake_groq) == 1
+    assert monolith.semantic_cache.stats()["hits"] == before + 1
@@ -0,0 +1,50 @@
+from app import afiyor
+from app.afiyor import ProfessionalAfiYor, draft_language, with_language
+
+
+def test_equivalent_requests_share_a_key():
+    bot = ProfessionalAfiYor()
+    # intents that ignore the industry leave its slot empty
+    assert bot.draft_key("How do I register?", "ghana", "retail") == bot.draft_key("How do I register?", "ghana", "fintech")
+    assert bot.draft_key("Tips for my shop", "ghana", "retail") != bot.draft_key("Tips for my shop", "ghana", "fintech")
+    assert bot.draft_key("seed funding please")[:2] == ("funding", "seed")
+    assert bot.draft_key("funding please")[:2] == ("funding", "pre_seed")
+
+
+def test_english_keys_keep_four_slots():
+    key = ("funding", "seed", "ghana", None)
+    assert with_language(key, "en") == key and draft_language(key) == "en"
+    assert with_language(key, "fr") == key + ("fr",) and draft_language(with_language(key, "fr")) == "fr"
+    assert with_language(key, "xx") == key
+
+
+def test_drafts_are_rendered_once():
+    bot = ProfessionalAfiYor()
+    key = bot.draft_key("How do I get funding?")
+    assert bot.render_draft(key) is bot.render_draft(key)
+    assert bot.render_draft(key) == bot._build_draft(key)
+
+
+def test_memo_evicts_the_least_recently_used(monkeypatch):
+    monkeypatch.setattr(afiyor, "DRAFT_MEMO_SIZE", 2)
+    bot = ProfessionalAfiYor()
+    keys = [bot.draft_key("Tips for my shop", "ghana", industry) for industry in ("retail", "fintech", "services")]
+    bot.render_draft(keys[0])
+    bot.render_draft(keys[1])
+    bot.render_draft(keys[0])
+    bot.render_draft(keys[2])
+    assert list(bot._drafts) == [keys[0], keys[2]]
+
+
+def test_warm_renders_the_known_combinations():
+    bot = ProfessionalAfiYor()
+    rendered = bot.warm(countries=["ghana"], industries=["general", "retail"], languages=["en"])
+    # every entry but general_business once, and general_business once per industry
+    assert rendered == len(afiyor.DRAFT_INTENTS) - 1 + 2
+
+
+def test_new_knowledge_base_clears_the_memo():
+    bot = ProfessionalAfiYor()
+    bot.render_draft(bot.draft_key("How do I get funding?"))
+    bot.set_knowledge_base(bot.knowledge_base)
+    assert not bot._drafts
@@ -0,0 +1,311 @@
+import asyncio
+import time
+
+import pytest
+
+from app import ai_client
+from app.ai_client import AsyncGroqClient
+from app.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from bench.fake_groq import create_app
+
+
+class Upstream:
+    """Stands in for AsyncGroqClient._complete: records calls and answers (or raises ``error``) after ``delay``."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.error = None
+        self.calls = []
+        self.cancelled = 0
+
+    async def __call__(self, system_prompt, user_prompt, max_tokens, temperature, timeout):
+        self.calls.append(timeout)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return f"answer: {user_prompt}"
+
+
+def fake_upstream(client, **profile):
+    """Point ``client``'s SDK at an in-process fake Groq server instead of the network."""
+    import httpx
+    from groq import AsyncGroq
+    transport = httpx.ASGITransport(app=create_app(**{"latency_ms": 20, "jitter_ms": 0, **profile}))
+    client._client = AsyncGroq(api_key=client.api_key, base_url="http://fake-groq", max_retries=0,
+                               http_client=httpx.AsyncClient(transport=transport))
+
+
+def test_sdk_client_is_built_once_and_reused():
+    client = AsyncGroqClient("test-key", pool_size=4)
+    sdk = client._get_client()
+    assert client._get_client() is sdk
+    asyncio.run(client.aclose())
+    assert client._client is None
+
+
+def test_complete_goes_through_the_sdk():
+    client = AsyncGroqClient("test-key")
+    fake_upstream(client)
+    assert asyncio.run(client.complete("system", "hello there")).startswith("Refined guidance: hello there")
+
+
+def test_concurrency_is_capped():
+    client = AsyncGroqClient("test-key", max_concurrency=2)
+    fake_upstream(client)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, client.in_flight)
+            await asyncio.sleep(0.002)
+
+    async def run():
+        watcher = asyncio.ensure_future(watch())
+        answers = await asyncio.gather(*(client.complete("system", f"question {i}") for i in range(6)))
+        watcher.cancel()
+        return answers
+
+    assert len(set(asyncio.run(run()))) == 6
+    assert peak == 2 and client.in_flight == 0
+
+
+def test_stream_yields_deltas():
+    client = AsyncGroqClient("test-key")
+    fake_upstream(client)
+
+    async def run():
+        return [delta async for delta in client.stream("system", "hello there")]
+
+    deltas = asyncio.run(run())
+    assert len(deltas) > 1 and "".join(deltas).startswith("Refined guidance: hello there")
+
+
+def test_unconfigured_client_returns_the_draft_reason(monkeypatch):
+    monkeypatch.setattr(ai_client, "groq_client", None)
+    assert asyncio.run(ai_client.generate_ai_message("draft", "hello")) == (None, "Groq client not configured")
+
+
+@pytest.fixture
+def groq():
+    client = AsyncGroqClient("test-key")
+    client._complete = Upstream()
+    return client
+
+
+def test_identical_prompts_share_one_upstream_call(groq):
+    async def run():
+        return await asyncio.gather(*(groq.complete("system", "hello") for _ in range(5)),
+                                    groq.complete("system", "other"))
+
+    results = asyncio.run(run())
+    assert results == ["answer: hello"] * 5 + ["answer: other"]
+    assert len(groq._complete.calls) == 2
+    assert groq.coalesced == 4
+    assert not groq._inflight
+
+
+def test_last_waiter_leaving_cancels_the_upstream_call(groq):
+    groq._complete.delay = 10
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(groq.complete("system", "hello"), 0.05)
+        await asyncio.sleep(0)
+        # checked before asyncio.run() cancels whatever is left at loop shutdown
+        assert groq._complete.cancelled == 1
+        assert not groq._inflight and groq.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_upstream_call_survives_while_a_waiter_remains(groq):
+    groq._complete.delay = 0.1
+
+    async def run():
+        patient = asyncio.ensure_future(groq.complete("system", "hello"))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(groq.complete("system", "hello"), 0.01)
+        return await patient
+
+    assert asyncio.run(run()) == "answer: hello"
+    assert groq._complete.cancelled == 0
+
+
+def test_refinement_deadline_bounds_the_upstream_timeout(groq, monkeypatch):
+    monkeypatch.setattr(ai_client, "groq_client", groq)
+    monkeypatch.setattr(ai_client, "groq_breaker", CircuitBreaker())
+    refined, ai_error = asyncio.run(ai_client.generate_ai_message("draft", "hello", deadline=2))
+    assert refined and ai_error is None
+    assert groq._complete.calls == [2]
+
+
+def test_deadline_counts_against_the_breaker_and_frees_the_slot(groq, monkeypatch):
+    groq._complete.delay = 10
+    breaker = CircuitBreaker(min_calls=1, error_rate=0.5)
+    monkeypatch.setattr(ai_client, "groq_client", groq)
+    monkeypatch.setattr(ai_client, "groq_breaker", breaker)
+
+    async def run():
+        result = await ai_client.generate_ai_message("draft", "hello", deadline=0.05)
+        await asyncio.sleep(0)
+        assert groq._complete.cancelled == 1 and groq.in_flight == 0
+        return result
+
+    refined, ai_error = asyncio.run(run())
+    assert refined is None and "deadline" in ai_error
+    assert breaker.state == OPEN
+
+
+def test_breaker_trips_on_error_rate():
+    breaker = CircuitBreaker(window=10, min_calls=4, error_rate=0.5)
+    for _ in range(2):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+    assert not breaker.would_allow()
+    assert not breaker.allow() and breaker.rejected == 1
+
+
+def test_breaker_trips_on_slow_calls():
+    breaker = CircuitBreaker(min_calls=2, slow_seconds=1, slow_rate=1.0)
+    breaker.record_success(2)
+    breaker.record_success(2)
+    assert breaker.state == OPEN
+
+
+def test_half_open_admits_one_probe():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.would_allow()
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.would_allow() and not breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+
+
+def test_released_probe_frees_the_slot():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_cancelled_refinement_releases_the_probe(groq, monkeypatch):
+    groq._complete.delay = 10
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    monkeypatch.setattr(ai_client, "groq_client", groq)
+    monkeypatch.setattr(ai_client, "groq_breaker", breaker)
+
+    async def run():
+        call = asyncio.ensure_future(ai_client.generate_ai_message("draft", "hello", deadline=5))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(run())
+    assert breaker.state == HALF_OPEN and breaker.would_allow()
+
+
+def test_a_failed_call_fails_every_waiter_once(groq):
+    groq._complete.error = RuntimeError("upstream 503")
+
+    async def run():
+        return await asyncio.gather(*(groq.complete("system", "hello") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(r) for r in results] == ["upstream 503"] * 3
+    assert len(groq._complete.calls) == 1
+
+
+def test_finished_calls_are_not_reused(groq):
+    async def run():
+        first = await groq.complete("system", "hello")
+        second = await groq.complete("system", "hello")
+        return first, second
+
+    assert asyncio.run(run()) == ("answer: hello", "answer: hello")
+    assert len(groq._complete.calls) == 2 and groq.coalesced == 0
+
+
+def test_different_settings_are_separate_calls(groq):
+    async def run():
+        await asyncio.gather(groq.complete("system", "hello"), groq.complete("system", "hello", temperature=0.7),
+                             groq.complete("system", "hello", max_tokens=64), groq.complete("other", "hello"))
+
+    asyncio.run(run())
+    assert len(groq._complete.calls) == 4 and groq.coalesced == 0
+
+
+class SlowStream(AsyncGroqClient):
+    """Streams "a", "b", "c", waiting ``first_delay`` before the first delta."""
+
+    first_delay = 0.0
+
+    async def stream(self, system_prompt, user_prompt, **kwargs):
+        await asyncio.sleep(self.first_delay)
+        for delta in "abc":
+            yield delta
+            await asyncio.sleep(0)
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    client, breaker = SlowStream("test-key"), CircuitBreaker(min_calls=1, open_seconds=0)
+    monkeypatch.setattr(ai_client, "groq_client", client)
+    monkeypatch.setattr(ai_client, "groq_breaker", breaker)
+    return client, breaker
+
+
+def test_stream_succeeds(streaming):
+    async def run():
+        return [delta async for delta in ai_client.stream_ai_message("draft", "hello")]
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+    assert streaming[1].stats()["recent_calls"] == 1
+
+
+def test_stream_deadline_applies_to_the_first_token(streaming):
+    client, breaker = streaming
+    client.first_delay = 1
+
+    async def run():
+        return [delta async for delta in ai_client.stream_ai_message("draft", "hello", deadline=0.02)]
+
+    with pytest.raises(RuntimeError, match="deadline"):
+        asyncio.run(run())
+    assert breaker.state == OPEN
+
+
+def test_abandoned_stream_releases_the_probe(streaming):
+    client, breaker = streaming
+    breaker.record_failure()
+
+    async def run():
+        deltas = ai_client.stream_ai_message("draft", "hello")
+        assert await deltas.__anext__() == "a"
+        assert breaker.state == HALF_OPEN and not breaker.would_allow()
+        await deltas.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == HALF_OPEN and breaker.would_allow()
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+
+QUESTIONS = ["How do I get funding?", "How do I register a business?", "How do I hire staff?",
+             "How do I price my product?", "How do I export cocoa?"]
+
+
+@pytest.fixture
+def history(client):
+    """A fresh user with one conversation per question; returns (user_id, ids oldest-first)."""
+    user_id = f"history-{uuid.uuid4().hex}"
+    ids = [client.post("/chat", json={"message": question, "user_id": user_id}).json()["conversation_id"]
+           for question in QUESTIONS]
+    return user_id, ids
+
+
+def test_latest_page_is_returned_oldest_first(client, history):
+    user_id, ids = history
+    page = client.get(f"/history/{user_id}", params={"limit": 2}).json()
+    assert [c["id"] for c in page["conversations"]] == ids[-2:]
+    assert page["has_more"] and page["before"] == ids[-2]
+    assert [c["query"] for c in page["conversations"]] == QUESTIONS[-2:]
+
+
+def test_before_walks_back_to_the_first_conversation(client, history):
+    user_id, ids = history
+    seen, params = [], {"limit": 2}
+    while True:
+        page = client.get(f"/history/{user_id}", params=params).json()
+        seen = [c["id"] for c in page["conversations"]] + seen
+        if not page["has_more"]:
+            break
+        params["before"] = page["before"]
+    assert seen == ids
+    assert page["before"] is None
+
+
+def test_since_returns_only_new_conversations(client, history):
+    user_id, ids = history
+    after = client.get(f"/history/{user_id}").json()["after"]
+    assert after == ids[-1]
+    assert client.get(f"/history/{user_id}", params={"since": after}).json()["conversations"] == []
+    new_id = client.post("/chat", json={"message": "How do I open a bank account?", "user_id": user_id}).json()["conversation_id"]
+    page = client.get(f"/history/{user_id}", params={"since": after}).json()
+    assert [c["id"] for c in page["conversations"]] == [new_id]
+    assert page["after"] == new_id
+
+
+def test_histories_are_per_user(client, history):
+    user_id, ids = history
+    assert client.get(f"/history/{uuid.uuid4().hex}").json()["conversations"] == []
+    assert all(c["user_id"] == user_id for c in client.get(f"/history/{user_id}").json()["conversations"])
+
+
+def test_cursor_and_limit_are_validated(client, history):
+    user_id, ids = history
+    assert client.get(f"/history/{user_id}", params={"before": ids[-1], "after": ids[0]}).status_code == 400
+    assert client.get(f"/history/{user_id}", params={"limit": 0}).status_code == 422
+    assert client.get(f"/history/{user_id}", params={"limit": 1000}).status_code == 422
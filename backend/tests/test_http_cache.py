@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from starlette.requests import Request
+
+from app.http_cache import etag_for, not_modified
+
+
+def request_with(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etags_are_weak_and_stable():
+    etag = etag_for("history", "u1", 3)
+    assert etag.startswith('W/"') and etag == etag_for("history", "u1", 3)
+    assert etag != etag_for("history", "u1", 4)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("*", True),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('W/"xyz", W/"abc"', True),
+    ('W/"xyz"', False),
+])
+def test_if_none_match(header, expected):
+    assert not_modified(request_with(header), 'W/"abc"') is expected
+
+
+@pytest.fixture
+def user_with_history(client):
+    user_id = f"etag-{uuid.uuid4().hex}"
+    client.post("/chat", json={"message": "How do I get funding?", "user_id": user_id})
+    return user_id
+
+
+def test_unchanged_history_is_304(client, user_with_history):
+    first = client.get(f"/history/{user_with_history}")
+    assert first.headers["cache-control"] == "private, no-cache"
+    again = client.get(f"/history/{user_with_history}", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304 and not again.content
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_new_conversation_changes_the_etag(client, user_with_history):
+    etag = client.get(f"/history/{user_with_history}").headers["etag"]
+    client.post("/chat", json={"message": "How do I hire staff?", "user_id": user_with_history})
+    assert client.get(f"/history/{user_with_history}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_knowledge_base_edit_changes_the_etag(client, monolith, monkeypatch, user_with_history):
+    etag = client.get(f"/history/{user_with_history}").headers["etag"]
+    monkeypatch.setattr(monolith.professional_afiyor.knowledge_base, "source_sha256", "edited")
+    assert client.get(f"/history/{user_with_history}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_large_responses_are_gzipped(client, user_with_history):
+    response = client.get(f"/history/{user_with_history}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["conversations"]
+    assert "content-encoding" not in client.get("/health/live", headers={"Accept-Encoding": "gzip"}).headers
@@ -0,0 +1,61 @@
+import pytest
+
+from app.intents import DEFAULT_INTENT, IntentClassifier, KeywordAutomaton, classify, classify_many, normalize_text
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton([("venture", "a"), ("venture capital", "b"), ("capital", "c"), ("tal", "d")])
+    assert automaton.size == 4
+    # "tal" only occurs mid-word, so the boundary rule drops it
+    assert automaton.scan("venture capital for ventures") == {"a": 2, "b": 1, "c": 1}
+
+
+def test_latin_keywords_start_at_a_word_boundary():
+    automaton = KeywordAutomaton([("grant", "funding")])
+    assert automaton.scan("apply for a grant") == {"funding": 1}
+    assert automaton.scan("an immigrant founder") == {}
+    assert automaton.scan("grants and grant-makers") == {"funding": 2}
+
+
+def test_other_scripts_match_inside_words():
+    automaton = KeywordAutomaton([(normalize_text("تمويل"), "funding")])
+    assert automaton.scan(normalize_text("والتمويل")) == {"funding": 1}
+
+
+def test_normalize_drops_case_and_accents():
+    assert normalize_text("Levée de FONDS") == "levee de fonds"
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("How do I find an angel investor?", "funding"),
+    ("Je cherche un financement pour ma boutique", "funding"),
+    ("Nahitaji mkopo kwa biashara yangu", "funding"),
+    ("How do I accept M-Pesa payment?", "mobile_money"),
+    ("How do I register my company?", "legal_registration"),
+    ("أريد تسجيل شركة", "legal_registration"),
+    ("What does ubuntu mean for business?", "ubuntu"),
+    ("What should I sell at the market?", DEFAULT_INTENT),
+])
+def test_classify(message, intent):
+    assert classify(message).intent == intent
+
+
+def test_ties_follow_the_priority_order():
+    # one funding and one mobile money keyword: funding comes first in INTENT_PRIORITY
+    assert classify("a loan paid by momo").intent == "funding"
+
+
+def test_most_hits_win():
+    assert classify("register a license for mobile money").intent == "legal_registration"
+
+
+def test_classify_many_matches_classify():
+    messages = ["How do I find an investor?", "How do I register?", "How do I find an investor?", "hello"]
+    assert classify_many(messages) == [classify(m) for m in messages]
+
+
+def test_classifier_from_tables():
+    classifier = IntentClassifier({"en": {"export": ["shipping", "customs"]}})
+    assert classifier.languages == ["en"]
+    assert classifier.classify("customs forms for shipping").intent == "export"
+    assert classifier.classify("customs forms for shipping").score == 2
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from app.knowledge_base import KnowledgeBase, build_snapshot, load_knowledge_base, snapshot_changed
+
+SOURCE = {
+    "version": "test-1",
+    "sections": {
+        "funding_data": {"seed": {"amount": "$100k", "sources": ["angels"]}},
+        "mobile_money_data": {"ghana": {"providers": ["MTN"]}},
+        "business_registration": {"ghana": {"agency": "ORC"}, "kenya": {"agency": "BRS"}},
+    },
+}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    source, snapshot = tmp_path / "kb.json", tmp_path / "kb.kbsnap"
+    source.write_text(json.dumps(SOURCE), encoding="utf-8")
+    return str(source), str(snapshot)
+
+
+def test_snapshot_round_trips_entries(paths):
+    kb = KnowledgeBase(build_snapshot(*paths))
+    assert kb.version == "test-1"
+    assert kb.lookup("funding_data", "seed") == SOURCE["sections"]["funding_data"]["seed"]
+    assert kb.lookup("funding_data", "series_a", "missing") == "missing"
+    assert kb.lookup("nope", "seed") is None
+    assert kb.keys("business_registration") == ["ghana", "kenya"]
+
+
+def test_entries_are_decoded_on_first_read(paths):
+    kb = KnowledgeBase(build_snapshot(*paths))
+    assert kb.stats()["decoded_entries"] == 0
+    first = kb.lookup("funding_data", "seed")
+    assert kb.lookup("funding_data", "seed") is first
+    assert kb.stats()["decoded_entries"] == 1
+
+
+def test_country_index(paths):
+    kb = KnowledgeBase(build_snapshot(*paths))
+    assert kb.countries() == ["ghana", "kenya"]
+    assert kb.sections_for("Ghana") == ["mobile_money_data", "business_registration"]
+    assert kb.sections_for("mali") == []
+
+
+def test_snapshot_is_rebuilt_only_when_the_source_changes(paths):
+    source, snapshot = paths
+    kb = load_knowledge_base(source, snapshot)
+    assert load_knowledge_base(source, snapshot).mtime == kb.mtime
+    edited = {**SOURCE, "version": "test-2"}
+    with open(source, "w", encoding="utf-8") as f:
+        json.dump(edited, f)
+    reloaded = load_knowledge_base(source, snapshot)
+    assert reloaded.version == "test-2" and reloaded.source_sha256 != kb.source_sha256
+
+
+def test_snapshot_changed_sees_a_replaced_file(paths):
+    source, snapshot = paths
+    kb = load_knowledge_base(source, snapshot)
+    assert not snapshot_changed(kb)
+    os.utime(snapshot, ns=(kb.mtime + 10**9, kb.mtime + 10**9))
+    assert snapshot_changed(kb)
+    assert snapshot_changed(None)
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"hello world")
+    with pytest.raises(ValueError):
+        KnowledgeBase(str(path))
+
+
+def test_admin_reload_flushes_refined_answers(client, monolith, fake_groq):
+    client.post("/chat", json={"message": "How do I get funding?"})
+    assert monolith.refinement_cache.stats()["size"] == 1
+    assert client.post("/admin/knowledge-base/reload").status_code == 403
+    response = client.post("/admin/knowledge-base/reload", headers={"X-Admin-Token": "test-admin-token"})
+    assert response.status_code == 200
+    assert response.json()["knowledge_base"]["version"] == monolith.professional_afiyor.knowledge_base.version
+    assert monolith.refinement_cache.stats()["size"] == 0
@@ -0,0 +1,64 @@
+import pytest
+
+from app import language
+from app.language import LANGUAGE_PACKS, SUPPORTED_LANGUAGES, TrigramModel, detect_language, language_pack
+from app.sankofa import sankofa
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("How do I get funding for my business?", "en"),
+    ("Ninawezaje kupata ufadhili kwa biashara yangu?", "sw"),
+    ("Comment obtenir un financement pour mon entreprise ?", "fr"),
+    ("Báwo ni mo ṣe lè rí owó fún iṣẹ́ òwò mi?", "yo"),
+    ("Bawo ni mo se le ri owo fun ise owo mi?", "yo"),
+    ("كيف أحصل على تمويل لمشروعي؟", "ar"),
+])
+def test_detect_language(message, expected):
+    assert detect_language(message) == expected
+
+
+def test_short_or_empty_messages_stay_in_english():
+    assert detect_language("habari") == "en"
+    assert detect_language("") == detect_language(None) == "en"
+
+
+def test_detection_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(language, "LANGUAGE_DETECTION", False)
+    assert detect_language("Ninawezaje kupata ufadhili kwa biashara yangu?") == "en"
+
+
+def test_trigram_model_scores_only_known_grams():
+    model = TrigramModel({"a": ["banana bandana"], "b": ["kiwi kiwi"]})
+    scores = model.scores("banana")
+    assert scores["a"] > scores["b"]
+    assert model.scores("xyz") == {}
+
+
+def test_packs_line_up_with_english():
+    english = LANGUAGE_PACKS["en"]
+    for code in SUPPORTED_LANGUAGES:
+        pack = language_pack(code)
+        assert set(pack["drafts"]) == set(english["drafts"])
+        if code != "en":
+            lines = pack["sankofa"]
+            assert len(lines["success"]) == len(sankofa.SUCCESS_WISDOM)
+            assert len(lines["proverbs"]) == len(sankofa.AFRICAN_PROVERBS)
+            assert len(lines["ubuntu"]) == len(sankofa.UBUNTU_QUOTES)
+    assert language_pack("xx") is english
+
+
+def test_detections_are_cached(client):
+    detect_language("Comment lever des fonds pour une petite entreprise ?")
+    hits = language.detection_stats()["cache_hits"]
+    detect_language("Comment lever des fonds pour une petite entreprise ?")
+    stats = client.get("/health").json()["language_detection"]
+    assert stats["cache_hits"] == hits + 1 and set(stats["languages"]) == set(SUPPORTED_LANGUAGES)
+
+
+def test_chat_answers_in_the_users_language(client):
+    swahili = client.post("/chat", json={"message": "Ninawezaje kupata ufadhili kwa biashara yangu?", "user_id": "lang-sw"}).json()
+    assert swahili["language"] == "sw"
+    assert any(line in swahili["response"] for line in LANGUAGE_PACKS["sw"]["sankofa"]["success"])
+    english = client.post("/chat", json={"message": "How do I get funding for my business?", "user_id": "lang-en"}).json()
+    assert english["language"] == "en"
+    assert not any(line in english["response"] for line in LANGUAGE_PACKS["sw"]["sankofa"]["success"])
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.lifecycle import Readiness, run_step
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_required_steps_gate_readiness():
+    readiness = Readiness()
+    order = []
+
+    async def step(name, delay=0.0):
+        await asyncio.sleep(delay)
+        order.append(name)
+
+    async def main():
+        connect = run_step(readiness, "database", lambda: step("database", 0.01))
+        schema = run_step(readiness, "schema", lambda: step("schema"), after=connect)
+        warm = run_step(readiness, "drafts", lambda: step("drafts"), required=False)
+        assert not readiness.ready and readiness.pending() == ["database", "schema", "drafts"]
+        await asyncio.gather(connect, schema, warm)
+
+    asyncio.run(main())
+    assert order.index("database") < order.index("schema")
+    assert readiness.ready and readiness.pending() == []
+
+
+def test_failed_optional_step_is_reported_but_does_not_gate():
+    readiness = Readiness()
+
+    async def broken():
+        raise RuntimeError("no groq sdk")
+
+    async def fine():
+        pass
+
+    async def main():
+        await asyncio.gather(run_step(readiness, "groq_client", broken, required=False), run_step(readiness, "database", fine))
+
+    asyncio.run(main())
+    assert readiness.ready
+    assert readiness.stats()["errors"] == {"groq_client": "no groq sdk"}
+    assert readiness.pending() == ["groq_client"]
+
+
+def test_failed_required_step_keeps_the_app_unready():
+    readiness = Readiness()
+
+    async def broken():
+        raise RuntimeError("database down")
+
+    async def main():
+        await run_step(readiness, "database", broken)
+
+    asyncio.run(main())
+    assert not readiness.ready
+
+
+def test_health_endpoints(client):
+    assert client.get("/health/live").json() == {"status": "alive"}
+    ready = client.get("/health/ready")
+    assert ready.status_code in (200, 503) and "pending" in ready.json()
+    assert client.get("/health").json()["readiness"]["uptime_seconds"] >= 0
+
+
+def test_heavy_modules_stay_off_the_import_path():
+    code = ("import sys; from asgi import load_monolith; load_monolith(); "
+            "print(','.join(m for m in ('groq', 'httpx', 'jose', 'sqlalchemy.orm', 'databases') if m in sys.modules))")
+    env = {**os.environ, "STORE_URL": "memory://", "GROQ_API_KEY": "test-key"}
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
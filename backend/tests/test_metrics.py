@@ -0,0 +1,62 @@
+import pytest
+
+from app.metrics import Registry, simple_metric
+
+
+def test_counter_renders_labels_escaped():
+    registry = Registry()
+    counter = registry.counter("calls_total", "Calls")
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome='say "hi"')
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP calls_total Calls", "# TYPE calls_total counter"]
+    assert 'calls_total{outcome="ok"} 1' in lines
+    assert 'calls_total{outcome="say \\"hi\\""} 2' in lines
+
+
+def test_gauge_goes_up_and_down():
+    registry = Registry()
+    gauge = registry.gauge("in_flight", "In flight")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert "# TYPE in_flight gauge" in registry.render()
+    assert "in_flight 1" in registry.render().splitlines()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="draft")
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="draft",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="draft",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="draft",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="draft"} 4' in lines
+
+
+def test_quantiles_interpolate_inside_the_bucket():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(1.0, 2.0))
+    for _ in range(10):
+        histogram.observe(1.5)
+    counts, _, total = histogram._series[()]
+    assert histogram.quantile(0.5, counts, total) == pytest.approx(1.5)
+    assert histogram.quantile(0.99, counts, total) == pytest.approx(1.99)
+
+
+def test_collectors_render_at_scrape_time():
+    registry = Registry()
+    values = {"hits": 1}
+    registry.collector(lambda: simple_metric("cache_hits", "counter", "Hits", values, label="cache"))
+    values["hits"] = 5
+    assert 'cache_hits{cache="hits"} 5' in registry.render()
+
+
+def test_metrics_endpoint_reports_stages_and_routes(client):
+    client.post("/chat", json={"message": "How do I get funding?"})
+    body = client.get("/metrics").text
+    assert 'afiyor_stage_duration_seconds_count{stage="draft"}' in body
+    assert 'afiyor_http_requests_total{method="POST",route="/chat",status="200"}' in body
+    assert 'afiyor_stage_duration_seconds_quantile{stage="draft",quantile="0.95"}' in body
@@ -0,0 +1,42 @@
+import uuid
+
+import pytest
+
+
+def test_records_have_no_instance_dict(monolith):
+    record = monolith.ConversationRecord(1, "u", "q", "ghana", "general", 0.85, 0, 0, ("funding",))
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_history_returns_the_answer_as_sent(client, fake_groq):
+    user_id = f"records-{uuid.uuid4().hex}"
+    plain = client.post("/chat", json={"message": "How do I get funding?", "user_id": user_id}).json()
+    stored = client.get(f"/history/{user_id}").json()["conversations"]
+    assert [c["response"] for c in stored] == [plain["response"]]
+    assert "refined: How do I get funding?" in stored[0]["response"]
+
+
+def test_repeated_drafts_and_frames_are_shared(client, monolith):
+    user_id = f"records-{uuid.uuid4().hex}"
+    for _ in range(2):
+        client.post("/chat", json={"message": "How do I register a business?", "user_id": user_id})
+    first, second = monolith.store.conversations[-2:]
+    assert first.draft_text is second.draft_text
+    assert first.opening is second.opening and first.closing is second.closing
+
+
+def test_stored_answer_survives_template_changes(client, monolith, monkeypatch):
+    user_id = f"records-{uuid.uuid4().hex}"
+    sent = client.post("/chat", json={"message": "How do I hire staff?", "user_id": user_id}).json()["response"]
+    monkeypatch.setattr(monolith.professional_afiyor, "render_draft", lambda draft_key: "a different template")
+    assert client.get(f"/history/{user_id}").json()["conversations"][0]["response"] == sent
+
+
+def test_rows_without_stored_text_are_rebuilt(monolith):
+    draft_key = monolith.professional_afiyor.draft_key("How do I get funding?", "ghana", "general")
+    record = monolith.ConversationRecord(1, "u", "How do I get funding?", "ghana", "general", 0.85, 0, 0, draft_key)
+    draft = monolith.professional_afiyor.render_draft(draft_key)
+    assert draft in record.response
+    assert record.response == monolith.apply_sankofa_full_hybrid(draft, "How do I get funding?", 0, "en")
@@ -0,0 +1,60 @@
+import uuid
+
+from app import db
+from app.write_behind import ORDERED_IDS
+
+
+def test_register_and_login(v2_client):
+    email = f"{uuid.uuid4().hex}@example.com"
+    registered = v2_client.post("/auth/register", json={"name": "Kofi", "email": email}).json()
+    assert registered["access_token"] and isinstance(registered["user_id"], int)
+    assert v2_client.post("/auth/register", json={"name": "Kofi", "email": email}).status_code == 400
+    assert v2_client.post("/auth/login", json={"email": email}).json()["user_id"] == registered["user_id"]
+    assert v2_client.post("/auth/login", json={"email": "nobody@example.com"}).status_code == 404
+
+
+def test_chat_is_saved_and_paged(v2_client):
+    user_id = f"v2-{uuid.uuid4().hex}"
+    ids = [v2_client.post("/chat/", json={"message": f"How do I get funding {i}?", "user_id": user_id}).json()["conversation_id"]
+           for i in range(3)]
+    assert ids == sorted(ids)
+    page = v2_client.get(f"/history/{user_id}", params={"limit": 2}).json()
+    assert [c["id"] for c in page["conversations"]] == ids[1:]
+    assert page["has_more"] and page["before"] == ids[1]
+    older = v2_client.get(f"/history/{user_id}", params={"before": page["before"]}).json()
+    assert [c["id"] for c in older["conversations"]] == ids[:1] and not older["has_more"]
+    newer = v2_client.get(f"/history/{user_id}", params={"since": ids[0]}).json()
+    if ORDERED_IDS:
+        assert [c["id"] for c in newer["conversations"]] == ids[1:]
+    else:
+        # write-behind ids can commit out of order, so since= is ignored and the latest page comes back
+        assert [c["id"] for c in newer["conversations"]] == ids and newer["after"] is None
+    assert isinstance(page["conversations"][0]["confidence"], float)
+    assert isinstance(page["conversations"][0]["created_at"], int)
+
+
+def test_repository_keyset_pages(v2_client):
+    user_id = f"repo-{uuid.uuid4().hex}"
+
+    async def run():
+        ids = [await db.save_conversation(user_id, f"q{i}", f"r{i}", "ghana", "general") for i in range(5)]
+        latest, has_more = await db.get_conversations_by_user(user_id, limit=2)
+        before, _ = await db.get_conversations_by_user(user_id, limit=10, before=ids[2])
+        after, _ = await db.get_conversations_by_user(user_id, limit=10, after=ids[2])
+        return ids, latest, has_more, before, after
+
+    ids, latest, has_more, before, after = v2_client.portal.call(run)
+    assert [c["id"] for c in latest] == ids[-2:] and has_more
+    assert [c["id"] for c in before] == ids[:2]
+    assert [c["id"] for c in after] == ids[3:]
+
+
+def test_summary_never_rolls_back(v2_client):
+    user_id = f"repo-{uuid.uuid4().hex}"
+
+    async def run():
+        await db.set_summary(user_id, "through 5", 5)
+        await db.set_summary(user_id, "through 3", 3)
+        return await db.get_summary(user_id)
+
+    assert v2_client.portal.call(run) == ("through 5", 5)
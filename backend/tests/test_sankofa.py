@@ -0,0 +1,59 @@
+from app import sankofa
+from app.sankofa import apply_sankofa_full_hybrid, seconds_until_next_day, seeded_indices
+
+
+def test_picks_depend_on_the_question_and_the_day():
+    sizes = (5, 5, 5)
+    today = seeded_indices("How do I get funding?", sizes, day="2026-10-18")
+    assert today == seeded_indices("  how do I get FUNDING ", sizes, day="2026-10-18")
+    assert all(0 <= index < 5 for index in today)
+    days = {seeded_indices("How do I get funding?", sizes, day=f"2026-10-{d:02d}") for d in range(1, 29)}
+    assert len(days) > 1
+
+
+def test_random_mode_and_missing_message_are_unseeded(monkeypatch):
+    assert seeded_indices(None, (5,)) is None
+    monkeypatch.setattr(sankofa, "SANKOFA_MODE", "random")
+    assert seeded_indices("How do I get funding?", (5,)) is None
+
+
+def test_wrapping_is_deterministic_within_a_day():
+    first = apply_sankofa_full_hybrid("draft", "How do I get funding?")
+    assert first == apply_sankofa_full_hybrid("draft", "How do I get funding?")
+    assert first.startswith(tuple(sankofa.sankofa.SUCCESS_WISDOM)) and "\n\ndraft\n\n" in first
+
+
+def test_seconds_until_next_day():
+    assert 0 < seconds_until_next_day() <= 86400
+
+
+def test_ask_is_cacheable_until_midnight(client):
+    first = client.get("/ai/ask", params={"q": "How do I get funding?"})
+    assert first.json() == client.get("/ai/ask", params={"q": "How do I get funding?"}).json()
+    cache_control = first.headers["cache-control"]
+    assert cache_control.startswith("public, max-age=")
+    assert int(cache_control.split("max-age=")[1]) <= seconds_until_next_day()
+    again = client.get("/ai/ask", params={"q": "How do I get funding?"}, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    other = client.get("/ai/ask", params={"q": "How do I hire staff?"}, headers={"If-None-Match": first.headers["etag"]})
+    assert other.status_code == 200
+
+
+def test_ask_etag_follows_the_knowledge_base(client, monolith, monkeypatch):
+    etag = client.get("/ai/ask", params={"q": "How do I get funding?"}).headers["etag"]
+    monkeypatch.setattr(monolith.professional_afiyor.knowledge_base, "source_sha256", "edited")
+    assert client.get("/ai/ask", params={"q": "How do I get funding?"}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_fallback_answers_are_not_cached(client, monolith, fake_groq, monkeypatch):
+    async def failing(*args, **kwargs):
+        return None, "AI refinement exceeded 6s deadline"
+
+    monkeypatch.setattr(monolith, "generate_ai_message", failing)
+    response = client.get("/ai/ask", params={"q": "How do I get funding?"})
+    assert response.json()["ai_error"] and response.headers["cache-control"] == "no-store"
+
+
+def test_random_mode_is_not_cached(client, monolith, monkeypatch):
+    monkeypatch.setattr(monolith, "SANKOFA_MODE", "random")
+    assert client.get("/ai/ask", params={"q": "How do I get funding?"}).headers["cache-control"] == "no-store"
@@ -0,0 +1,51 @@
+from app.semantic_cache import SemanticCache, jaccard, semantic_bucket, terms
+
+GHANA_REGISTRATION = semantic_bucket(("legal_registration", None, "ghana", None), "ghana", "general", "business_coach")
+
+
+def test_other_countries_stay_terms():
+    kenya = terms("How do I register a company in Kenya", "ghana")
+    nigeria = terms("How do I register a company in Nigeria", "ghana")
+    assert jaccard(kenya, nigeria) < 1.0
+
+
+def test_kenya_answer_is_not_served_for_nigeria():
+    cache = SemanticCache(maxsize=10)
+    cache.set("How do I register a company in Kenya", GHANA_REGISTRATION, "kenya answer")
+    assert cache.get("How do I register a company in Nigeria", GHANA_REGISTRATION) is None
+
+
+def test_home_country_places_are_dropped():
+    cache = SemanticCache(maxsize=10)
+    cache.set("how to register a business in Accra", GHANA_REGISTRATION, "ghana answer")
+    assert cache.get("registering a company in Ghana?", GHANA_REGISTRATION) == "ghana answer"
+
+
+def test_buckets_separate_funding_stage_and_language():
+    seed = semantic_bucket(("funding", "seed", "ghana", None), "ghana", "general", "business_coach")
+    pre_seed = semantic_bucket(("funding", "pre_seed", "ghana", None), "ghana", "general", "business_coach")
+    french = semantic_bucket(("funding", "pre_seed", "ghana", None, "fr"), "ghana", "general", "business_coach")
+    cache = SemanticCache(maxsize=10)
+    cache.set("how to raise money for my startup", pre_seed, "pre-seed answer")
+    assert cache.get("how do I raise money for my startup", pre_seed) == "pre-seed answer"
+    assert cache.get("how do I raise money for my startup", seed) is None
+    assert cache.get("how do I raise money for my startup", french) is None
+
+
+def test_negations_are_kept():
+    assert terms("Do I need a license to sell food?") != terms("Do I not need a license to sell food?")
+
+
+def test_eviction_keeps_the_cache_bounded():
+    cache = SemanticCache(maxsize=2)
+    for n, topic in enumerate(["payment gateway fees", "customer growth tips", "license permit cost"]):
+        cache.set(f"mobile {topic}", GHANA_REGISTRATION, str(n))
+    assert len(cache) == 2
+    assert cache.get("mobile payment gateway fees", GHANA_REGISTRATION) is None
+
+
+def test_kenya_then_nigeria_both_reach_groq(client, fake_groq):
+    for message in ("How do I register a company in Kenya", "How do I register a company in Nigeria"):
+        r = client.post("/chat", json={"message": message, "country": "ghana"}).json()
+        assert r["response"].count(f"refined: {message}") == 1
+    assert len(fake_groq) == 2
@@ -0,0 +1,81 @@
+import uuid
+
+import pytest
+
+from app.share import SHARE_ID_RE, new_share_id
+
+
+def register(client):
+    email = f"{uuid.uuid4().hex}@example.com"
+    return client.post("/auth/register", json={"name": "Ama", "email": email}).json()["user_id"]
+
+
+@pytest.fixture
+def owned_chat(client):
+    user_id = register(client)
+    chat = client.post("/chat", json={"message": "How do I register a business?", "user_id": user_id}).json()
+    return user_id, chat["conversation_id"]
+
+
+def test_share_ids_are_random_link_tokens():
+    ids = {new_share_id() for _ in range(100)}
+    assert len(ids) == 100
+    assert all(SHARE_ID_RE.match(share_id) for share_id in ids)
+
+
+def test_user_ids_are_not_sequential(client):
+    first, second = register(client), register(client)
+    assert first.startswith("user_") and second.startswith("user_")
+    assert not first[5:].isdigit() and first != second
+
+
+def test_only_the_owner_can_share(client, owned_chat):
+    user_id, conversation_id = owned_chat
+    assert client.post("/share", json={"conversation_id": conversation_id, "user_id": register(client)}).status_code == 404
+    assert client.post("/share", json={"conversation_id": conversation_id, "user_id": "anonymous"}).status_code == 404
+    first = client.post("/share", json={"conversation_id": conversation_id, "user_id": user_id}).json()["share_id"]
+    again = client.post("/share", json={"conversation_id": conversation_id, "user_id": user_id}).json()["share_id"]
+    assert first == again
+
+
+def test_anonymous_chats_cannot_be_shared(client):
+    chat = client.post("/chat", json={"message": "How do I register a business?"}).json()
+    response = client.post("/share", json={"conversation_id": chat["conversation_id"], "user_id": "anonymous"})
+    assert response.status_code == 404
+
+
+def test_share_is_revalidated_not_immutable(client, owned_chat):
+    user_id, conversation_id = owned_chat
+    share_id = client.post("/share", json={"conversation_id": conversation_id, "user_id": user_id}).json()["share_id"]
+    response = client.get(f"/share/{share_id}")
+    assert response.status_code == 200
+    assert response.json()["query"] == "How do I register a business?"
+    cache_control = response.headers["cache-control"]
+    assert "immutable" not in cache_control
+    assert int(cache_control.split("max-age=")[1].split(",")[0]) <= 3600
+    revalidated = client.get(f"/share/{share_id}", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304 and not revalidated.content
+
+
+def test_share_is_gzipped_when_accepted(client, owned_chat):
+    user_id, conversation_id = owned_chat
+    share_id = client.post("/share", json={"conversation_id": conversation_id, "user_id": user_id}).json()["share_id"]
+    response = client.get(f"/share/{share_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["share_id"] == share_id
+
+
+def test_deleted_share_is_gone(client, owned_chat):
+    user_id, conversation_id = owned_chat
+    share_id = client.post("/share", json={"conversation_id": conversation_id, "user_id": user_id}).json()["share_id"]
+    etag = client.get(f"/share/{share_id}").headers["etag"]
+    assert client.delete(f"/share/{share_id}", params={"user_id": register(client)}).status_code == 404
+    assert client.delete(f"/share/{share_id}", params={"user_id": user_id}).status_code == 200
+    assert client.get(f"/share/{share_id}").status_code == 404
+    assert client.get(f"/share/{share_id}", headers={"If-None-Match": etag}).status_code == 404
+    assert client.delete(f"/share/{share_id}", params={"user_id": user_id}).status_code == 404
+
+
+def test_unknown_share_is_404(client):
+    assert client.get("/share/nope").status_code == 404
+    assert client.get("/share/not a valid id").status_code == 404
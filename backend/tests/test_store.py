@@ -0,0 +1,107 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.store import MemoryStore, SQLStore, create_store
+
+
+def conversation(user_id, query="How do I get funding?", country="ghana"):
+    return {"user_id": user_id, "query": query, "country": country, "industry": "general", "confidence": 0.85,
+            "created_at": int(time.time()), "wisdom": 0, "draft_key": ("funding", "pre_seed", country, None),
+            "ai_text": None, "draft_text": "draft", "opening": "<", "closing": ">"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def open_store(request, tmp_path):
+    """Runs ``scenario(store)`` against a connected store of each backend."""
+    url = "memory://" if request.param == "memory" else f"sqlite:///{tmp_path / 'store.db'}"
+
+    def run(scenario):
+        async def main():
+            store = create_store(SimpleNamespace, url)
+            await store.connect()
+            try:
+                return await scenario(store)
+            finally:
+                await store.disconnect()
+        return asyncio.run(main())
+    return run
+
+
+def test_create_store_picks_the_backend(tmp_path):
+    assert isinstance(create_store(SimpleNamespace, "memory://"), MemoryStore)
+    assert isinstance(create_store(SimpleNamespace, f"sqlite:///{tmp_path / 'x.db'}"), SQLStore)
+    with pytest.raises(ValueError):
+        create_store(SimpleNamespace, "redis://localhost")
+
+
+def test_users(open_store):
+    async def scenario(store):
+        user = await store.create_user("Ama", "ama@example.com", "ghana", "retail")
+        again = await store.create_user("Ama", "ama@example.com", "ghana", "retail")
+        return user, again, await store.get_user("ama@example.com"), await store.get_user("nobody@example.com")
+
+    user, again, found, missing = open_store(scenario)
+    assert again is None and missing is None
+    assert found["id"] == user["id"] and user["id"].startswith("user_")
+
+
+def test_conversation_pages(open_store):
+    async def scenario(store):
+        records = await store.add_conversations([conversation("u1"), conversation("u2"), conversation("u1")])
+        records += await store.add_conversations([conversation("u1")])
+        latest, has_more = await store.conversation_page("u1", 2)
+        older, older_more = await store.conversation_page("u1", 2, before=latest[0].id)
+        fetched = await store.get_conversation(records[1].id)
+        return records, latest, has_more, older, older_more, fetched
+
+    records, latest, has_more, older, older_more, fetched = open_store(scenario)
+    u1 = [r.id for r in records if r.user_id == "u1"]
+    assert len({r.id for r in records}) == 4
+    assert [r.id for r in latest] == u1[1:] and has_more
+    assert [r.id for r in older] == u1[:1] and not older_more
+    assert fetched.user_id == "u2" and fetched.draft_key == ("funding", "pre_seed", "ghana", None)
+
+
+def test_summaries_and_shares(open_store):
+    async def scenario(store):
+        await store.set_summary("u1", "through 4", 4)
+        await store.set_summary("u1", "through 2", 2)
+        first = await store.create_share({"share_id": "aaa", "conversation_id": 7, "title": "t"})
+        second = await store.create_share({"share_id": "bbb", "conversation_id": 7, "title": "t"})
+        deleted = await store.delete_share("aaa")
+        return await store.get_summary("u1"), first, second, deleted, await store.get_share("aaa")
+
+    summary, first, second, deleted, gone = open_store(scenario)
+    assert summary == ("through 4", 4)
+    assert second["share_id"] == first["share_id"] == "aaa"
+    assert deleted and gone is None
+
+
+def test_workers_share_one_sqlite_file(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+
+    async def main():
+        workers = [create_store(SimpleNamespace, url) for _ in range(2)]
+        for worker in workers:
+            await worker.connect()
+        try:
+            user = await workers[0].create_user("Kofi", "kofi@example.com", None, None)
+            seen = await workers[1].get_user("kofi@example.com")
+            first = await workers[0].add_conversations([conversation(user["id"])])
+            second = await workers[1].add_conversations([conversation(user["id"])])
+            for worker in workers:
+                if worker.writer:
+                    await worker.writer.drain()
+            page, _ = await workers[1].conversation_page(user["id"], 10)
+            return user, seen, first + second, page
+        finally:
+            for worker in workers:
+                await worker.disconnect()
+
+    user, seen, records, page = asyncio.run(main())
+    assert seen["id"] == user["id"]
+    assert records[0].id != records[1].id
+    assert sorted(r.id for r in page) == sorted(r.id for r in records)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+
+def sse(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def fake_stream(monolith, fake_groq, monkeypatch):
+    """``deltas`` is what the next Groq stream sends; an Exception in it is raised mid-stream."""
+    deltas = ["Refined ", "answer."]
+
+    async def stream(draft, user_message, *args, **kwargs):
+        fake_groq.append({"message": user_message, **kwargs})
+        for delta in deltas:
+            if isinstance(delta, Exception):
+                raise delta
+            yield delta
+
+    monkeypatch.setattr(monolith, "stream_ai_message", stream)
+    return deltas
+
+
+def test_draft_is_streamed_without_groq(client):
+    events = sse(client.post("/chat/stream", json={"message": "How do I get funding?"}))
+    assert [name for name, _ in events] == ["opening", "token", "closing", "done"]
+    assert events[-1][1]["confidence"] == 0.85 and events[-1][1]["conversation_id"]
+
+
+def test_refinement_is_streamed_token_by_token(client, fake_stream):
+    response = client.post("/chat/stream", json={"message": "How do I get funding?", "user_id": "stream-user"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse(response)
+    assert [name for name, _ in events] == ["opening", "token", "token", "closing", "done"]
+    assert "".join(data for name, data in events if name == "token") == "Refined answer."
+    assert events[-1][1]["confidence"] == 0.9 and events[-1][1]["ai_error"] is None
+
+
+def test_cached_refinement_is_sent_as_one_token(client, fake_groq, fake_stream):
+    for _ in range(2):
+        events = sse(client.post("/chat/stream", json={"message": "How do I export cocoa?"}))
+    assert [data for name, data in events if name == "token"] == ["Refined answer."]
+    assert len(fake_groq) == 1
+
+
+def test_mid_stream_failure_resets_to_the_draft(client, monolith, fake_stream):
+    fake_stream[1:] = [RuntimeError("connection reset")]
+    events = sse(client.post("/chat/stream", json={"message": "How do I hire staff?"}))
+    names = [name for name, _ in events]
+    assert names == ["opening", "token", "reset", "token", "closing", "done"]
+    assert events[2][1]["ai_error"] == "connection reset"
+    assert events[3][1] != "Refined "
+    assert events[-1][1]["confidence"] == 0.85
+    assert monolith.refinement_cache.stats()["size"] == 0
+    assert monolith.admission.refinements_in_flight == 0
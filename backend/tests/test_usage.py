@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.store import create_store
+from app.usage import OTHER, KeyFolder, UsageCounters, tally, usage_day
+
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+def test_new_values_past_the_cap_fold_into_other():
+    folder = KeyFolder(max_keys=2)
+    assert [folder.fold("country", c) for c in ("Ghana", "kenya", "mali", "ghana ")] == ["ghana", "kenya", OTHER, "ghana"]
+    assert folder.fold("industry", "") == "unknown"
+    assert folder.fold("industry", "x" * 100) == "x" * 40
+
+
+def test_seeded_values_count_towards_the_cap():
+    folder = KeyFolder(max_keys=2)
+    folder.seed([("country", "ghana"), ("country", OTHER), ("day", "2026-01-01"), ("country", "kenya"), ("country", "mali")])
+    assert folder.seen["country"] == {"ghana", "kenya"}
+    assert folder.fold("country", "nigeria") == OTHER
+
+
+def test_tally_collapses_a_batch():
+    folder = KeyFolder()
+    counts = tally([folder.keys("ghana", "retail", "funding", 0), folder.keys("ghana", "fintech", "funding", 0)])
+    assert counts[("country", "ghana")] == 2 and counts[("industry", "retail")] == 1
+    assert counts[("day", "1970-01-01")] == 2
+
+
+def test_old_days_are_pruned():
+    counters = UsageCounters()
+    counters.add("ghana", "retail", "funding", created_at=0)
+    counters.add("ghana", "retail", "funding")
+    snapshot = counters.snapshot()
+    assert snapshot["day"] == {usage_day(): 1}
+    assert snapshot["total"] == 2 and snapshot["country"] == {"ghana": 2}
+
+
+def test_sqlite_counters_match_memory(tmp_path):
+    rows = [{"user_id": "u", "query": "q", "country": country, "industry": "retail", "confidence": 0.85,
+             "created_at": int(time.time()), "wisdom": 0, "draft_key": (intent, None, country, None),
+             "ai_text": None, "draft_text": "d", "opening": "", "closing": ""}
+            for country, intent in (("ghana", "funding"), ("kenya", "funding"), ("ghana", "ubuntu"))]
+
+    async def stats(url):
+        store = create_store(SimpleNamespace, url)
+        await store.connect()
+        try:
+            await store.add_conversations(rows[:2])
+            await store.add_conversations(rows[2:])
+            return await store.usage_stats()
+        finally:
+            await store.disconnect()
+
+    memory = asyncio.run(stats("memory://"))
+    assert memory == asyncio.run(stats(f"sqlite:///{tmp_path / 'usage.db'}"))
+    assert memory["intent"] == {"funding": 2, "ubuntu": 1} and memory["total"] == 3
+
+
+def test_admin_stats_and_export(client):
+    user_id = f"export-{uuid.uuid4().hex}"
+    before = client.get("/admin/stats", headers=ADMIN).json()["total"]
+    ids = [client.post("/chat", json={"message": m, "user_id": user_id}).json()["conversation_id"]
+           for m in ("How do I get funding?", "How do I register a business?")]
+    assert client.get("/admin/stats", headers=ADMIN).json()["total"] == before + 2
+    export = client.get("/admin/conversations/export", params={"after": ids[0] - 1}, headers=ADMIN)
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in export.text.splitlines()]
+    assert [line["id"] for line in lines][:2] == ids
+    assert lines[0]["intent"] == "funding" and lines[1]["intent"] == "legal_registration"
+
+
+def test_admin_routes_need_the_token(client, monolith, monkeypatch):
+    assert client.get("/admin/stats").status_code == 403
+    assert client.get("/admin/conversations/export", headers={"X-Admin-Token": "nope"}).status_code == 403
+    monkeypatch.setattr(monolith, "ADMIN_TOKEN", None)
+    assert client.get("/admin/stats", headers=ADMIN).status_code == 404
+
+
+def test_v2_admin_routes(v2_client, monkeypatch):
+    from app.core.config import settings
+    v2_client.post("/chat/", json={"message": "How do I get funding?", "user_id": f"v2-{uuid.uuid4().hex}"})
+    assert v2_client.get("/admin/stats").status_code == 403
+    stats = v2_client.get("/admin/stats", headers=ADMIN).json()
+    assert stats["total"] >= 1 and stats["intent"]["funding"] >= 1
+    lines = v2_client.get("/admin/conversations/export", headers=ADMIN).text.splitlines()
+    assert json.loads(lines[-1])["query"] == "How do I get funding?"
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert v2_client.get("/admin/stats", headers=ADMIN).status_code == 404
@@ -0,0 +1,139 @@
+import asyncio
+
+from databases import Database
+
+from app.write_behind import IdAllocator, WriteBehindQueue
+
+
+def with_database(tmp_path, scenario):
+    async def main():
+        database = Database(f"sqlite:///{tmp_path / 'ids.db'}")
+        await database.connect()
+        try:
+            await database.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT)")
+            return await scenario(database)
+        finally:
+            await database.disconnect()
+    return asyncio.run(main())
+
+
+def test_workers_reserve_disjoint_blocks(tmp_path):
+    async def scenario(database):
+        workers = [IdAllocator(database, "items", block_size=4) for _ in range(2)]
+        for worker in workers:
+            await worker.start()
+        return [await workers[0].reserve(3), await workers[1].reserve(3), await workers[0].reserve(3)]
+
+    first, second, third = with_database(tmp_path, scenario)
+    assert first == [1, 2, 3]
+    assert second == [5, 6, 7]
+    # the first worker finishes its block, then takes the next free one
+    assert third == [4, 9, 10]
+
+
+def test_large_reservations_take_one_block(tmp_path):
+    async def scenario(database):
+        allocator = IdAllocator(database, "items", block_size=2)
+        await allocator.start()
+        return await allocator.reserve(5)
+
+    assert with_database(tmp_path, scenario) == [1, 2, 3, 4, 5]
+
+
+def test_blocks_start_past_existing_rows(tmp_path):
+    async def scenario(database):
+        allocator = IdAllocator(database, "items", block_size=4)
+        await allocator.start()
+        # rows written with WRITE_BEHIND off take ids from the table's own sequence
+        await database.execute("INSERT INTO items (id, name) VALUES (40, 'old')")
+        restarted = IdAllocator(database, "items", block_size=4)
+        await restarted.start()
+        return await restarted.reserve(1)
+
+    assert with_database(tmp_path, scenario) == [41]
+
+
+def test_rows_are_flushed_in_batches():
+    batches = []
+
+    async def flush(rows):
+        batches.append([row["n"] for row in rows])
+
+    async def main():
+        queue = WriteBehindQueue(flush, max_batch=3, max_delay_ms=20)
+        queue.start()
+        await queue.submit([{"n": n} for n in range(7)])
+        await queue.drain()
+        await queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert [n for batch in batches for n in batch] == list(range(7))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert stats["written"] == 7 and stats["pending"] == 0
+
+
+def test_failed_flushes_are_retried_then_dropped():
+    attempts = []
+
+    async def flush(rows):
+        attempts.append(len(rows))
+        if len(attempts) < 2 or rows[0]["n"] == "poison":
+            raise RuntimeError("database down")
+
+    async def main():
+        queue = WriteBehindQueue(flush, max_batch=10, max_delay_ms=1, retries=1)
+        queue.start()
+        await queue.submit([{"n": 1}])
+        await queue.drain()
+        await queue.submit([{"n": "poison"}])
+        await queue.drain()
+        await queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(main())
+    assert stats["written"] == 1 and stats["dropped"] == 1
+
+
+def test_full_queue_holds_submitters_back():
+    async def main():
+        gate = asyncio.Event()
+
+        async def flush(rows):
+            await gate.wait()
+
+        queue = WriteBehindQueue(flush, max_batch=1, max_delay_ms=1, max_pending=2)
+        queue.start()
+        submit = asyncio.ensure_future(queue.submit([{"n": n} for n in range(5)]))
+        await asyncio.sleep(0.05)
+        blocked = not submit.done()
+        gate.set()
+        await submit
+        await queue.stop()
+        return blocked, queue.stats()["written"]
+
+    assert asyncio.run(main()) == (True, 5)
+
+
+def test_drain_does_not_wait_for_later_rows():
+    async def main():
+        gate = asyncio.Event()
+        flushed = []
+
+        async def flush(rows):
+            if rows[0]["n"] == 2:
+                await gate.wait()
+            flushed.extend(row["n"] for row in rows)
+
+        queue = WriteBehindQueue(flush, max_batch=1, max_delay_ms=1)
+        queue.start()
+        await queue.submit([{"n": 1}])
+        drained = asyncio.ensure_future(queue.drain())
+        await asyncio.sleep(0)  # drain() notes its target before the next row arrives
+        await queue.submit([{"n": 2}])
+        await asyncio.wait_for(drained, 1)
+        gate.set()
+        await queue.stop()
+        return flushed
+
+    assert asyncio.run(main()) == [1, 2]